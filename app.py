@@ -2,18 +2,25 @@ import ctypes
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
+import queue
 from pathlib import Path
 import shutil
 
 from core.config import (
-    load_state, save_state,
+    load_state, save_class, flush_state,
     ensure_class_dir, ensure_day_dir,
     open_in_explorer,  # helper to open folders
+    DATA_DIR, INFERENCE_PROFILE,
 )
-from core.services.transcriber import transcribe_file
-from core.services.summarizer import summarize_text
-from core.utils.chunking import chunk_text
-from core.storage import save_texts, save_meta
+from core import metrics
+from core.daycache import DayCache
+from core.governor import get_governor, process_rss_mb
+from core.jobs import get_scheduler
+from core.services.transcriber import prewarm_model
+from core.related import get_related_index
+from core.search import get_index
+from core.storage import reindex_day, forget_day, save_transcript
+from core.textbuffer import TextBuffer
 
 # --- Fix DPI scaling issues on Windows ---
 try:
@@ -36,8 +43,38 @@ COLORS = {
     "BORDER":    "#E5E7EB",  # Light border
 }
 
+# --- Status bar labels for job kinds (see core.jobs) ---
+JOB_LABELS = {
+    "transcribe": "Transcribing",
+    "summarize": "Summarizing",
+    "process_lecture": "Processing lecture",
+}
+# editors each job kind streams its output into (see _on_job_event)
+JOB_STREAMS = {
+    "transcribe": ("transcript",),
+    "summarize": ("summary",),
+    "process_lecture": ("transcript", "summary"),
+}
+
+# --- Summary engines (label -> engine name in core.services.summarizer) ---
+SUMMARY_ENGINES = {
+    "Abstractive (BART)": "bart",
+    "Extractive (fast, no model)": "textrank",
+}
+
+# --- CPU inference profiles (label -> profile name in core.services.profiles) ---
+INFERENCE_PROFILES = {
+    "Default": "default",
+    "All cores": "throughput",
+    "All cores, int8 (fastest)": "int8",
+    "Light (leave cores free), int8": "shared",
+}
+
 STATE = load_state()
 
+def _format_mb(mb: float) -> str:
+    return f"{mb / 1024:.1f} GB" if mb >= 1024 else f"{mb:.0f} MB"
+
 # -------------------- Custom Input Dialog --------------------
 def custom_input_dialog(title, prompt, default=""):
     dialog = tk.Toplevel()
@@ -74,6 +111,195 @@ def custom_input_dialog(title, prompt, default=""):
     return result["value"]
 
 
+# -------------------- Virtualized Text View --------------------
+class VirtualText(ttk.Frame):
+    """
+    Editable view of a TextBuffer that only lays out a window of lines around
+    what is on screen and pages lines in as it scrolls, so a multi-hour
+    transcript costs Tk no more than a page of it. Views of one buffer share
+    its text; a hidden view catches up in refresh() once it is shown.
+    """
+
+    WINDOW = 150   # display lines rendered at a time
+    MARGIN = 0.15  # re-centre the window once the viewport is this close to its top or bottom
+
+    def __init__(self, master, buffer: TextBuffer):
+        super().__init__(master)
+        self.buffer = buffer
+        self.text = tk.Text(self, wrap="word")
+        self.scroll = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.text.configure(yscrollcommand=self._on_text_scroll)
+        self.text.grid(row=0, column=0, sticky="nsew")
+        self.scroll.grid(row=0, column=1, sticky="ns")
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+        self.text.tag_configure("soft")  # display-only line breaks (a space in the buffer)
+
+        self._start = self._end = 0      # buffer lines in the widget: [start, end)
+        self._changed_from: int | None = None  # first buffer line the widget hasn't caught up with
+        self._reset = False              # the whole text was replaced: go back to the top
+        self._dirty = False              # edits not written back to the buffer yet
+        self._writing = False
+        self._refresh_id = self._flush_id = self._recentre_id = None
+
+        buffer.subscribe(self._on_buffer_change)
+        buffer.add_flusher(self.flush)
+        self.text.bind("<<Modified>>", self._on_modified)
+        self._render(0, 0)
+
+    # ---- buffer -> widget ----
+    def _on_buffer_change(self, kind: str, first: int):
+        if self._writing:
+            return  # our own write-back: the widget already shows it
+        self._reset = self._reset or kind == "set"
+        self._changed_from = first if self._changed_from is None else min(first, self._changed_from)
+        if self._refresh_id is None and self.winfo_viewable():
+            self._refresh_id = self.after_idle(self.refresh)
+
+    def refresh(self):
+        """Catch up with buffer changes made while this view was hidden or busy."""
+        self._refresh_id = None
+        first, self._changed_from = self._changed_from, None
+        if first is None:
+            return
+        if self._reset:
+            self._reset = False
+            self._render(0, 0)
+        elif self._start <= first < self._end:
+            self._patch(first)
+        elif first < self._start:
+            self._render(self._start, *self._position())
+        else:
+            self._on_text_scroll(*self.text.yview())  # only the scrollbar moves
+
+    def _chunks(self, i: int, j: int) -> list:
+        """insert() arguments for buffer lines i..j: text, tags, text, tags, ..."""
+        lines, breaks = self.buffer.lines, self.buffer.breaks
+        args = []
+        for k in range(i, j):
+            args += [lines[k], ()]
+            if k < j - 1:
+                args += ["\n", ("soft",) if breaks[k] == " " else ()]
+        return args
+
+    def _window_start(self, start: int) -> int:
+        return max(0, min(start, len(self.buffer) - self.WINDOW))
+
+    def _render(self, start: int, top: int, offset: int = 0):
+        """Show the window beginning at buffer line start, scrolled to line top (plus offset pixels)."""
+        n = len(self.buffer)
+        cursor = self._cursor()
+        self._start = self._window_start(start)
+        self._end = min(n, self._start + self.WINDOW)
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", *self._chunks(self._start, self._end))
+        self.text.edit_modified(False)
+        if cursor is not None and self._start <= cursor[0] < self._end:
+            self.text.mark_set("insert", f"{cursor[0] - self._start + 1}.{cursor[1]}")
+        self.text.yview(f"{min(max(top, self._start), self._end - 1) - self._start + 1}.0")
+        if offset:
+            self.text.yview_scroll(offset, "pixels")  # keep a partly scrolled-off line in place
+
+    def _patch(self, first: int):
+        """Re-insert lines from first on (e.g. text appended while streaming)."""
+        end = min(len(self.buffer), self._start + self.WINDOW)
+        if end <= first:
+            self._render(self._start, *self._position())
+            return
+        self.text.delete(f"{first - self._start + 1}.0", "end")
+        self.text.insert("end-1c", *self._chunks(first, end))
+        self._end = end
+        self.text.edit_modified(False)
+
+    def _top_line(self) -> int:
+        return self._start + int(self.text.index("@0,0").split(".")[0]) - 1
+
+    def _position(self) -> tuple[int, int]:
+        """(top line, pixels of it scrolled off): where _render should put the view back."""
+        return self._top_line(), self._top_offset()
+
+    def _top_offset(self) -> int:
+        """Pixels of the top line (a wrapped paragraph) scrolled off above the viewport."""
+        top = self.text.index("@0,0")
+        info = self.text.dlineinfo(top)
+        if info is None:
+            return 0
+        above = self.text.count(f"{top.split('.')[0]}.0", top, "ypixels")  # a tuple, or None for 0
+        above = (above[0] if isinstance(above, tuple) else above) or 0
+        inset = sum(int(str(self.text.cget(k))) for k in ("borderwidth", "highlightthickness", "pady"))
+        return above + inset - info[1]
+
+    def _cursor(self) -> tuple[int, int] | None:
+        if self._end == self._start:
+            return None
+        line, col = map(int, self.text.index("insert").split("."))
+        return self._start + line - 1, col
+
+    # ---- scrolling ----
+    def _on_text_scroll(self, first, last):
+        first, last = float(first), float(last)
+        n, shown = len(self.buffer), max(1, self._end - self._start)
+        self.scroll.set((self._start + first * shown) / n, (self._start + last * shown) / n)
+        near_top = first < self.MARGIN and self._start > 0
+        near_end = last > 1 - self.MARGIN and self._end < n
+        if (near_top or near_end) and self._recentre_id is None:
+            self._recentre_id = self.after_idle(self._recentre)
+
+    def _recentre(self):
+        self._recentre_id = None
+        self.flush()
+        top, offset = self._position()
+        if self._window_start(top - self.WINDOW // 2) != self._start:  # else the whole window is on screen
+            self._render(top - self.WINDOW // 2, top, offset)
+
+    def _on_scrollbar(self, *args):
+        if args[0] != "moveto":
+            self.text.yview(*args)  # line and page steps scroll the window; paging follows
+            return
+        target = float(args[1]) * len(self.buffer)
+        if self._start <= target < self._end:
+            self.text.yview("moveto", (target - self._start) / max(1, self._end - self._start))
+        else:
+            self.flush()
+            self._render(int(target) - self.WINDOW // 2, int(target))
+
+    # ---- widget -> buffer ----
+    def _on_modified(self, _event=None):
+        if not self.text.edit_modified():
+            return  # the flag being cleared after a render or write-back
+        self._dirty = True
+        if self._flush_id is not None:
+            self.after_cancel(self._flush_id)
+        self._flush_id = self.after(500, self.flush)
+
+    def flush(self):
+        """Write edits made in the widget back to the buffer."""
+        if self._flush_id is not None:
+            self.after_cancel(self._flush_id)
+            self._flush_id = None
+        if not self._dirty:
+            return
+        self._dirty = False
+        ranges = self.text.tag_ranges("soft")
+        soft = set()
+        for a, b in zip(ranges[::2], ranges[1::2]):
+            soft.update(range(int(str(a).split(".")[0]), int(str(b).split(".")[0])))
+        rows = self.text.get("1.0", "end-1c").split("\n")
+        text = "".join(row + (" " if k in soft else "\n") for k, row in enumerate(rows[:-1], 1)) + rows[-1]
+
+        self._writing = True
+        try:
+            count = self.buffer.replace_lines(self._start, self._end, text)
+        finally:
+            self._writing = False
+        self._end = self._start + count
+        self.text.edit_modified(False)
+        lines = self.buffer.lines[self._start:self._end]
+        breaks = self.buffer.breaks[self._start:self._end - 1]
+        if lines != rows or [b == " " for b in breaks] != [k in soft for k in range(1, len(rows))]:
+            self._render(self._start, *self._position())  # re-split: keep widget lines == buffer lines
+
+
 class LectureApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -86,15 +312,52 @@ class LectureApp(tk.Tk):
         self.selected_folder: str | None = None
         self.selected_day: str | None = None
         self.model_var = tk.StringVar(value="base")
-        self.max_chunk = tk.IntVar(value=1000)
+        self.max_chunk = tk.IntVar(value=512)  # tokens per summarizer chunk
+        self.summary_mode = tk.StringVar(value="Per chunk")
+        self.summary_engine = tk.StringVar(value=next(iter(SUMMARY_ENGINES)))
+        self.inference_profile = tk.StringVar(value=next(
+            (label for label, name in INFERENCE_PROFILES.items() if name == INFERENCE_PROFILE), "Default"))
         self.font_size = tk.IntVar(value=12)
         self.current_audio = tk.StringVar(value="No file chosen")
         self.status = tk.StringVar(value="Ready.")
+        self.memory = tk.StringVar()
+
+        # worker threads never touch widgets; they post callables here instead
+        self._ui_queue: queue.Queue = queue.Queue()
+
+        # transcription/summarization run as queued jobs (see core.jobs)
+        self.jobs = get_scheduler()
+        self._watched: set[int] = set()  # jobs submitted from this window
+        self._job_messages: dict[int, str] = {}
+        # output watched jobs have streamed so far, replayed if their day is shown again before they finish
+        self._streamed: dict[int, dict[str, list[str]]] = {}
+
+        # saved days are read off the Tk thread; recently viewed ones stay in memory
+        self.days = DayCache()
+        self._shown_day: str | None = None  # day directory the editors show
+        self._shown_key: tuple | None = None
+        self._load_token = 0  # bumped per load so a slow read can't overwrite a newer one
 
         # UI
         self._setup_style()
         self._build_sidebar()
         self._build_main()
+        self.after(50, self._drain_ui_queue)
+        self._update_memory()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        self.jobs.subscribe(lambda job, event, data: self._post(self._on_job_event, job, event, data))
+        self.jobs.start()  # also resumes jobs left unfinished last time
+
+    def _on_close(self):
+        active = self.jobs.active()
+        if active and not messagebox.askokcancel(
+            "Quit", f"{len(active)} job(s) still queued or running.\nThey will resume next time the app starts."
+        ):
+            return
+        self.jobs.stop()
+        flush_state()
+        self.destroy()
 
     # -------------------- Styling --------------------
     def _setup_style(self):
@@ -144,6 +407,20 @@ class LectureApp(tk.Tk):
         header.pack(fill=tk.X, padx=10, pady=(10, 6))
         ttk.Label(header, text="Classes", font=("Segoe UI Semibold", 11), background=COLORS["WHITE"]).pack(anchor="w")
 
+        # full-text search over saved transcripts and summaries
+        self.search_var = tk.StringVar()
+        search = ttk.Entry(header, textvariable=self.search_var)
+        search.pack(fill=tk.X, pady=(6, 0))
+        search.bind("<Return>", self._on_search)
+        search.bind("<Escape>", lambda _e: self._clear_search())
+        self.search_results = tk.Listbox(
+            header, height=6, activestyle="none", relief="flat",
+            highlightthickness=1, highlightbackground=COLORS["BORDER"],
+        )
+        self.search_results.bind("<Double-1>", self._open_search_hit)
+        self.search_results.bind("<Return>", self._open_search_hit)
+        self._search_hits = []
+
         treewrap = ttk.Frame(card, style="Sidebar.TFrame")
         treewrap.pack(fill=tk.BOTH, expand=True, padx=8)
 
@@ -165,6 +442,7 @@ class LectureApp(tk.Tk):
 
         self.menu_day = tk.Menu(self, tearoff=0)
         self.menu_day.add_command(label="Open Folder", command=self._open_selected_day_folder)
+        self.menu_day.add_command(label="Related", command=self._show_related)
         self.menu_day.add_command(label="Rename Day", command=self._rename_day)
         self.menu_day.add_command(label="Delete Day…", command=self._delete_day)
 
@@ -176,6 +454,7 @@ class LectureApp(tk.Tk):
         self.menu_class.add_command(label="Delete Class…", command=self._delete_class)
 
         self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<<TreeviewOpen>>", self._on_tree_open)
         self.tree.bind("<Button-3>", self._on_right_click)
         self.tree.bind("<Double-1>", self._on_double_click)
 
@@ -187,46 +466,101 @@ class LectureApp(tk.Tk):
 
         self._refresh_tree()
 
+    # Tree items are keyed (class,), (class, folder), (class, folder, note), or
+    # (class, None, note) for notes directly under a class. Containers start
+    # collapsed with a placeholder child and are filled on <<TreeviewOpen>>.
     def _refresh_tree(self):
         self.tree.delete(*self.tree.get_children())
-        for cname, data in STATE["classes"].items():
-            class_id = self.tree.insert("", "end", text=cname, open=True)
-
-            # show notes directly under class
-            for nname in data.get("notes", []):
-                self.tree.insert(class_id, "end", text=nname)
-
-            # show folders and their notes
-            folders = data.get("folders", {})
-            STATE["classes"][cname]["folders"] = folders
-            for fname, notes in folders.items():
-                folder_id = self.tree.insert(class_id, "end", text=fname, open=True)
-                for nname in notes:
-                    self.tree.insert(folder_id, "end", text=nname)
-
-
+        self._tree_ids: dict[tuple, str] = {}
+        self._tree_keys: dict[str, tuple] = {}
+        self._unpopulated: set[str] = set()
+        for cname in STATE["classes"]:
+            self._tree_add((cname,), "", "end")
+
+    def _tree_add(self, key: tuple, parent: str, index) -> str:
+        item = self.tree.insert(parent, index, text=key[-1])
+        self._tree_ids[key] = item
+        self._tree_keys[item] = key
+        if self._tree_children(key):
+            self.tree.insert(item, "end", text="")  # placeholder so the item can expand
+            self._unpopulated.add(item)
+        return item
+
+    def _tree_children(self, key: tuple) -> list[tuple]:
+        """Keys of the children of a tree key, in display order."""
+        if len(key) == 1:
+            data = STATE["classes"][key[0]]
+            folders = data.setdefault("folders", {})
+            # show notes directly under class, then folders
+            return [(key[0], None, n) for n in data.get("notes", [])] + [(key[0], f) for f in folders]
+        if len(key) == 2:
+            return [(key[0], key[1], n) for n in STATE["classes"][key[0]]["folders"][key[1]]]
+        return []
+
+    def _populate(self, item: str):
+        if item not in self._unpopulated:
+            return
+        self._unpopulated.discard(item)
+        self.tree.delete(*self.tree.get_children(item))
+        for key in self._tree_children(self._tree_keys[item]):
+            self._tree_add(key, item, "end")
+
+    def _on_tree_open(self, _event):
+        self._populate(self.tree.focus())
+
+    def _tree_insert(self, key: tuple, index="end"):
+        """Show a newly added class, folder or note."""
+        if len(key) == 1:
+            self._tree_add(key, "", index)
+            return
+        parent = self._tree_ids[key[:2] if len(key) == 3 and key[1] is not None else key[:1]]
+        if parent not in self._unpopulated:  # otherwise it appears when expanded
+            self._tree_add(key, parent, index)
+
+    def _tree_rename(self, old_key: tuple, new_key: tuple):
+        item = self._tree_ids[old_key]
+        self.tree.item(item, text=new_key[-1])
+        # re-key the item and everything already populated below it
+        stack = [(item, new_key)]
+        while stack:
+            it, key = stack.pop()
+            del self._tree_ids[self._tree_keys[it]]
+            self._tree_ids[key] = it
+            self._tree_keys[it] = key
+            if it not in self._unpopulated:
+                stack.extend((c, key + self._tree_keys[c][len(key):]) for c in self.tree.get_children(it))
+
+    def _tree_remove(self, key: tuple):
+        item = self._tree_ids.get(key)
+        if item is None:
+            return
+        stack = [item]
+        while stack:
+            it = stack.pop()
+            self._tree_ids.pop(self._tree_keys.pop(it, None), None)
+            self._unpopulated.discard(it)
+            stack.extend(self.tree.get_children(it))
+        self.tree.delete(item)
 
     def _on_select(self, _event):
         selection = self.tree.selection()
         if not selection:  # ✅ nothing selected, bail out
             return
 
-        node = selection[0]
-        parent = self.tree.parent(node)
-        gparent = self.tree.parent(parent)
+        key = self._tree_keys.get(selection[0])
+        if key is None:
+            return
+        if len(key) == 3 and key != self._shown_key and (self.transcript.modified or self.summary.modified):
+            if not messagebox.askyesno("Unsaved Edits", "Discard your edits to the text shown?"):
+                if self._shown_key in self._tree_ids:
+                    self.tree.selection_set(self._tree_ids[self._shown_key])
+                return
 
-        if gparent:  # note inside folder
-            self.selected_class = self.tree.item(gparent, "text")
-            self.selected_folder = self.tree.item(parent, "text")
-            self.selected_day = self.tree.item(node, "text")
-        elif parent:  # folder selected
-            self.selected_class = self.tree.item(parent, "text")
-            self.selected_folder = self.tree.item(node, "text")
-            self.selected_day = None
-        else:  # class selected
-            self.selected_class = self.tree.item(node, "text")
-            self.selected_folder = None
-            self.selected_day = None
+        self.selected_class = key[0]
+        self.selected_folder = key[1] if len(key) > 1 else None
+        self.selected_day = key[2] if len(key) == 3 else None
+        if self.selected_day is not None and key != self._shown_key:
+            self._show_day(key)
 
     def _on_right_click(self, event):
         item = self.tree.identify_row(event.y)
@@ -277,16 +611,20 @@ class LectureApp(tk.Tk):
         if new_name and new_name.strip():
             days = STATE["classes"][cname]["folders"][self.tree.item(parent, "text")]
             idx = days.index(old_name)
-            old_dir = Path("data") / cname / old_name
-            new_dir = Path("data") / cname / new_name
+            old_dir = DATA_DIR / cname / old_name
+            new_dir = DATA_DIR / cname / new_name
             try:
                 if old_dir.exists() and not new_dir.exists():
                     old_dir.rename(new_dir)
             except Exception as e:
                 messagebox.showwarning("Rename Warning", f"Renamed in app, but folder rename failed:\n{e}")
             days[idx] = new_name
-            save_state(STATE)
-            self._refresh_tree()
+            save_class(STATE, cname)
+            forget_day(cname, old_name)
+            if new_dir.exists():
+                reindex_day(new_dir)
+            folder = self.tree.item(parent, "text")
+            self._tree_rename((cname, folder, old_name), (cname, folder, new_name))
 
     def _rename_class(self):
         node = self.tree.selection()[0]
@@ -296,16 +634,19 @@ class LectureApp(tk.Tk):
         old_name = self.tree.item(node, "text")
         new_name = custom_input_dialog("Rename Class", f"Rename '{old_name}' to:", old_name)
         if new_name and new_name.strip() and new_name not in STATE["classes"]:
-            old_dir = Path("data") / old_name
-            new_dir = Path("data") / new_name
+            old_dir = DATA_DIR / old_name
+            new_dir = DATA_DIR / new_name
             try:
                 if old_dir.exists() and not new_dir.exists():
                     old_dir.rename(new_dir)
             except Exception as e:
                 messagebox.showwarning("Rename Warning", f"Renamed in app, but folder rename failed:\n{e}")
             STATE["classes"][new_name] = STATE["classes"].pop(old_name)
-            save_state(STATE)
-            self._refresh_tree()
+            self._reindex_class(old_name, new_name)
+            save_class(STATE, old_name)
+            save_class(STATE, new_name)
+            self._tree_rename((old_name,), (new_name,))
+            self.tree.move(node, "", "end")  # renamed classes move to the end, as in STATE
         elif new_name in STATE["classes"]:
             messagebox.showerror("Error", "A class with that name already exists.")
 
@@ -319,17 +660,19 @@ class LectureApp(tk.Tk):
         dname = self.tree.item(node, "text")
         if not messagebox.askyesno("Delete Day", f"Remove '{dname}' from {cname}?"):
             return
-        days = STATE["classes"][cname]["folders"][self.tree.item(parent, "text")]
+        folder = self.tree.item(parent, "text")
+        days = STATE["classes"][cname]["folders"][folder]
         if dname in days:
             days.remove(dname)
-            save_state(STATE)
-        day_dir = Path("data") / cname / dname
+            save_class(STATE, cname)
+            forget_day(cname, dname)
+        self._tree_remove((cname, folder, dname))
+        day_dir = DATA_DIR / cname / dname
         if day_dir.exists() and messagebox.askyesno("Delete Files", f"Also delete files in:\n{day_dir}?"):
             try:
                 shutil.rmtree(day_dir)
             except Exception as e:
                 messagebox.showwarning("Delete Warning", f"Could not delete folder:\n{e}")
-        self._refresh_tree()
 
     def _delete_folder(self):
         node = self.tree.selection()[0]
@@ -350,9 +693,9 @@ class LectureApp(tk.Tk):
         folders = STATE["classes"][cname].get("folders", {})
         if folder_name in folders:
             del folders[folder_name]
-            save_state(STATE)
+            save_class(STATE, cname)
 
-        self._refresh_tree()
+        self._tree_remove((cname, folder_name))
 
     def _delete_class(self):
         node = self.tree.selection()[0]
@@ -363,14 +706,15 @@ class LectureApp(tk.Tk):
         if not messagebox.askyesno("Delete Class", f"Remove class '{cname}' from the app?"):
             return
         STATE["classes"].pop(cname, None)
-        save_state(STATE)
-        class_dir = Path("data") / cname
+        save_class(STATE, cname)
+        forget_day(cname)
+        self._tree_remove((cname,))
+        class_dir = DATA_DIR / cname
         if class_dir.exists() and messagebox.askyesno("Delete Files", f"Also delete ALL files in:\n{class_dir}?"):
             try:
                 shutil.rmtree(class_dir)
             except Exception as e:
                 messagebox.showwarning("Delete Warning", f"Could not delete folder:\n{e}")
-        self._refresh_tree()
         self.selected_class, self.selected_folder, self.selected_day = None, None, None
 
     def _add_class(self):
@@ -382,8 +726,8 @@ class LectureApp(tk.Tk):
             return
         STATE["classes"][name] = {"folders": {}}
         ensure_class_dir(name)
-        save_state(STATE)
-        self._refresh_tree()
+        save_class(STATE, name)
+        self._tree_insert((name,))
 
     def _add_folder(self):
         if not self.selected_class:
@@ -400,8 +744,8 @@ class LectureApp(tk.Tk):
             return
 
         folders[folder_name] = []
-        save_state(STATE)
-        self._refresh_tree()
+        save_class(STATE, self.selected_class)
+        self._tree_insert((self.selected_class, folder_name))
 
     def _add_notes(self):
         if not self.selected_class:
@@ -416,6 +760,7 @@ class LectureApp(tk.Tk):
             if not note_name:
                 return
             folder_days.append(note_name)
+            key, index = (self.selected_class, self.selected_folder, note_name), "end"
         else:
             # No folder, put notes directly under class
             class_days = STATE["classes"][self.selected_class].setdefault("notes", [])
@@ -424,10 +769,146 @@ class LectureApp(tk.Tk):
             if not note_name:
                 return
             class_days.append(note_name)
+            # class-level notes are listed before the folders
+            key, index = (self.selected_class, None, note_name), len(class_days) - 1
 
         ensure_day_dir(self.selected_class, note_name)
-        save_state(STATE)
-        self._refresh_tree()
+        save_class(STATE, self.selected_class)
+        self._tree_insert(key, index)
+
+    # -------------------- Saved Days --------------------
+    def _show_day(self, key: tuple):
+        """Show the selected day's saved transcript, summary and audio (read in the background unless cached)."""
+        day_dir = str(self._day_dir())
+        self._load_token += 1
+        token = self._load_token
+        day = self.days.get(day_dir)
+        if day is not None:
+            self._apply_day(token, key, day_dir, day)
+            return
+
+        loading = f"Loading {key[-1]}…"
+        self.status.set(loading)
+
+        def work():
+            try:
+                day = self.days.load(day_dir)
+            except Exception as e:
+                self._post(self.status.set, f"Load error: {e}")
+                return
+            self._post(self._apply_day, token, key, day_dir, day, loading)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def _apply_day(self, token: int, key: tuple, day_dir: str, day, loading: str = ""):
+        if loading and self.status.get() == loading:
+            self.status.set("Ready.")
+        if token != self._load_token:
+            return  # another day was selected (or a job started) meanwhile
+        self._shown_day, self._shown_key = day_dir, key
+        self.transcript.set_lines(*day.transcript)
+        self.summary.set_lines(*day.summary)
+        for job in self.jobs.active():
+            streamed = self._streamed.get(job.id)
+            if streamed is not None and job.params.get("day_dir") == day_dir:
+                # the saved text is about to be replaced: show the job's output instead, as when it was submitted
+                if "transcript" in streamed:
+                    self.transcript.set_text(" ".join(streamed["transcript"]))
+                if "summary" in streamed:
+                    self.summary.set_text("\n\n".join(streamed["summary"]))
+        meta = day.meta
+        if meta is not None and meta.audio_path:
+            self.current_audio.set(f"{Path(meta.audio_path).name} ({meta.whisper_model}, {meta.transcribed_at})")
+            if Path(meta.audio_path).exists():
+                self._chosen_path = meta.audio_path  # so the day can be processed again as is
+
+    # -------------------- Search --------------------
+    def _on_search(self, _event=None):
+        query = self.search_var.get().strip()
+        if not query:
+            self._clear_search()
+            return
+        self._search_hits = get_index().search(query, limit=20)
+        self.search_results.delete(0, tk.END)
+        for hit in self._search_hits:
+            self.search_results.insert(tk.END, f"{hit.class_name} › {hit.day} ({hit.field}): {hit.snippet}")
+        if not self._search_hits:
+            self.search_results.insert(tk.END, "No matches.")
+        self.search_results.pack(fill=tk.X, pady=(4, 0))
+
+    def _clear_search(self):
+        self.search_var.set("")
+        self._search_hits = []
+        self.search_results.delete(0, tk.END)
+        self.search_results.pack_forget()
+
+    def _open_search_hit(self, _event=None):
+        sel = self.search_results.curselection()
+        if sel and sel[0] < len(self._search_hits):
+            hit = self._search_hits[sel[0]]
+            self._reveal_day(hit.class_name, hit.day)
+
+    def _reveal_day(self, cname: str, day: str):
+        """Expand the tree down to a day and select it."""
+        data = STATE["classes"].get(cname)
+        if data is None:
+            return
+        if day in data.get("notes", []):
+            key = (cname, None, day)
+        else:
+            folder = next((f for f, days in data.get("folders", {}).items() if day in days), None)
+            if folder is None:
+                return
+            key = (cname, folder, day)
+        for parent in ((cname,), key[:2]) if key[1] is not None else ((cname,),):
+            item = self._tree_ids[parent]
+            self._populate(item)
+            self.tree.item(item, open=True)
+        item = self._tree_ids[key]
+        self.tree.selection_set(item)
+        self.tree.see(item)
+
+    def _show_related(self):
+        """List the days most similar to the selected one, across all classes."""
+        node = self.tree.selection()[0]
+        parent = self.tree.parent(node)
+        gparent = self.tree.parent(parent)
+        cname = self.tree.item(gparent or parent, "text")
+        dname = self.tree.item(node, "text")
+        related = get_related_index().related(cname, dname, k=10)
+        if not related:
+            messagebox.showinfo("Related", f"No related lectures found for '{dname}'.\n(Transcribe it first.)")
+            return
+
+        dialog = tk.Toplevel(self)
+        dialog.title(f"Related to {cname} › {dname}")
+        dialog.geometry("420x260")
+        listbox = tk.Listbox(dialog, activestyle="none", font=("Segoe UI", 10))
+        listbox.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
+        for other_class, other_day, score in related:
+            listbox.insert(tk.END, f"{other_class} › {other_day}  ({score:.0%})")
+
+        def open_hit(_event=None):
+            sel = listbox.curselection()
+            if sel:
+                other_class, other_day, _ = related[sel[0]]
+                dialog.destroy()
+                self._reveal_day(other_class, other_day)
+
+        listbox.bind("<Double-Button-1>", open_hit)
+        listbox.bind("<Return>", open_hit)
+
+    def _reindex_class(self, old_name: str, new_name: str):
+        """Move a renamed class's days to their new name in the indexes (off the Tk thread)."""
+        def work():
+            forget_day(old_name)
+            class_dir = DATA_DIR / new_name
+            if class_dir.exists():
+                for day_dir in class_dir.iterdir():
+                    if day_dir.is_dir():
+                        reindex_day(day_dir)
+
+        threading.Thread(target=work, daemon=True).start()
 
     # -------------------- Main Area: Notebook + Status --------------------
     def _build_main(self):
@@ -437,9 +918,15 @@ class LectureApp(tk.Tk):
         self.notebook = ttk.Notebook(right)
         self.notebook.pack(fill=tk.BOTH, expand=True)
 
+        # one copy of each text, shown by the tab's view and the Split View's
+        self.transcript = TextBuffer()
+        self.summary = TextBuffer()
+        self._views: list[VirtualText] = []
+
         self._build_transcript_tab()
         self._build_summary_tab()
         self._build_split_tab()
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
         statusbar = ttk.Frame(right)
         statusbar.pack(fill=tk.X, pady=(6, 0))
@@ -447,6 +934,8 @@ class LectureApp(tk.Tk):
         self.status_lbl.pack(side=tk.LEFT, padx=4)
         self.progress = ttk.Progressbar(statusbar, mode="indeterminate", length=200)
         self.progress.pack(side=tk.RIGHT, padx=4)
+        ttk.Button(statusbar, text="Cancel", command=self._cancel_jobs).pack(side=tk.RIGHT, padx=4)
+        ttk.Label(statusbar, textvariable=self.memory, foreground=COLORS["MUTED"]).pack(side=tk.RIGHT, padx=8)
 
     def _build_transcript_tab(self):
         frame = ttk.Frame(self.notebook, style="Card.TFrame", padding=12)
@@ -457,48 +946,78 @@ class LectureApp(tk.Tk):
         ttk.Label(frame, textvariable=self.current_audio, foreground=COLORS["MUTED"]).pack(anchor="w", pady=(0, 10))
 
         ttk.Label(frame, text="Whisper Model").pack(anchor="w")
-        ttk.Combobox(frame, textvariable=self.model_var, values=["tiny", "base", "small", "medium", "large"], state="readonly")\
-            .pack(anchor="w", pady=4)
+        model_box = ttk.Combobox(frame, textvariable=self.model_var, values=["tiny", "base", "small", "medium", "large"], state="readonly")
+        model_box.pack(anchor="w", pady=4)
+        # load the newly picked model in the background before Transcribe is clicked
+        model_box.bind("<<ComboboxSelected>>", lambda _e: prewarm_model(self.model_var.get()))
 
         ttk.Button(frame, text="Transcribe Audio", command=self._transcribe, style="Accent.TButton")\
-            .pack(fill=tk.X, pady=10)
+            .pack(fill=tk.X, pady=(10, 4))
+        # transcribe and summarize together, using the Summary tab's settings
+        ttk.Button(frame, text="Process Lecture", command=self._process_lecture)\
+            .pack(fill=tk.X, pady=(0, 10))
 
-        self.transcript_txt = tk.Text(frame, wrap="word")
-        self._style_text(self.transcript_txt)
-        self.transcript_txt.pack(fill=tk.BOTH, expand=True)
+        self._add_view(frame, self.transcript)
 
     def _build_summary_tab(self):
         frame = ttk.Frame(self.notebook, style="Card.TFrame", padding=12)
         self.notebook.add(frame, text="Summary")
 
-        ttk.Label(frame, text="Max Chunk Length").pack(anchor="w")
-        ttk.Scale(frame, from_=300, to=2000, variable=self.max_chunk, orient="horizontal").pack(fill=tk.X, pady=6)
+        ttk.Label(frame, text="Max Chunk Length (tokens)").pack(anchor="w")
+        ttk.Scale(frame, from_=128, to=1024, variable=self.max_chunk, orient="horizontal").pack(fill=tk.X, pady=6)
+
+        ttk.Label(frame, text="Summary Mode").pack(anchor="w")
+        ttk.Combobox(frame, textvariable=self.summary_mode, values=["Per chunk", "Hierarchical"], state="readonly")\
+            .pack(anchor="w", pady=4)
+
+        ttk.Label(frame, text="Engine").pack(anchor="w")
+        ttk.Combobox(frame, textvariable=self.summary_engine, values=list(SUMMARY_ENGINES), state="readonly")\
+            .pack(anchor="w", pady=4)
+
+        ttk.Label(frame, text="CPU Profile").pack(anchor="w")
+        ttk.Combobox(frame, textvariable=self.inference_profile, values=list(INFERENCE_PROFILES), state="readonly")\
+            .pack(anchor="w", pady=4)
 
         ttk.Button(frame, text="Summarize Text", command=self._summarize, style="Accent.TButton")\
             .pack(fill=tk.X, pady=10)
 
-        self.summary_txt = tk.Text(frame, wrap="word")
-        self._style_text(self.summary_txt)
-        self.summary_txt.pack(fill=tk.BOTH, expand=True)
+        self._add_view(frame, self.summary)
 
     def _build_split_tab(self):
-        frame = ttk.Frame(self.notebook, style="Card.TFrame", padding=12)
-        self.notebook.add(frame, text="Split View")
-
-        left = ttk.Frame(frame, padding=8)
-        right = ttk.Frame(frame, padding=8)
+        # the views are only created the first time the tab is selected
+        self.split_frame = ttk.Frame(self.notebook, style="Card.TFrame", padding=12)
+        self.notebook.add(self.split_frame, text="Split View")
+        self._split_built = False
+
+    def _fill_split_tab(self):
+        self._split_built = True
+        left = ttk.Frame(self.split_frame, padding=8)
+        right = ttk.Frame(self.split_frame, padding=8)
         left.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         right.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         ttk.Label(left, text="Transcript").pack(anchor="w")
-        self.transcript_txt_split = tk.Text(left, wrap="word")
-        self._style_text(self.transcript_txt_split)
-        self.transcript_txt_split.pack(fill=tk.BOTH, expand=True)
-
+        self._add_view(left, self.transcript)
         ttk.Label(right, text="Summary").pack(anchor="w")
-        self.summary_txt_split = tk.Text(right, wrap="word")
-        self._style_text(self.summary_txt_split)
-        self.summary_txt_split.pack(fill=tk.BOTH, expand=True)
+        self._add_view(right, self.summary)
+
+    def _add_view(self, parent, buffer: TextBuffer) -> VirtualText:
+        view = VirtualText(parent, buffer)
+        self._style_text(view.text)
+        view.pack(fill=tk.BOTH, expand=True)
+        self._views.append(view)
+        return view
+
+    def _on_tab_changed(self, _event=None):
+        """Views render lazily: bring the ones now on screen up to date."""
+        if self.notebook.select() == str(self.split_frame) and not self._split_built:
+            self._fill_split_tab()
+        self.update_idletasks()  # so winfo_viewable() reflects the new tab
+        for view in self._views:
+            if view.winfo_viewable():
+                view.refresh()
+            else:
+                view.flush()
 
     def _style_text(self, widget: tk.Text):
         widget.configure(
@@ -524,6 +1043,24 @@ class LectureApp(tk.Tk):
             if msg:
                 self.status.set(msg)
 
+    # -------------------- Thread-safe UI updates --------------------
+    def _post(self, fn, *args):
+        """Run fn(*args) on the Tk thread (safe to call from any thread)."""
+        self._ui_queue.put((fn, args))
+
+    def _drain_ui_queue(self):
+        try:
+            while True:
+                fn, args = self._ui_queue.get_nowait()
+                try:
+                    fn(*args)
+                except Exception as e:  # one bad update must not stop the ones after it
+                    print("UI update error:", e)
+        except queue.Empty:
+            pass
+        finally:
+            self.after(50, self._drain_ui_queue)
+
     # -------------------- Actions --------------------
     def _choose_audio(self):
         path = filedialog.askopenfilename(
@@ -542,51 +1079,150 @@ class LectureApp(tk.Tk):
             messagebox.showerror("Error", "Choose an audio file first.")
             return
 
-        def work():
-            try:
-                self._busy(True, "Transcribing…")
-                text = transcribe_file(self._chosen_path, model_name=self.model_var.get())
-                for w in (self.transcript_txt, self.transcript_txt_split):
-                    w.delete("1.0", tk.END)
-                    w.insert(tk.END, text)
-                self._busy(False, "Transcription complete.")
-            except Exception as e:
-                self._busy(False, "Error")
-                messagebox.showerror("Transcription Error", str(e))
+        self.transcript.set_text("")
+        self._submit("transcribe", {
+            "day_dir": str(self._day_dir()),
+            "audio_path": self._chosen_path,
+            "model_name": self.model_var.get(),
+        })
 
-        threading.Thread(target=work, daemon=True).start()
+    def _process_lecture(self):
+        if not (self.selected_class and self.selected_day):
+            messagebox.showerror("Error", "Select a class and day first.")
+            return
+        if not hasattr(self, "_chosen_path"):
+            messagebox.showerror("Error", "Choose an audio file first.")
+            return
+
+        self.transcript.set_text("")
+        self.summary.set_text("")
+        self._submit("process_lecture", {
+            "day_dir": str(self._day_dir()),
+            "audio_path": self._chosen_path,
+            "model_name": self.model_var.get(),
+            **self._summary_options(),
+        })
 
     def _summarize(self):
         if not (self.selected_class and self.selected_day):
             messagebox.showerror("Error", "Select a class and day first.")
             return
-        transcript = self.transcript_txt.get("1.0", tk.END).strip()
+        transcript = self.transcript.text().strip()
         if not transcript:
             messagebox.showerror("Error", "No transcript to summarize yet.")
             return
 
-        def work():
-            try:
-                self._busy(True, "Summarizing…")
-                chunks = chunk_text(transcript, max_chars=int(self.max_chunk.get()))
-                results = [summarize_text(c) for c in chunks]
-                summary = "\n\n".join(results)
-
-                for w in (self.summary_txt, self.summary_txt_split):
-                    w.delete("1.0", tk.END)
-                    w.insert(tk.END, summary)
-
-                day_dir = Path("data") / self.selected_class / self.selected_day
-                save_texts(day_dir, transcript, summary)
-                if hasattr(self, "_chosen_path"):
-                    save_meta(day_dir, self._chosen_path, self.model_var.get())
-                self._busy(False, "Summary complete.")
-            except Exception as e:
-                self._busy(False, "Error")
-                messagebox.showerror("Summarization Error", str(e))
-
-        threading.Thread(target=work, daemon=True).start()
+        # the job reads the (possibly edited) transcript from the day dir rather than the journal
+        day_dir = ensure_day_dir(self.selected_class, self.selected_day)
+        save_transcript(day_dir, transcript, index=False)  # the job indexes it with the summary
+        # summaries are quick next to transcription, so they jump the queue
+        self._submit("summarize", {
+            "day_dir": str(day_dir),
+            "audio_path": getattr(self, "_chosen_path", None),
+            "model_name": self.model_var.get(),
+            **self._summary_options(),
+        }, priority=1)
+
+    def _day_dir(self) -> Path:
+        return DATA_DIR / self.selected_class / self.selected_day
+
+    def _summary_options(self) -> dict:
+        return {
+            "max_chunk": int(self.max_chunk.get()),
+            "mode": "hierarchical" if self.summary_mode.get() == "Hierarchical" else "concat",
+            "engine": SUMMARY_ENGINES[self.summary_engine.get()],
+            "profile": INFERENCE_PROFILES[self.inference_profile.get()],
+        }
+
+    # -------------------- Jobs --------------------
+    def _submit(self, kind: str, params: dict, priority: int = 0):
+        """Queue a job; its output streams into the editors (see _on_job_event)."""
+        job = self.jobs.submit(kind, params, priority)
+        self._watched.add(job.id)
+        self._streamed[job.id] = {editor: [] for editor in JOB_STREAMS.get(kind, ())}
+        # the editors now belong to this job's output, not to a day still loading
+        self._load_token += 1
+        self._shown_day = params["day_dir"]
+        self._shown_key = self._tree_keys.get(self.tree.selection()[0]) if self.tree.selection() else None
+
+    def _cancel_jobs(self):
+        """Cancel queued and running jobs for the selected day (or all of them)."""
+        day_dir = str(self._day_dir()) if self.selected_class and self.selected_day else None
+        for job in self.jobs.active():
+            if day_dir is None or job.params.get("day_dir") == day_dir:
+                self.jobs.cancel(job.id)
+
+    def _on_job_event(self, job, event: str, data):
+        """Runs on the Tk thread for every job event (posted by the subscriber)."""
+        if event == "status":
+            self._on_job_status(job, data)
+            return
+        if event == "message":
+            self._job_messages[job.id] = data
+            return
+        self._record_stream(job, event, data)
+        if job.id not in self._watched or job.params.get("day_dir") != self._shown_day:
+            return  # resumed from an earlier session, or another day is shown: results go to disk only
+        if event == "segment":
+            self.transcript.append(data)
+        elif event == "chunk_summary":
+            index, text = data
+            self.summary.append(text, "\n\n")
+        elif event == "summary":
+            self.summary.set_text(data)
+
+    def _record_stream(self, job, event: str, data):
+        """Keep a watched job's streamed output, for _apply_day to replay."""
+        streamed = self._streamed.get(job.id)
+        if streamed is None:
+            return
+        if event == "segment" and "transcript" in streamed:
+            streamed["transcript"].append(data)
+        elif event == "chunk_summary" and "summary" in streamed:
+            streamed["summary"].append(data[1])
+        elif event == "summary" and "summary" in streamed:
+            streamed["summary"][:] = [data]
+
+    def _update_memory(self):
+        """Refresh the status bar's memory readout (models unload on their own; see core.governor)."""
+        models = get_governor().usage()
+        text = "No models loaded"
+        if models:
+            total = sum(mb for _, mb in models)
+            text = f"Models {_format_mb(total)} ({', '.join(label for label, _ in reversed(models))})"
+        rss = process_rss_mb()
+        if rss is not None:
+            text += f" · RAM {_format_mb(rss)}"
+        self.memory.set(text)
+        self.after(2000, self._update_memory)
+
+    def _on_job_status(self, job, status: str):
+        active = self.jobs.active()
+        queued = sum(j.status == "queued" for j in active)
+        waiting = f" ({queued} queued)" if queued else ""
+        if status == "running":
+            self._busy(True, f"{JOB_LABELS.get(job.kind, job.kind)}…{waiting}")
+            return
+        if status == "queued":
+            if any(j.status == "running" for j in active):
+                self.status.set(f"Queued {JOB_LABELS.get(job.kind, job.kind).lower()}{waiting}.")
+            return
 
+        msg = self._job_messages.pop(job.id, "")
+        if status == "cancelled":
+            msg = f"{JOB_LABELS.get(job.kind, job.kind)} cancelled."
+        elif status == "failed":
+            msg = "Error"
+        run = metrics.last_run(job=job.id)
+        if status == "done" and run is not None:
+            msg = f"{msg} [{metrics.summarize_run(run)}]".strip()
+        self._busy(bool(active), msg + waiting if active else msg)
+        if status == "done" and job.kind == "summarize" and job.params.get("day_dir") == self._shown_day:
+            self.transcript.modified = False  # the job saved the edited transcript
+        if status == "failed" and job.id in self._watched:
+            messagebox.showerror(f"{JOB_LABELS.get(job.kind, job.kind)} Error", job.error)
+        self._watched.discard(job.id)
+        self._streamed.pop(job.id, None)
 
 if __name__ == "__main__":
     app = LectureApp()
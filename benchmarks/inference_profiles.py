@@ -0,0 +1,157 @@
+"""
+Benchmark the CPU inference profiles on the same synthetic transcript.
+
+Each profile runs in a fresh process (torch's inter-op thread count can only
+be set once per process) and reports model load time, latency per chunk,
+throughput over all chunks, and ROUGE-1/ROUGE-L F1 of its summaries against
+the first profile's, i.e. how far quantization moves the output. Quantized
+profiles load twice: once building the int8 copy, once from the cached copy.
+
+By default a tiny randomly initialised BART with a vocabulary built from the
+transcript stands in for the real model, so the run needs no download and
+takes seconds; its summaries are gibberish, but its drift between profiles is
+still measured the same way. Pass --real to use the app's model.
+
+Run from the repo root:
+    python -m benchmarks.inference_profiles --profiles default,throughput,int8
+    python -m benchmarks.inference_profiles --real --minutes 30
+"""
+import argparse
+import multiprocessing
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from benchmarks.summarize import make_transcript
+
+MAX_LENGTH, MIN_LENGTH = 150, 40
+
+# ---------------- Stand-in Model ---------------- #
+def make_stand_in(path: Path, text: str):
+    """Save a small random BART and a word-level tokenizer for text's vocabulary to path."""
+    import torch  # type: ignore
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers  # type: ignore
+    from transformers import BartConfig, BartForConditionalGeneration, PreTrainedTokenizerFast  # type: ignore
+
+    specials = ["<pad>", "<s>", "</s>", "<unk>"]
+    words = sorted(set(text.lower().replace(".", " ").split())) + ["."]
+    tok = Tokenizer(models.WordLevel({w: i for i, w in enumerate(specials + words)}, unk_token="<unk>"))
+    tok.normalizer = normalizers.Lowercase()
+    tok.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=tok, model_max_length=1024,
+        pad_token="<pad>", bos_token="<s>", eos_token="</s>", unk_token="<unk>",
+    )
+
+    torch.manual_seed(0)
+    config = BartConfig(
+        vocab_size=len(specials) + len(words), d_model=256,
+        encoder_layers=2, decoder_layers=2, encoder_attention_heads=4, decoder_attention_heads=4,
+        encoder_ffn_dim=1024, decoder_ffn_dim=1024, max_position_embeddings=1024,
+        pad_token_id=0, bos_token_id=1, eos_token_id=2, decoder_start_token_id=2, forced_eos_token_id=2,
+    )
+    BartForConditionalGeneration(config).save_pretrained(path)
+    tokenizer.save_pretrained(path)
+
+# ---------------- One Profile ---------------- #
+def run_profile(profile: str, model_name: str, text: str, models_dir: str, max_chunk: int, batch_size: int) -> dict:
+    """Load the model under a profile and summarize every chunk of text (runs in a worker process)."""
+    from core.services import profiles, summarizer
+
+    summarizer.MODEL_NAME = model_name
+    profiles.MODELS_DIR = Path(models_dir)  # keep benchmark copies out of the app's data dir
+    summarizer.set_profile(profile)
+    engine = summarizer.get_engine("bart")
+    chunks = summarizer._chunks(text, max_chunk, 0, engine)
+
+    loads = []
+    for _ in range(2 if summarizer.current_profile().quantize else 1):
+        summarizer._summarizer = None
+        start = time.perf_counter()
+        summarizer._lazy_summarizer()
+        loads.append(time.perf_counter() - start)
+
+    summarizer.run_pipeline(chunks[:1], MAX_LENGTH, MIN_LENGTH, 1)  # warm-up
+    latencies = []
+    for chunk in chunks[:5]:
+        start = time.perf_counter()
+        summarizer.run_pipeline([chunk], MAX_LENGTH, MIN_LENGTH, 1)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    outputs = summarizer.run_pipeline(chunks, MAX_LENGTH, MIN_LENGTH, batch_size)
+    seconds = time.perf_counter() - start
+    return {
+        "loads": loads,
+        "latency": sorted(latencies)[len(latencies) // 2],
+        "throughput": len(chunks) / seconds,
+        "outputs": outputs,
+    }
+
+# ---------------- ROUGE ---------------- #
+def _f1(overlap: int, a: int, b: int) -> float:
+    return 2 * overlap / (a + b) if a + b else 1.0
+
+def rouge_1(ref: str, hyp: str) -> float:
+    from collections import Counter
+    r, h = Counter(ref.lower().split()), Counter(hyp.lower().split())
+    return _f1(sum((r & h).values()), sum(r.values()), sum(h.values()))
+
+def rouge_l(ref: str, hyp: str) -> float:
+    r, h = ref.lower().split(), hyp.lower().split()
+    prev = [0] * (len(h) + 1)
+    for word in r:  # longest common subsequence, one row at a time
+        row = [0]
+        for j, other in enumerate(h):
+            row.append(prev[j] + 1 if word == other else max(prev[j + 1], row[j]))
+        prev = row
+    return _f1(prev[-1], len(r), len(h))
+
+def mean(xs) -> float:
+    xs = list(xs)
+    return sum(xs) / len(xs) if xs else 0.0
+
+# ---------------- Main ---------------- #
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--minutes", type=float, default=20)
+    ap.add_argument("--profiles", default="default,throughput,int8,shared",
+                    help="comma-separated profile names; drift is measured against the first")
+    ap.add_argument("--real", action="store_true", help="use the app's summarization model instead of the stand-in")
+    ap.add_argument("--max-chunk", type=int, default=512)
+    ap.add_argument("--batch-size", type=int, default=4)
+    args = ap.parse_args()
+
+    from core.services.summarizer import MODEL_NAME
+
+    text = make_transcript(args.minutes, random.Random(0))
+    names = args.profiles.split(",")
+    with tempfile.TemporaryDirectory() as tmp:
+        model_name = MODEL_NAME
+        if not args.real:
+            model_name = str(Path(tmp) / "stand-in")
+            make_stand_in(Path(model_name), text)
+        print(f"transcript: {args.minutes:g} min, {len(text.split())} words; model: "
+              f"{MODEL_NAME if args.real else 'tiny random BART (stand-in)'}")
+
+        results = {}
+        for name in names:
+            with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                results[name] = pool.submit(
+                    run_profile, name, model_name, text, str(Path(tmp) / "models"), args.max_chunk, args.batch_size,
+                ).result()
+
+    base = results[names[0]]["outputs"]
+    print(f"{'profile':>10}  {'load':>7}  {'cached':>7}  {'latency':>9}  {'chunks/s':>8}  {'ROUGE-1':>7}  {'ROUGE-L':>7}")
+    for name in names:
+        r = results[name]
+        cached = f"{r['loads'][1]:6.2f}s" if len(r["loads"]) > 1 else "      -"
+        r1 = mean(rouge_1(a, b) for a, b in zip(base, r["outputs"]))
+        rl = mean(rouge_l(a, b) for a, b in zip(base, r["outputs"]))
+        print(f"{name:>10}  {r['loads'][0]:6.2f}s  {cached}  {r['latency'] * 1000:7.0f}ms  "
+              f"{r['throughput']:8.2f}  {r1:7.3f}  {rl:7.3f}")
+
+if __name__ == "__main__":
+    main()
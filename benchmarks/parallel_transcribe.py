@@ -0,0 +1,63 @@
+"""
+Benchmark sharded transcription scaling from 1 to N worker processes.
+
+Run from the repo root:
+    python -m benchmarks.parallel_transcribe --minutes 10 --workers 4 --model tiny
+"""
+import argparse
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from core.services.transcriber import transcribe_file, transcribe_sharded
+from core.utils.audio import SAMPLE_RATE
+
+def make_synthetic_audio(path: Path, minutes: float, seed: int = 0):
+    """Write a 16 kHz mono WAV of voiced tone bursts separated by short pauses."""
+    rng = np.random.default_rng(seed)
+    parts, total = [], 0
+    while total < minutes * 60 * SAMPLE_RATE:
+        n = int(rng.uniform(4, 15) * SAMPLE_RATE)
+        t = np.arange(n) / SAMPLE_RATE
+        f0 = rng.uniform(100, 250)
+        burst = 0.2 * np.sin(2 * np.pi * f0 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+        pause = 0.002 * rng.standard_normal(int(rng.uniform(0.4, 2.0) * SAMPLE_RATE))
+        parts += [burst, pause]
+        total += n + len(pause)
+    pcm = (np.clip(np.concatenate(parts), -1, 1) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(pcm.tobytes())
+    return len(pcm) / SAMPLE_RATE
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--minutes", type=float, default=10)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--model", default="tiny")
+    ap.add_argument("--shard-seconds", type=float, default=120)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wav = Path(tmp) / "synthetic.wav"
+        seconds = make_synthetic_audio(wav, args.minutes)
+        print(f"{seconds / 60:.1f} min of synthetic audio, model={args.model}")
+
+        baseline = None
+        for n in range(1, args.workers + 1):
+            start = time.perf_counter()
+            if n == 1:
+                transcribe_file(str(wav), args.model)
+            else:
+                transcribe_sharded(str(wav), args.model, n, args.shard_seconds)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"workers={n}: {elapsed:7.1f}s  {seconds / elapsed:6.1f}x realtime  speedup {baseline / elapsed:4.2f}x")
+
+if __name__ == "__main__":
+    main()
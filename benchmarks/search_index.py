@@ -0,0 +1,76 @@
+"""
+Benchmark building the search index over a synthetic corpus and querying it.
+
+Each document is about an hour of lecture speech (~9k words) drawn from a
+Zipf-distributed vocabulary, so common words have long postings lists.
+
+Run from the repo root:
+    python -m benchmarks.search_index --docs 2000
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+from core.search import SearchIndex
+
+def make_vocabulary(size: int, rng: random.Random) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--docs", type=int, default=2000)
+    ap.add_argument("--words", type=int, default=9000, help="words per document")
+    ap.add_argument("--vocab", type=int, default=30000)
+    ap.add_argument("--queries", type=int, default=200)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    vocab = make_vocabulary(args.vocab, rng)
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SearchIndex(tmp)
+        start = time.perf_counter()
+        samples = []
+        for i in range(args.docs):
+            words = rng.choices(vocab, weights, k=args.words)
+            if i % 50 == 0:
+                samples.append(words)
+            index.add_document(f"Class {i % 100}", f"Day {i}", "transcript", " ".join(words))
+        index.flush()
+        build = time.perf_counter() - start
+        print(f"indexed {args.docs} docs x {args.words} words in {build:.1f}s "
+              f"({args.docs * args.words / build / 1e6:.2f}M words/s)")
+
+        def queries(kind: str):
+            for _ in range(args.queries):
+                words = rng.choice(samples)
+                i = rng.randrange(len(words) - 3)
+                if kind == "term":
+                    yield words[i]
+                elif kind == "two terms":
+                    yield f"{words[i]} {words[i + 5 if i + 5 < len(words) else 0]}"
+                elif kind == "prefix":
+                    yield words[i][:3] + "*"
+                else:
+                    yield '"' + " ".join(words[i:i + 3]) + '"'
+
+        for kind in ("term", "two terms", "prefix", "phrase"):
+            times = []
+            for q in queries(kind):
+                t0 = time.perf_counter()
+                index.search(q, limit=10)
+                times.append((time.perf_counter() - t0) * 1000)
+            times.sort()
+            p95 = times[int(len(times) * 0.95) - 1]
+            print(f"{kind:>10}: median {statistics.median(times):6.1f} ms   p95 {p95:6.1f} ms")
+        index.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark sidebar refresh latency on a large synthetic library (needs a display).
+
+Compares the old eager rebuild of every Treeview item with the lazy tree,
+and a single rename applied as a full rebuild versus as a diff.
+
+Run from the repo root:
+    python -m benchmarks.sidebar_tree --classes 100 --folders 10 --notes 10
+"""
+import argparse
+import time
+
+import app
+
+def make_library(classes: int, folders: int, notes: int) -> dict:
+    return {"classes": {
+        f"Class {c}": {
+            "notes": [f"Notes {n}" for n in range(notes)],
+            "folders": {f"Folder {f}": [f"Day {n}" for n in range(notes)] for f in range(folders)},
+        }
+        for c in range(classes)
+    }}
+
+def eager_refresh(tree, state: dict):
+    """The pre-lazy _refresh_tree: delete and re-insert every node."""
+    tree.delete(*tree.get_children())
+    for cname, data in state["classes"].items():
+        class_id = tree.insert("", "end", text=cname, open=True)
+        for nname in data.get("notes", []):
+            tree.insert(class_id, "end", text=nname)
+        for fname, notes in data.get("folders", {}).items():
+            folder_id = tree.insert(class_id, "end", text=fname, open=True)
+            for nname in notes:
+                tree.insert(folder_id, "end", text=nname)
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--classes", type=int, default=100)
+    ap.add_argument("--folders", type=int, default=10)
+    ap.add_argument("--notes", type=int, default=9)
+    args = ap.parse_args()
+
+    app.STATE = make_library(args.classes, args.folders, args.notes)  # never saved
+    nodes = args.classes * (1 + args.notes + args.folders * (1 + args.notes))
+    window = app.LectureApp()
+    window.withdraw()
+    tree = window.tree
+
+    def flush():
+        tree.update_idletasks()
+
+    eager = timed(lambda: (eager_refresh(tree, app.STATE), flush()))
+    lazy = timed(lambda: (window._refresh_tree(), flush()))
+
+    # rename the same day back and forth, with its class and folder expanded
+    window._refresh_tree()
+    window._populate(window._tree_ids[("Class 0",)])
+    window._populate(window._tree_ids[("Class 0", "Folder 0")])
+    days = app.STATE["classes"]["Class 0"]["folders"]["Folder 0"]
+    names = iter(["Renamed", "Day 0"] * 10)
+
+    def rename_diff():
+        old = days[0]
+        days[0] = next(names)
+        window._tree_rename(("Class 0", "Folder 0", old), ("Class 0", "Folder 0", days[0]))
+        flush()
+
+    def rename_rebuild():
+        days[0] = next(names)
+        eager_refresh(tree, app.STATE)
+        flush()
+
+    diff = timed(rename_diff, 4)
+    rebuild = timed(rename_rebuild, 4)
+    window.destroy()
+
+    print(f"{nodes} nodes")
+    print(f"full refresh: eager {eager:8.1f} ms   lazy {lazy:8.1f} ms")
+    print(f"rename:       rebuild {rebuild:6.1f} ms   diff {diff:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark the summary engines on the same synthetic transcript.
+
+The transcript is ~150 spoken words per minute, in sentences drawn from a
+handful of topics, so extractive ranking has real structure to find. Caches
+are emptied before every run; the first BART run includes loading the model.
+
+Run from the repo root:
+    python -m benchmarks.summarize --minutes 60 --engines textrank,bart
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from core import cache
+from core.services import summarizer
+
+def make_transcript(minutes: float, rng: random.Random) -> str:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    common = ["the", "a", "and", "so", "we", "is", "this", "of", "to", "that", "it", "in"]
+    topics = [["".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(40)] for _ in range(8)]
+    words_left = int(minutes * 150)
+    sentences = []
+    topic = rng.choice(topics)
+    while words_left > 0:
+        if rng.random() < 0.1:
+            topic = rng.choice(topics)
+        n = rng.randint(6, 25)
+        words = [rng.choice(topic) if rng.random() < 0.4 else rng.choice(common) for _ in range(n)]
+        sentences.append(" ".join(words).capitalize() + ".")
+        words_left -= n
+    return " ".join(sentences)
+
+def run(engine: str, mode: str, text: str) -> float:
+    summarizer._cache.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache.results = cache.ResultCache(tmp)
+        start = time.perf_counter()
+        if mode == "hierarchical":
+            summarizer.summarize_hierarchical(text, engine=engine)
+        else:
+            summarizer.summarize_chunks(text, engine=engine)
+        return time.perf_counter() - start
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--minutes", type=float, default=60)
+    ap.add_argument("--engines", default="textrank,bart", help="comma-separated engine names")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    text = make_transcript(args.minutes, random.Random(0))
+    words = len(text.split())
+    print(f"transcript: {args.minutes:g} min, {words} words")
+    for engine in args.engines.split(","):
+        for mode in ("concat", "hierarchical"):
+            times = sorted(run(engine, mode, text) for _ in range(args.repeat))
+            print(f"{engine:>9} {mode:>12}: best {times[0]:7.3f}s   worst {times[-1]:7.3f}s   "
+                  f"({words / times[0]:,.0f} words/s)")
+
+if __name__ == "__main__":
+    main()
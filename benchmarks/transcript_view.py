@@ -0,0 +1,149 @@
+"""
+Benchmark transcript display latency on a long synthetic transcript (needs a display).
+
+Compares the old pair of full tk.Text widgets (tab + Split View) with one
+TextBuffer shown through VirtualText: setting the text, streaming segments
+in, jumping around with the scrollbar, and typing in the middle.
+
+Run from the repo root:
+    python -m benchmarks.transcript_view --chars 500000
+"""
+import argparse
+import random
+import time
+import tkinter as tk
+
+from app import VirtualText
+from core.textbuffer import TextBuffer
+
+WORDS = ("so the gradient of the loss with respect to each weight tells us which way "
+         "to move it and the learning rate says how far").split()
+
+def make_segments(chars: int, seed: int = 0) -> list[str]:
+    """Whisper-like segments (8-25 words, mostly ending a sentence) totalling about chars characters."""
+    rng = random.Random(seed)
+    segments, total = [], 0
+    while total < chars:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 25))]
+        text = " ".join(words).capitalize() + ("." if rng.random() < 0.7 else ",")
+        segments.append(text)
+        total += len(text) + 1
+    return segments
+
+def timed(fn, repeat: int = 5) -> float:
+    """Median wall time of fn in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--chars", type=int, default=500_000)
+    ap.add_argument("--stream", type=int, default=2000, help="segments appended in the streaming test")
+    args = ap.parse_args()
+
+    segments = make_segments(args.chars)
+    transcript = " ".join(segments)
+    rng = random.Random(1)
+    jumps = [rng.random() for _ in range(20)]
+    print(f"{len(transcript):,} characters in {len(segments):,} segments")
+
+    root = tk.Tk()
+    root.geometry("900x700")
+    notebook_like = tk.Frame(root)
+    notebook_like.pack(fill=tk.BOTH, expand=True)
+
+    def flush():
+        root.update()
+
+    # ---- old: the same text in two full Text widgets ----
+    shown = tk.Text(notebook_like, wrap="word")
+    shown.pack(fill=tk.BOTH, expand=True)
+    split = tk.Text(root, wrap="word")  # the Split View copy (never packed: a hidden tab)
+
+    def old_set():
+        for w in (shown, split):
+            w.delete("1.0", tk.END)
+            w.insert(tk.END, transcript)
+        flush()
+
+    def old_stream():
+        for w in (shown, split):
+            w.delete("1.0", tk.END)
+        for i, seg in enumerate(segments[:args.stream]):
+            for w in (shown, split):
+                w.insert(tk.END, (" " if i else "") + seg)
+            if i % 10 == 9:
+                flush()
+        flush()
+
+    def old_scroll():
+        for f in jumps:
+            shown.yview("moveto", f)
+            flush()
+
+    def old_type():
+        shown.mark_set("insert", f"1.{len(transcript) // 2}")
+        for ch in "hello":
+            shown.insert("insert", ch)
+            flush()
+
+    old = {
+        "set text": timed(old_set, 3),
+        "stream": timed(old_stream, 1),
+    }
+    old_set()
+    old["scroll (20 jumps)"] = timed(old_scroll, 3)
+    old["type 5 chars"] = timed(old_type, 3)
+    shown.destroy()
+    split.destroy()
+
+    # ---- new: one buffer, one visible view, the Split View's view hidden ----
+    buffer = TextBuffer()
+    view = VirtualText(notebook_like, buffer)
+    view.pack(fill=tk.BOTH, expand=True)
+    hidden = VirtualText(root, buffer)  # never mapped, so never re-rendered
+    flush()
+
+    def new_set():
+        buffer.set_text(transcript)
+        flush()
+
+    def new_stream():
+        buffer.set_text("")
+        for i, seg in enumerate(segments[:args.stream]):
+            buffer.append(seg)
+            if i % 10 == 9:
+                flush()
+        flush()
+
+    def new_scroll():
+        for f in jumps:
+            view._on_scrollbar("moveto", f)
+            flush()
+
+    def new_type():
+        view.text.mark_set("insert", f"{VirtualText.WINDOW // 2}.0")
+        for ch in "hello":
+            view.text.insert("insert", ch)
+            flush()
+
+    new = {
+        "set text": timed(new_set, 3),
+        "stream": timed(new_stream, 1),
+    }
+    new_set()
+    new["scroll (20 jumps)"] = timed(new_scroll, 3)
+    new["type 5 chars"] = timed(new_type, 3)
+    hidden.destroy()
+
+    print(f"{'':20}{'2x tk.Text':>14}{'VirtualText':>14}")
+    for name in old:
+        print(f"{name:20}{old[name]:12.1f}ms{new[name]:12.1f}ms")
+    root.destroy()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark transcription with and without voice activity detection.
+
+The synthetic lecture alternates voiced tone bursts with long quiet breaks
+(setup, students working), so VAD has real silence to remove. Caches are
+emptied before each run.
+
+Run from the repo root:
+    python -m benchmarks.vad --minutes 10 --silence 0.4 --model tiny
+"""
+import argparse
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from core import cache
+from core.services.transcriber import transcribe_file
+from core.utils.audio import SAMPLE_RATE
+
+def make_lecture(path: Path, minutes: float, silence: float, seed: int = 0) -> float:
+    """Write a 16 kHz mono WAV where about `silence` of the time is quiet breaks."""
+    rng = np.random.default_rng(seed)
+    parts, total = [], 0
+    while total < minutes * 60 * SAMPLE_RATE:
+        n = int(rng.uniform(4, 15) * SAMPLE_RATE)
+        t = np.arange(n) / SAMPLE_RATE
+        burst = 0.2 * np.sin(2 * np.pi * rng.uniform(100, 250) * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+        pause_seconds = rng.uniform(0.3, 0.8)
+        if rng.random() < 0.2:
+            # an occasional long break, sized so breaks make up ~`silence` of the audio
+            pause_seconds += rng.exponential(9.5 * 5 * silence / (1 - silence))
+        pause = 0.002 * rng.standard_normal(int(pause_seconds * SAMPLE_RATE))
+        parts += [burst, pause]
+        total += n + len(pause)
+    pcm = (np.clip(np.concatenate(parts), -1, 1) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(pcm.tobytes())
+    return len(pcm) / SAMPLE_RATE
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--minutes", type=float, default=10)
+    ap.add_argument("--silence", type=float, default=0.4, help="fraction of the audio that is quiet breaks")
+    ap.add_argument("--model", default="tiny")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wav = Path(tmp) / "lecture.wav"
+        seconds = make_lecture(wav, args.minutes, args.silence)
+        print(f"{seconds / 60:.1f} min of synthetic audio, model={args.model}")
+
+        times = {}
+        for vad in (False, True):
+            cache.results = cache.ResultCache(Path(tmp) / f"cache-{vad}")
+            report: dict = {}
+            start = time.perf_counter()
+            transcribe_file(str(wav), args.model, pcm_dir=tmp, vad=vad, report=report)
+            times[vad] = time.perf_counter() - start
+            line = f"vad={str(vad):5}: {times[vad]:7.1f}s  {seconds / times[vad]:6.1f}x realtime"
+            if vad:
+                line += (f"  removed {report['removed_seconds'] / 60:.1f} of {report['audio_seconds'] / 60:.1f} min"
+                         f" (expected {report['speedup']:.2f}x, measured {times[False] / times[True]:.2f}x)")
+            print(line)
+
+if __name__ == "__main__":
+    main()
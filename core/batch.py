@@ -0,0 +1,148 @@
+"""
+Transcribe and summarize many recordings without the GUI.
+
+Each audio file becomes a day named after the file (without extension) in
+the class named by --class, or by the folder the file sits in. Days that
+already have meta.json and summary.txt are skipped, so an interrupted run
+picks up where it left off. Close the app while a batch runs; both write
+app_state.json.
+
+Run from the repo root:
+    python -m core.batch recordings/ --workers 2
+    python -m core.batch "recordings/**/*.m4a" --class "CS 101" --folder Week1
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from pathlib import Path
+
+from . import metrics
+from .config import INFERENCE_PROFILE, ensure_day_dir, flush_state, load_state, save_class
+from .pipeline import LectureResult, process_lecture, save_lecture
+from .services.profiles import PROFILES, get_profile
+from .services.summarizer import ENGINES
+
+AUDIO_EXTS = {".mp3", ".wav", ".m4a", ".flac", ".ogg"}
+
+# ---------------- Inputs ---------------- #
+def find_audio(patterns: list[str]) -> list[Path]:
+    """Audio files under the given directories / matching the given globs, sorted."""
+    found: set[Path] = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = path.rglob("*")
+        else:
+            candidates = (Path(p) for p in glob.glob(pattern, recursive=True))
+        found.update(p.resolve() for p in candidates if p.is_file() and p.suffix.lower() in AUDIO_EXTS)
+    return sorted(found)
+
+def plan_days(files: list[Path], class_name: str | None) -> list[tuple[Path, str, str]]:
+    """(audio file, class, day) for each file; later files with a taken day are dropped."""
+    jobs, seen = [], set()
+    for f in files:
+        key = (class_name or f.parent.name, f.stem)
+        if key in seen:
+            print(f"skipping {f}: day {key[0]}/{key[1]} already comes from another file")
+            continue
+        seen.add(key)
+        jobs.append((f, *key))
+    return jobs
+
+def is_done(day_dir: Path) -> bool:
+    return (day_dir / "meta.json").exists() and (day_dir / "summary.txt").exists()
+
+def add_to_state(state: dict, class_name: str, folder: str | None, day: str):
+    """List the day in the sidebar (under folder, or directly under the class)."""
+    data = state["classes"].setdefault(class_name, {"folders": {}})
+    days = data.setdefault("folders", {}).setdefault(folder, []) if folder else data.setdefault("notes", [])
+    if day not in days:
+        days.append(day)
+        save_class(state, class_name)
+
+# ---------------- Workers ---------------- #
+def _init_worker(threads: int, profile: str):
+    """Split the cores between worker processes instead of each taking all of them."""
+    from .services.summarizer import set_profile
+
+    # the profile still decides quantization; the thread count is this worker's share
+    set_profile(replace(get_profile(profile), threads=threads, interop_threads=1))
+    try:
+        import torch  # type: ignore
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+def _process(audio_path: str, day_dir: str, options: dict) -> LectureResult:
+    # indexes and state belong to the parent process, so workers only compute
+    with metrics.run("batch.lecture", audio_path=audio_path):
+        return process_lecture(day_dir, audio_path, save=False, **options)
+
+# ---------------- Main ---------------- #
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m core.batch", description=__doc__.splitlines()[1])
+    ap.add_argument("inputs", nargs="+", help="audio files, directories or glob patterns")
+    ap.add_argument("--class", dest="class_name", help="put every day in this class (default: parent folder name)")
+    ap.add_argument("--folder", help="sidebar folder for the days (default: directly under the class)")
+    ap.add_argument("--workers", type=int, default=2, help="recordings processed in parallel")
+    ap.add_argument("--model", default="small", help="whisper model size")
+    ap.add_argument("--engine", default="bart", choices=list(ENGINES), help="summary engine")
+    ap.add_argument("--profile", default=INFERENCE_PROFILE, choices=list(PROFILES), help="CPU inference profile")
+    ap.add_argument("--mode", default="concat", choices=["concat", "hierarchical"])
+    ap.add_argument("--max-chunk", type=int, default=512, help="max tokens per summarizer chunk")
+    ap.add_argument("--force", action="store_true", help="reprocess days that are already done")
+    args = ap.parse_args(argv)
+
+    files = find_audio(args.inputs)
+    if not files:
+        print("No audio files found.")
+        return 1
+
+    state = load_state()
+    todo = []
+    for audio, class_name, day in plan_days(files, args.class_name):
+        day_dir = ensure_day_dir(class_name, day)
+        add_to_state(state, class_name, args.folder, day)
+        if args.force or not is_done(day_dir):
+            todo.append((audio, class_name, day, day_dir))
+    flush_state()
+    print(f"{len(files)} recordings, {len(files) - len(todo)} already done, {len(todo)} to process "
+          f"with {args.workers} worker(s)")
+    if not todo:
+        return 0
+
+    options = {"model_name": args.model, "max_chunk": args.max_chunk, "mode": args.mode, "engine": args.engine}
+    workers = max(1, min(args.workers, len(todo)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    started = time.perf_counter()
+    audio_total, failed = 0.0, 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(threads, args.profile)) as pool:
+        futures = {
+            pool.submit(_process, str(audio), str(day_dir), options): (audio, class_name, day, day_dir)
+            for audio, class_name, day, day_dir in todo
+        }
+        for n, future in enumerate(as_completed(futures), 1):
+            audio, class_name, day, day_dir = futures[future]
+            label = f"[{n}/{len(todo)}] {class_name}/{day}"
+            try:
+                result = future.result()
+                save_lecture(day_dir, str(audio), args.model, result)
+            except Exception as e:
+                failed += 1
+                print(f"{label}: FAILED: {e}")
+                continue
+            audio_total += result.audio_seconds
+            elapsed = time.perf_counter() - started
+            print(f"{label}: {result.audio_seconds / 60:.1f} min of audio in {result.total_seconds:.0f}s"
+                  f" | overall {n / elapsed * 3600:.1f} recordings/h, {audio_total / elapsed:.1f}× realtime")
+
+    print(f"Done: {len(todo) - failed} processed, {failed} failed in {time.perf_counter() - started:.0f}s.")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
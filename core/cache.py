@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from .config import CACHE_DIR, CACHE_MAX_BYTES
+
+# ---------------- Hashing ---------------- #
+_file_hashes: dict[tuple[str, int, int], str] = {}
+
+def hash_file(path: str | Path, block_size: int = 1 << 20) -> str:
+    """Stream a file through sha256 (memoized per path, size and mtime)."""
+    st = os.stat(path)
+    memo_key = (str(Path(path).resolve()), st.st_size, st.st_mtime_ns)
+    if memo_key not in _file_hashes:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                h.update(block)
+        _file_hashes[memo_key] = h.hexdigest()
+    return _file_hashes[memo_key]
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def make_key(*parts) -> str:
+    """Combine hashes and parameters into one cache key."""
+    return hashlib.sha256("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+# ---------------- Result Cache ---------------- #
+class ResultCache:
+    """
+    JSON results on disk, one file per key, evicted least-recently-used
+    once the directory grows past max_bytes. Writes are atomic.
+    """
+
+    def __init__(self, root: str | Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._size: int | None = None  # bytes on disk, computed on first write
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str):
+        """Return the cached value, or None on a miss."""
+        path = self._path(key)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # mtime doubles as last-access time for LRU
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value):
+        """Store a JSON-serializable value under key."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(value).encode("utf-8")
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            old = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(p.stat().st_size for p in self.root.glob("*/*.json"))
+            else:
+                self._size += len(data) - old
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is back under 90% of budget."""
+        entries = []
+        for p in self.root.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+
+        self._size = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, p in entries:
+            if self._size <= target:
+                break
+            p.unlink(missing_ok=True)
+            self._size -= size
+
+    def clear(self):
+        for p in self.root.glob("*/*.json"):
+            p.unlink(missing_ok=True)
+        self._size = 0
+
+results = ResultCache()
@@ -1,7 +1,9 @@
 import os
-import json
+import atexit
 from pathlib import Path
 
+from .state import StateStore
+
 # Base app directory (where app.py lives)
 APP_DIR = Path(__file__).resolve().parents[1]
 
@@ -12,18 +14,78 @@ STATE_PATH = APP_DIR / "app_state.json"
 # Make sure the data directory exists
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# Content-addressed cache of transcripts and summaries (see core.cache)
+CACHE_DIR = DATA_DIR / ".cache"
+CACHE_MAX_BYTES = int(os.environ.get("LECTUREAI_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# Full-text search index over saved transcripts and summaries (see core.search)
+INDEX_DIR = DATA_DIR / ".index"
+# TF-IDF vectors for "related lectures" (see core.related)
+RELATED_DIR = DATA_DIR / ".related"
+
+# Durable queue of transcription/summarization jobs (see core.jobs)
+JOBS_PATH = DATA_DIR / ".jobs.jsonl"
+
+# Local inference server shared by app instances (see core.server).
+# Set LECTUREAI_SERVER=0 to always run models in-process. To share one server
+# between users, point LECTUREAI_SERVER_DIR at a directory they all can reach
+# and start the server with --shared.
+SERVER_DIR = Path(os.environ.get("LECTUREAI_SERVER_DIR", DATA_DIR))
+SERVER_ADDRESS = r"\\.\pipe\lectureai" if os.name == "nt" else str(SERVER_DIR / ".server.sock")
+SERVER_KEY_PATH = SERVER_DIR / ".server.key"
+USE_SERVER = os.environ.get("LECTUREAI_SERVER", "1") != "0"
+
+# Per-stage timings of jobs (see core.metrics), rotated at METRICS_MAX_BYTES
+METRICS_PATH = DATA_DIR / ".metrics.jsonl"
+METRICS_MAX_BYTES = int(os.environ.get("LECTUREAI_METRICS_MAX_MB", "5")) * 1024 * 1024
+METRICS_BACKUPS = 3
+
+# ---------------- Model Settings ---------------- #
+# Approximate RAM (in MB) resident Whisper models may use before the
+# least recently used one is evicted. Override with LECTUREAI_WHISPER_BUDGET_MB.
+WHISPER_MEMORY_BUDGET_MB = int(os.environ.get("LECTUREAI_WHISPER_BUDGET_MB", "2048"))
+
+# All loaded models (Whisper and the summarizer) together (see core.governor):
+# past MODEL_MEMORY_BUDGET_MB the least recently used are unloaded, and any
+# unused for LECTUREAI_MODEL_IDLE_MIN minutes are unloaded too (0 = never).
+# Both reload on next use.
+MODEL_MEMORY_BUDGET_MB = int(os.environ.get("LECTUREAI_MODEL_BUDGET_MB", "4096"))
+MODEL_IDLE_SECONDS = float(os.environ.get("LECTUREAI_MODEL_IDLE_MIN", "15")) * 60
+
+# CPU inference profile for the summarizer (see core.services.profiles) and
+# where quantized copies of models are kept between runs
+INFERENCE_PROFILE = os.environ.get("LECTUREAI_PROFILE", "default")
+MODELS_DIR = DATA_DIR / ".models"
+
 # ---------------- Load & Save State ---------------- #
+# app_state.json plus a journal of per-class edits (see core.state)
+_store = StateStore(STATE_PATH)
+atexit.register(_store.flush)
+
 def load_state():
-    """Load app_state.json or return default if not found."""
-    if STATE_PATH.exists():
-        with STATE_PATH.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"classes": {}}  # default structure
+    """Load app_state.json (with journaled edits applied) or return default if not found."""
+    return _store.load()
 
 def save_state(state: dict):
-    """Save state to app_state.json."""
-    with STATE_PATH.open("w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2)
+    """Save the whole state; prefer save_class when only one class changed."""
+    from . import metrics  # metrics reads its paths from this module
+
+    with metrics.span("state.save_all"):
+        _store.save_all(state)
+
+def save_class(state: dict, class_name: str):
+    """Save one class (or its removal) without re-serializing the rest of the state."""
+    from . import metrics
+
+    metrics.count("state.class_saves")
+    _store.save_class(state, class_name)
+
+def flush_state():
+    """Write pending state changes to disk now instead of after the debounce delay."""
+    from . import metrics
+
+    with metrics.span("state.flush"):
+        _store.flush()
 
 # ---------------- Directory Helpers ---------------- #
 def ensure_class_dir(class_name: str):
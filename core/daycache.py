@@ -0,0 +1,102 @@
+import codecs
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from .models import Meta
+from .storage import load_meta
+from .textbuffer import split_blocks
+
+_BLOCK = 1 << 20  # bytes read (and decoded) at a time
+
+@dataclass(frozen=True)
+class SavedDay:
+    """A day's saved texts, already split into display lines (see core.textbuffer)."""
+    transcript: tuple[tuple[str, ...], tuple[str, ...]]  # (lines, breaks)
+    summary: tuple[tuple[str, ...], tuple[str, ...]]
+    meta: Meta | None
+    chars: int  # transcript + summary length, for the cache budget
+
+# ---------------- Loading ---------------- #
+def iter_text(path: str | Path, block: int = _BLOCK) -> Iterator[str]:
+    """Decode a UTF-8 file block by block, so a large transcript is never held as bytes and text at once."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(block):
+                yield decoder.decode(chunk)
+    except FileNotFoundError:
+        return
+    yield decoder.decode(b"", final=True)
+
+def _split_file(path: Path) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    lines, breaks = split_blocks(iter_text(path))
+    return tuple(lines), tuple(breaks)
+
+def load_day(day_dir: str | Path) -> SavedDay:
+    """Read transcript.txt, summary.txt and meta.json (missing files load as empty)."""
+    day_dir = Path(day_dir)
+    transcript = _split_file(day_dir / "transcript.txt")
+    summary = _split_file(day_dir / "summary.txt")
+    chars = sum(map(len, transcript[0])) + sum(map(len, summary[0]))
+    return SavedDay(transcript, summary, load_meta(day_dir), chars)
+
+def _stamp(day_dir: Path) -> tuple:
+    """What changes when any of the day's files is rewritten."""
+    stamp = []
+    for name in ("transcript.txt", "summary.txt", "meta.json"):
+        try:
+            st = (day_dir / name).stat()
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+# ---------------- Recently Viewed ---------------- #
+class DayCache:
+    """
+    Recently viewed days, least recently used evicted first once there are
+    more than max_days or their texts pass max_chars. An entry is only
+    returned while the day's files are unchanged on disk.
+    """
+
+    def __init__(self, max_days: int = 8, max_chars: int = 20_000_000):
+        self.max_days = max_days
+        self.max_chars = max_chars
+        self._days: "OrderedDict[Path, tuple[tuple, SavedDay]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, day_dir: str | Path) -> SavedDay | None:
+        """The cached day if it is still current (a few stat calls), else None."""
+        key = Path(day_dir).resolve()
+        with self._lock:
+            entry = self._days.get(key)
+        if entry is None or entry[0] != _stamp(key):
+            return None
+        with self._lock:
+            if key in self._days:
+                self._days.move_to_end(key)
+        return entry[1]
+
+    def load(self, day_dir: str | Path) -> SavedDay:
+        """Return the day, reading it from disk (and caching it) unless a current copy is cached."""
+        day = self.get(day_dir)
+        if day is not None:
+            return day
+        key = Path(day_dir).resolve()
+        stamp = _stamp(key)  # taken first: a save during the read makes the entry stale, not wrong
+        day = load_day(key)
+        with self._lock:
+            self._days[key] = (stamp, day)
+            self._days.move_to_end(key)
+            total = sum(d.chars for _, d in self._days.values())
+            while len(self._days) > 1 and (len(self._days) > self.max_days or total > self.max_chars):
+                _, (_, old) = self._days.popitem(last=False)
+                total -= old.chars
+        return day
+
+    def forget(self, day_dir: str | Path):
+        with self._lock:
+            self._days.pop(Path(day_dir).resolve(), None)
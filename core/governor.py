@@ -0,0 +1,197 @@
+import gc
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable
+
+# ---------------- Memory Governor ---------------- #
+# Model owners (the Whisper registry, the summarizer) register a model when
+# they load it, with its approximate size and a callback that drops their
+# reference. Models nobody has used for idle_seconds are unloaded by a
+# background sweep, and loading one that takes the total past budget_mb
+# unloads the least recently used others first. Owners load again on next
+# use exactly as they did the first time, so unloading only costs a reload.
+
+@dataclass
+class _Model:
+    label: str
+    size_mb: float
+    unload: Callable[[], None]
+    last_used: float
+
+class ModelGovernor:
+    """Loaded models, least recently used first, plus who is using them right now."""
+
+    def __init__(self, budget_mb: float, idle_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.budget_mb = budget_mb
+        self.idle_seconds = idle_seconds  # 0 keeps idle models loaded
+        self._clock = clock
+        self._models: "OrderedDict[str, _Model]" = OrderedDict()
+        self._users: dict[str, int] = {}  # kept apart: a model is in use while it loads, before it registers
+        self._lock = threading.Lock()
+        self._sweeper: threading.Thread | None = None
+
+    def register(self, key: str, label: str, size_mb: float, unload: Callable[[], None]):
+        """
+        Track a model that was just loaded, unloading others if it takes the total over budget.
+
+        Args:
+            key: the owner's name for the model, e.g. "whisper:small:cpu"
+            label: how the status bar names it
+            size_mb: approximate resident size (see module_mb)
+            unload: drops the owner's reference; called without the governor's lock held
+        """
+        with self._lock:
+            self._models[key] = _Model(label, size_mb, unload, self._clock())
+            self._models.move_to_end(key)
+            total = sum(m.size_mb for m in self._models.values())
+            victims = []
+            for other, model in list(self._models.items()):
+                if total <= self.budget_mb:
+                    break
+                if other != key and not self._users.get(other):
+                    victims.append(self._models.pop(other))
+                    total -= model.size_mb
+        self._unload(victims)
+        self._start_sweeper()
+
+    def forget(self, key: str):
+        """Stop tracking a model its owner dropped on its own (evicted, settings changed)."""
+        with self._lock:
+            self._models.pop(key, None)
+
+    @contextmanager
+    def using(self, key: str):
+        """Mark a model busy for the block (it is never unloaded mid-call) and recently used after it."""
+        self._touch(key, 1)
+        try:
+            yield
+        finally:
+            self._touch(key, -1)
+
+    def _touch(self, key: str, users: int):
+        with self._lock:
+            self._users[key] = self._users.get(key, 0) + users
+            model = self._models.get(key)
+            if model is not None:
+                model.last_used = self._clock()
+                self._models.move_to_end(key)
+
+    def unload_idle(self) -> list[str]:
+        """Unload every model unused for idle_seconds; returns their labels."""
+        if self.idle_seconds <= 0:
+            return []
+        cutoff = self._clock() - self.idle_seconds
+        with self._lock:
+            keys = [k for k, m in self._models.items() if m.last_used <= cutoff and not self._users.get(k)]
+            victims = [self._models.pop(k) for k in keys]
+        self._unload(victims)
+        return [m.label for m in victims]
+
+    def _unload(self, victims: list[_Model]):
+        if not victims:
+            return
+        for model in victims:
+            try:
+                model.unload()
+            except Exception as e:
+                print("Model unload error:", e)
+        _release_memory()
+
+    def _start_sweeper(self):
+        with self._lock:
+            if self._sweeper is not None or self.idle_seconds <= 0:
+                return
+            self._sweeper = threading.Thread(target=self._sweep, daemon=True)
+        self._sweeper.start()
+
+    def _sweep(self):
+        interval = min(60.0, max(5.0, self.idle_seconds / 4))
+        while True:
+            time.sleep(interval)
+            self.unload_idle()
+
+    def usage(self) -> list[tuple[str, float]]:
+        """(label, MB) of each loaded model, least recently used first."""
+        with self._lock:
+            return [(m.label, m.size_mb) for m in self._models.values()]
+
+    def total_mb(self) -> float:
+        with self._lock:
+            return sum(m.size_mb for m in self._models.values())
+
+_governor: ModelGovernor | None = None
+_governor_lock = threading.Lock()
+
+def get_governor() -> ModelGovernor:
+    """The process-wide governor, with the budget and idle timeout from config."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            from .config import MODEL_IDLE_SECONDS, MODEL_MEMORY_BUDGET_MB
+            _governor = ModelGovernor(MODEL_MEMORY_BUDGET_MB, MODEL_IDLE_SECONDS)
+        return _governor
+
+# ---------------- Sizes ---------------- #
+def module_mb(module, default: float) -> float:
+    """
+    Approximate resident size of a torch module: the bytes of every tensor
+    in its state dict (shared weights counted once, int8 packed weights
+    included). Falls back to default when it can't be measured.
+    """
+    try:
+        import torch  # type: ignore
+
+        seen, total = set(), 0
+        for value in module.state_dict().values():
+            for t in value if isinstance(value, (tuple, list)) else (value,):
+                if torch.is_tensor(t) and t.data_ptr() not in seen:
+                    seen.add(t.data_ptr())
+                    total += t.numel() * t.element_size()
+        return total / (1024 * 1024) or default
+    except Exception:
+        return default
+
+def process_rss_mb() -> float | None:
+    """This process's current resident memory in MB, or None where it isn't cheap to read."""
+    try:
+        if os.name == "nt":
+            return _windows_working_set() / (1024 * 1024)
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, AttributeError, ValueError):
+        return None
+
+def _windows_working_set() -> int:
+    import ctypes
+    from ctypes import wintypes
+
+    class Counters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+            (name, ctypes.c_size_t) for name in (
+                "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage",
+            )
+        ]
+
+    counters = Counters(cb=ctypes.sizeof(Counters))
+    kernel32, psapi = ctypes.windll.kernel32, ctypes.windll.psapi
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD]
+    if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        raise OSError("GetProcessMemoryInfo failed")
+    return counters.WorkingSetSize
+
+def _release_memory():
+    """Free what unloaded models left behind and, on glibc, hand it back to the OS."""
+    gc.collect()
+    if sys.platform.startswith("linux"):
+        try:
+            import ctypes
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
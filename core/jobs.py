@@ -0,0 +1,365 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from . import metrics
+from .config import APP_DIR, JOBS_PATH
+from .utils.journal import read_journal
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+# Jobs of these resources may run at the same time (whisper and BART each
+# want most of the CPU and several GB of RAM)
+DEFAULT_LIMITS = {"whisper": 1, "summarizer": 1}
+
+class Cancelled(Exception):
+    """Raised inside a job when it has been asked to stop."""
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    params: dict
+    priority: int = 0  # higher runs first; ties run in submission order
+    status: str = QUEUED
+    error: str = ""
+    created: float = field(default_factory=time.time)
+
+# ---------------- Job Kinds ---------------- #
+# kind -> (handler(job, ctx), resources it occupies while running)
+_KINDS: dict[str, tuple[Callable, tuple[str, ...]]] = {}
+
+def job_kind(kind: str, resources: tuple[str, ...] = ()):
+    """Register a function as the handler for a kind of job."""
+    def register(fn):
+        _KINDS[kind] = (fn, resources)
+        return fn
+    return register
+
+class JobContext:
+    """Handed to a running job: cancellation checks and progress events."""
+
+    def __init__(self, job: Job, scheduler: "JobScheduler"):
+        self.job = job
+        self._scheduler = scheduler
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check(self):
+        """Raise Cancelled if the job should stop; call this between units of work."""
+        if self._cancel.is_set():
+            raise Cancelled()
+
+    def emit(self, event: str, data=None):
+        """Send a progress event (e.g. a transcript segment) to subscribers."""
+        self._scheduler._notify(self.job, event, data)
+
+# ---------------- Durable Store ---------------- #
+class JobStore:
+    """
+    Jobs in an append-only JSONL journal: an "add" record per job, then a
+    "status" record per change. Once enough finished jobs pile up the journal
+    is rewritten (atomically) with just the unfinished ones.
+    """
+
+    def __init__(self, path: str | Path = JOBS_PATH, compact_after: int = 200):
+        self.path = Path(path)
+        self.compact_after = compact_after
+        self.jobs: dict[int, Job] = {}
+        self._finished = 0
+        self._last_id = 0  # ids stay unique after compaction drops finished jobs
+
+    def load(self) -> list[Job]:
+        """Replay the journal. Jobs that were running when the app stopped are queued again."""
+        self.jobs.clear()
+        # a torn last line is cut off, so jobs journaled after a crash aren't lost with it
+        for rec in read_journal(self.path):
+            if rec["op"] == "add":
+                job = Job(**rec["job"])
+                self.jobs[job.id] = job
+            elif rec["op"] == "status" and rec["id"] in self.jobs:
+                self.jobs[rec["id"]].status = rec["status"]
+                self.jobs[rec["id"]].error = rec.get("error", "")
+        for job in self.jobs.values():
+            if job.status == RUNNING:
+                job.status = QUEUED
+        self._finished = sum(job.status in FINISHED for job in self.jobs.values())
+        self._last_id = max(self.jobs, default=0)
+        return list(self.jobs.values())
+
+    def next_id(self) -> int:
+        self._last_id += 1
+        return self._last_id
+
+    def add(self, job: Job):
+        self.jobs[job.id] = job
+        self._append({"op": "add", "job": asdict(job)})
+
+    def set_status(self, job: Job, status: str, error: str = ""):
+        job.status, job.error = status, error
+        self._append({"op": "status", "id": job.id, "status": status, "error": error})
+        if status in FINISHED:
+            self._finished += 1
+            if self._finished > self.compact_after:
+                self._compact()
+
+    def _append(self, rec: dict):
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _compact(self):
+        self.jobs = {i: job for i, job in self.jobs.items() if job.status not in FINISHED}
+        text = "".join(json.dumps({"op": "add", "job": asdict(job)}) + "\n" for job in self.jobs.values())
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._finished = 0
+
+# ---------------- Scheduler ---------------- #
+class JobScheduler:
+    """
+    Runs queued jobs on worker threads, highest priority first, while keeping
+    each resource under its concurrency limit.
+
+    Subscribers are called as fn(job, event, data) from worker threads, with
+    event "status" (data = the new status) or whatever the handler emits.
+    """
+
+    def __init__(self, store: JobStore | None = None, limits: dict[str, int] | None = None):
+        self.store = store or JobStore()
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._busy: dict[str, int] = {}
+        self._running: dict[int, JobContext] = {}
+        self._subscribers: list[Callable] = []
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+
+    def start(self):
+        """Load the journal (resuming unfinished jobs) and start dispatching."""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self.store.load()
+            self._thread = threading.Thread(target=self._dispatch, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop starting new jobs; running ones stay marked running and resume next start()."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    def subscribe(self, fn: Callable):
+        self._subscribers.append(fn)
+
+    def submit(self, kind: str, params: dict, priority: int = 0) -> Job:
+        """Queue a job of a registered kind; params must be JSON-serializable."""
+        if kind not in _KINDS:
+            raise ValueError(f"Unknown job kind {kind!r}")
+        with self._cond:
+            job = Job(self.store.next_id(), kind, params, priority)
+            self.store.add(job)
+            self._cond.notify_all()
+        self._notify(job, "status", QUEUED)
+        return job
+
+    def cancel(self, job_id: int):
+        """Drop a queued job, or ask a running one to stop at its next check()."""
+        with self._cond:
+            job = self.store.jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return
+            if job.status == QUEUED:
+                self.store.set_status(job, CANCELLED)
+            else:
+                self._running[job_id]._cancel.set()
+                return
+        self._notify(job, "status", CANCELLED)
+
+    def active(self) -> list[Job]:
+        """Queued and running jobs, in the order they will run."""
+        with self._cond:
+            jobs = [j for j in self.store.jobs.values() if j.status in (QUEUED, RUNNING)]
+        return sorted(jobs, key=lambda j: (j.status != RUNNING, -j.priority, j.id))
+
+    def _runnable(self) -> Job | None:
+        queued = sorted(
+            (j for j in self.store.jobs.values() if j.status == QUEUED and j.kind in _KINDS),
+            key=lambda j: (-j.priority, j.id),
+        )
+        for job in queued:
+            resources = _KINDS[job.kind][1]
+            if all(self._busy.get(r, 0) < self.limits.get(r, 1) for r in resources):
+                return job
+        return None
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                job = None
+                while not self._stopping and (job := self._runnable()) is None:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                for r in _KINDS[job.kind][1]:
+                    self._busy[r] = self._busy.get(r, 0) + 1
+                ctx = self._running[job.id] = JobContext(job, self)
+                self.store.set_status(job, RUNNING)
+            self._notify(job, "status", RUNNING)
+            threading.Thread(target=self._run, args=(ctx,), daemon=True).start()
+
+    def _run(self, ctx: JobContext):
+        job = ctx.job
+        handler, resources = _KINDS[job.kind]
+        status, error = DONE, ""
+        try:
+            # the run's record (per-stage times) is logged before subscribers hear the job ended
+            with metrics.run(f"job.{job.kind}", job=job.id):
+                handler(job, ctx)
+        except Cancelled:
+            status = CANCELLED
+        except Exception as e:
+            status, error = FAILED, str(e) or type(e).__name__
+        with self._cond:
+            if self._stopping:
+                return  # shutting down: leave it running so it resumes next time
+            for r in resources:
+                self._busy[r] -= 1
+            del self._running[job.id]
+            self.store.set_status(job, status, error)
+            self._cond.notify_all()
+        self._notify(job, "status", status)
+
+    def _notify(self, job: Job, event: str, data=None):
+        for fn in list(self._subscribers):
+            try:
+                fn(job, event, data)
+            except Exception as e:
+                print("Job subscriber error:", e)
+
+_scheduler: JobScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> JobScheduler:
+    """The process-wide scheduler; call start() on it once subscribers are attached."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler()
+        return _scheduler
+
+# ---------------- Built-in Jobs ---------------- #
+# Handlers write their results into the day directory, so a job resumed after
+# a restart finishes the day even though no window is watching it.
+
+def _day_dir(p: dict) -> Path:
+    # jobs journaled before day dirs were absolute hold paths relative to the app directory
+    path = Path(p["day_dir"])
+    return path if path.is_absolute() else APP_DIR / path
+
+@job_kind("transcribe", resources=("whisper",))
+def _transcribe_job(job: Job, ctx: JobContext):
+    from .services.transcriber import iter_segments
+    from .storage import save_meta, save_segments, save_transcript
+
+    p = job.params
+    day_dir = _day_dir(p)
+    started = time.perf_counter()
+    first_text = None
+    audio_seconds = 0.0
+    segments = []
+    for seg in iter_segments(p["audio_path"], model_name=p["model_name"], pcm_dir=day_dir):
+        ctx.check()
+        if first_text is None:
+            first_text = time.perf_counter() - started
+        audio_seconds = seg.end
+        segments.append(seg)
+        ctx.emit("segment", seg.text)
+    day_dir.mkdir(parents=True, exist_ok=True)
+    save_transcript(day_dir, " ".join(seg.text for seg in segments))
+    save_meta(day_dir, p["audio_path"], p["model_name"], segments=save_segments(day_dir, segments))
+
+    msg = "Transcription complete."
+    if first_text is not None:
+        msg += f" First text after {first_text:.1f}s, {audio_seconds / (time.perf_counter() - started):.1f}× realtime."
+    ctx.emit("message", msg)
+
+@job_kind("summarize", resources=("summarizer",))
+def _summarize_job(job: Job, ctx: JobContext):
+    from .services.summarizer import set_profile, summarize_chunks, summarize_hierarchical
+    from .storage import load_chunk_summaries, save_chunk_summaries, save_meta, save_texts
+
+    p = job.params
+    if p.get("profile"):  # absent from jobs journaled before profiles existed
+        set_profile(p["profile"])
+    day_dir = _day_dir(p)
+    # the app saves the transcript before queueing the job (older jobs carry it inline)
+    transcript = p.get("transcript")
+    if transcript is None:
+        transcript = (day_dir / "transcript.txt").read_text(encoding="utf-8")
+    # summaries of chunks that survived the user's edits are reused
+    memo = load_chunk_summaries(day_dir)
+    stats: dict = {}
+    ctx.check()
+    # checked between model batches, so a cancel doesn't wait for the whole summary
+    options = {"max_chunk": p["max_chunk"], "memo": memo, "stats": stats, "engine": p["engine"], "check": ctx.check}
+    if p["mode"] == "hierarchical":
+        summary = summarize_hierarchical(transcript, **options)
+    else:
+        summary = "\n\n".join(summarize_chunks(transcript, **options))
+    ctx.check()
+    day_dir.mkdir(parents=True, exist_ok=True)
+    save_texts(day_dir, transcript, summary)
+    save_chunk_summaries(day_dir, memo)
+    if p.get("audio_path"):
+        save_meta(day_dir, p["audio_path"], p["model_name"])
+    ctx.emit("summary", summary)
+    msg = "Summary complete."
+    if stats:
+        msg += f" {stats['recomputed']} chunks recomputed, {stats['reused']} reused."
+    ctx.emit("message", msg)
+
+@job_kind("process_lecture", resources=("whisper", "summarizer"))
+def _process_lecture_job(job: Job, ctx: JobContext):
+    from .pipeline import process_lecture
+    from .services.summarizer import set_profile
+
+    p = job.params
+    if p.get("profile"):
+        set_profile(p["profile"])
+
+    def on_segment(seg):
+        ctx.check()
+        ctx.emit("segment", seg.text)
+
+    result = process_lecture(
+        _day_dir(p), p["audio_path"], p["model_name"],
+        max_chunk=p["max_chunk"], mode=p["mode"], engine=p["engine"],
+        on_segment=on_segment,
+        on_chunk_summary=lambda index, text: ctx.emit("chunk_summary", (index, text)),
+    )
+    ctx.emit("summary", result.summary)
+    ctx.emit("message", (
+        f"Lecture processed in {result.total_seconds:.1f}s "
+        f"(transcription {result.transcribe_seconds:.1f}s). "
+        f"{result.stats['recomputed']} chunks summarized, {result.stats['reused']} reused."
+    ))
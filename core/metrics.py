@@ -0,0 +1,175 @@
+import contextvars
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+from .governor import process_rss_mb
+
+# ---------------- Spans & Counters ---------------- #
+# A span times one stage (model load, decode, inference, a file write) and
+# appends a record to the metrics log when it ends. A run (one job, one
+# batch recording) is a span too; spans that end inside it are added up in
+# the run's record, which also carries the counters bumped during the run.
+# The run in progress is context-local, so jobs running side by side (on
+# their own threads) each get their own; a thread a run starts joins it by
+# running in a copy of the run's context (see in_run_context). The status
+# bar shows a job's run once it has finished.
+
+_lock = threading.Lock()
+_counters: dict[str, float] = {}
+_run: contextvars.ContextVar[dict | None] = contextvars.ContextVar("metrics_run", default=None)  # totals
+_finished: "deque[dict]" = deque(maxlen=16)  # records of recently finished runs, oldest first
+
+def count(name: str, n: float = 1):
+    """Add n to a counter (e.g. chunks produced)."""
+    totals = _run.get()
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+        if totals is not None:
+            totals["counters"][name] = totals["counters"].get(name, 0) + n
+
+def counters() -> dict[str, float]:
+    with _lock:
+        return dict(_counters)
+
+def in_run_context(fn):
+    """Wrap a thread's target so spans and counters inside it count toward the caller's run."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+@contextmanager
+def span(name: str, **fields):
+    """
+    Time a block and log it.
+
+    Args:
+        name: stage name, e.g. "whisper.load_model"
+        fields: extra values for the record; "audio_seconds" and "chunks"
+            are turned into audio_x (seconds of audio per second) and
+            chunks_per_s
+
+    Yields:
+        The record dict, so the block can fill in fields it learns late.
+    """
+    record = {"span": name, **fields}
+    wall, cpu, rss = time.perf_counter(), time.process_time(), process_rss_mb()
+    try:
+        yield record
+    finally:
+        _finish(record, wall, cpu, rss)
+        totals = _run.get()
+        with _lock:
+            if totals is not None:
+                if record.get("rss_mb"):
+                    totals["rss_max_mb"] = max(totals.get("rss_max_mb", 0.0), record["rss_mb"])
+                stage = totals["stages"].setdefault(name, {"wall": 0.0, "count": 0})
+                stage["wall"] = round(stage["wall"] + record["wall"], 4)
+                stage["count"] += 1
+                for k in ("audio_seconds", "chunks"):
+                    if k in record:
+                        stage[k] = stage.get(k, 0) + record[k]
+        _write(record)
+
+@contextmanager
+def run(name: str, **fields):
+    """
+    Time a whole job; spans ending inside it are summed per stage.
+
+    Runs don't nest: one opened inside another (in the same context) is
+    logged as a plain span of the outer run.
+    """
+    if _run.get() is not None:
+        with span(name, **fields) as record:
+            yield record
+        return
+
+    totals = {"stages": {}, "counters": {}}
+    token = _run.set(totals)
+    record = {"span": name, "run": True, **fields}
+    wall, cpu, rss = time.perf_counter(), time.process_time(), process_rss_mb()
+    try:
+        yield record
+    finally:
+        _run.reset(token)
+        _finish(record, wall, cpu, rss)
+        with _lock:
+            record["stages"] = totals["stages"]
+            record["counters"] = totals["counters"]
+            if totals.get("rss_max_mb"):
+                record["rss_max_mb"] = totals["rss_max_mb"]
+            _finished.append(record)
+        _write(record)
+
+def _finish(record: dict, wall: float, cpu: float, rss: float | None):
+    record["wall"] = round(time.perf_counter() - wall, 4)
+    record["cpu"] = round(time.process_time() - cpu, 4)
+    # current RSS at the end and how much the block changed it (the process peak says nothing per span)
+    end = process_rss_mb()
+    if end is not None:
+        record["rss_mb"] = round(end, 1)
+        if rss is not None:
+            record["rss_delta_mb"] = round(end - rss, 1)
+    seconds = record["wall"] or 1e-9
+    if "audio_seconds" in record:
+        record["audio_x"] = round(record["audio_seconds"] / seconds, 2)
+    if "chunks" in record:
+        record["chunks_per_s"] = round(record["chunks"] / seconds, 2)
+    record["ts"] = round(time.time(), 3)
+
+# ---------------- Log File ---------------- #
+def _write(record: dict):
+    from .config import METRICS_BACKUPS, METRICS_MAX_BYTES, METRICS_PATH
+
+    line = json.dumps(record) + "\n"
+    try:
+        with _lock:
+            path = Path(METRICS_PATH)
+            if path.exists() and path.stat().st_size + len(line) > METRICS_MAX_BYTES:
+                _rotate(path, METRICS_BACKUPS)
+            with path.open("a", encoding="utf-8") as f:
+                f.write(line)
+    except OSError as e:  # metrics must never break the work they measure
+        print("Metrics error:", e)
+
+def _rotate(path: Path, backups: int):
+    """metrics.jsonl -> metrics.jsonl.1 -> ... -> metrics.jsonl.<backups> (dropped)."""
+    for i in range(backups, 0, -1):
+        src = path.with_name(f"{path.name}.{i - 1}") if i > 1 else path
+        if src.exists():
+            src.replace(path.with_name(f"{path.name}.{i}"))
+
+# ---------------- Summary ---------------- #
+def last_run(**match) -> dict | None:
+    """
+    The record of the last finished run (root span plus per-stage totals),
+    or of the last one whose fields match, e.g. last_run(job=7).
+    """
+    with _lock:
+        for record in reversed(_finished):
+            if all(record.get(k) == v for k, v in match.items()):
+                return record
+    return None
+
+def summarize_run(record: dict | None = None) -> str:
+    """One line describing where a run's time went, for the status bar."""
+    record = record or last_run()
+    if record is None:
+        return ""
+    stages = sorted(record.get("stages", {}).items(), key=lambda kv: -kv[1]["wall"])
+    parts = []
+    for name, stage in stages[:4]:
+        part = f"{name} {stage['wall']:.1f}s"
+        if stage.get("audio_seconds"):
+            part += f" ({stage['audio_seconds'] / max(stage['wall'], 1e-9):.1f}× realtime)"
+        elif stage.get("chunks"):
+            part += f" ({stage['chunks'] / max(stage['wall'], 1e-9):.1f} chunks/s)"
+        parts.append(part)
+    text = f"{record['span']} {record['wall']:.1f}s"
+    if parts:
+        text += ": " + ", ".join(parts)
+    if record.get("rss_max_mb"):
+        text += f"; RSS up to {record['rss_max_mb']:.0f} MB"
+    return text
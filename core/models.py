@@ -2,22 +2,63 @@ from dataclasses import dataclass, asdict
 from datetime import datetime
 import json
 
+@dataclass
+class SegmentsInfo:
+    """Describes a day's segment store (see core.segments)."""
+    index: str       # file with the start/end/offset columns
+    text: str        # file with the segment texts
+    count: int
+    duration: float  # end of the last segment, in seconds
+    timing: str = "whisper"  # or "estimated": spread over the audio by text length
+
 @dataclass
 class Meta:
     audio_path: str
     whisper_model: str
     transcribed_at: str
+    segments: SegmentsInfo | None = None
 
     def to_dict(self):
-        return asdict(self)
+        d = asdict(self)
+        if d["segments"] is None:
+            del d["segments"]  # older readers only know the first three keys
+        return d
 
     def to_json(self) -> str:
         return json.dumps(self.to_dict(), indent=2)
 
+    @classmethod
+    def from_dict(cls, d: dict) -> "Meta":
+        segments = d.get("segments")
+        return cls(
+            audio_path=d.get("audio_path", ""),
+            whisper_model=d.get("whisper_model", ""),
+            transcribed_at=d.get("transcribed_at", ""),
+            segments=SegmentsInfo(**segments) if segments else None,
+        )
+
+@dataclass
+class Segment:
+    start: float  # seconds from the start of the audio
+    end: float
+    text: str
+
+    def to_dict(self):
+        return asdict(self)
+
+@dataclass
+class SearchHit:
+    class_name: str
+    day: str
+    field: str  # "transcript" or "summary"
+    score: float
+    snippet: str
+
 # Helper to create a new Meta object
-def make_meta(audio_path: str, whisper_model: str) -> Meta:
+def make_meta(audio_path: str, whisper_model: str, segments: SegmentsInfo | None = None) -> Meta:
     return Meta(
         audio_path=audio_path,
         whisper_model=whisper_model,
         transcribed_at=datetime.now().isoformat(timespec="seconds"),
+        segments=segments,
     )
@@ -0,0 +1,175 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from . import metrics
+from .models import Segment
+from .services.summarizer import DEFAULT_ENGINE, get_engine, reduce_summaries, summarize_batch
+from .services.transcriber import iter_segments
+from .storage import load_chunk_summaries, save_chunk_summaries, save_meta, save_segments, save_texts
+from .utils.chunking import iter_token_chunks
+
+_DONE = object()  # end-of-stream marker between stages
+
+@dataclass
+class LectureResult:
+    transcript: str
+    summary: str
+    audio_seconds: float     # length of the transcribed audio
+    transcribe_seconds: float
+    total_seconds: float     # wall time, including summaries finished after transcription
+    stats: dict = field(default_factory=dict)  # "recomputed"/"reused" chunk counts
+    chunk_summaries: dict = field(default_factory=dict)  # memo for chunk_summaries.json
+    segments: list[Segment] = field(default_factory=list)  # timed transcript for the segment store
+
+def process_lecture(
+    day_dir: str | Path,
+    audio_path: str,
+    model_name: str = "small",
+    max_chunk: int = 512,
+    max_length: int = 150,
+    min_length: int = 50,
+    batch_size: int = 8,
+    mode: str = "concat",
+    engine: str = DEFAULT_ENGINE,
+    on_segment: Callable[[Segment], None] | None = None,
+    on_chunk_summary: Callable[[int, str], None] | None = None,
+    save: bool = True,
+) -> LectureResult:
+    """
+    Transcribe and summarize a lecture in one pass, then save it to day_dir.
+
+    Segments stream out of Whisper on the calling thread. A chunker thread
+    packs them into token-budgeted chunks as sentences complete, and a summary
+    thread summarizes finished chunks (batching whatever has queued up) while
+    later audio is still being decoded. Total time approaches the slower of
+    the two stages instead of their sum.
+
+    Args:
+        day_dir: where transcript, summary, per-chunk summaries and meta.json go
+        audio_path: path to the audio file
+        model_name: whisper model size
+        max_chunk: max model tokens per chunk
+        max_length: max tokens in each summary
+        min_length: min tokens in each summary
+        batch_size: most chunks summarized per model call
+        mode: "concat" joins chunk summaries, "hierarchical" reduces them to one
+        engine: summary engine name (see core.services.summarizer)
+        on_segment: called with each transcript segment as it is decoded
+        on_chunk_summary: called with (chunk index, summary) as chunks finish
+        save: when False nothing is written; pass the result to save_lecture
+            (e.g. from the one process that owns the indexes)
+
+    Returns:
+        The saved transcript and summary, plus timings.
+    """
+    day_dir = Path(day_dir)
+    engine = get_engine(engine)
+    seed = load_chunk_summaries(day_dir)
+    memo: dict = {}
+    stats: dict = {"recomputed": 0, "reused": 0}
+    summaries: list[str] = []
+
+    pieces: queue.Queue = queue.Queue()
+    chunks: queue.Queue = queue.Queue()
+    errors: list[BaseException] = []
+
+    def stream_pieces():
+        first = True
+        while (text := pieces.get()) is not _DONE:
+            # join exactly as the saved transcript is joined, so chunks (and
+            # their memo keys) match a later summarize_chunks of the same text
+            yield text if first else " " + text
+            first = False
+
+    def chunker():
+        try:
+            # loading the summarizer here overlaps it with Whisper's start-up
+            budget = min(max_chunk, engine.window())
+            for chunk in iter_token_chunks(stream_pieces(), budget, count_tokens=engine.token_counter()):
+                chunks.put(chunk)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            chunks.put(_DONE)
+
+    def summarize_worker():
+        done = False
+        while not done:
+            batch = [chunks.get()]
+            while len(batch) < batch_size and not chunks.empty():
+                batch.append(chunks.get())
+            if batch[-1] is _DONE:
+                batch.pop()
+                done = True
+            if not batch or errors:
+                continue
+            try:
+                batch_memo = dict(seed)
+                outputs = summarize_batch(batch, max_length, min_length, batch_size, engine, batch_memo, stats)
+            except BaseException as e:
+                errors.append(e)
+                continue
+            memo.update(batch_memo)
+            for text in outputs:
+                summaries.append(text)
+                if on_chunk_summary:
+                    on_chunk_summary(len(summaries) - 1, text)
+
+    # the stages' spans belong to the caller's metrics run (e.g. the job's)
+    stages = [
+        threading.Thread(target=metrics.in_run_context(chunker), daemon=True),
+        threading.Thread(target=metrics.in_run_context(summarize_worker), daemon=True),
+    ]
+    for t in stages:
+        t.start()
+
+    started = time.perf_counter()
+    segments: list[Segment] = []
+    audio_seconds = 0.0
+    try:
+        # decoded audio is kept beside meta.json, so re-runs map it instead of decoding
+        for seg in iter_segments(audio_path, model_name=model_name, pcm_dir=day_dir):
+            if errors:
+                break
+            segments.append(seg)
+            audio_seconds = seg.end
+            pieces.put(seg.text)
+            if on_segment:
+                on_segment(seg)
+    finally:
+        pieces.put(_DONE)
+        transcribe_seconds = time.perf_counter() - started
+        for t in stages:
+            t.join()
+    if errors:
+        raise errors[0]
+
+    if mode == "hierarchical":
+        summary = reduce_summaries(summaries, max_length, min_length, batch_size, engine)
+    else:
+        summary = "\n\n".join(summaries)
+    result = LectureResult(
+        transcript=" ".join(seg.text for seg in segments),
+        summary=summary,
+        audio_seconds=audio_seconds,
+        transcribe_seconds=transcribe_seconds,
+        total_seconds=time.perf_counter() - started,
+        stats=stats,
+        chunk_summaries=memo,
+        segments=segments,
+    )
+    if save:
+        save_lecture(day_dir, audio_path, model_name, result)
+    return result
+
+def save_lecture(day_dir: str | Path, audio_path: str, model_name: str, result: LectureResult):
+    """Write a processed lecture's texts, segments, per-chunk summaries and meta.json."""
+    day_dir = Path(day_dir)
+    day_dir.mkdir(parents=True, exist_ok=True)
+    save_texts(day_dir, result.transcript, result.summary)
+    save_chunk_summaries(day_dir, result.chunk_summaries)
+    save_meta(day_dir, audio_path, model_name, segments=save_segments(day_dir, result.segments))
@@ -0,0 +1,261 @@
+import json
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from .config import RELATED_DIR
+from .search import day_key, tokenize
+from .utils.journal import read_journal
+
+class RelatedIndex:
+    """
+    TF-IDF vectors of every saved day, for "more lectures like this one".
+
+    Rows hold raw term counts and are only ever appended (a re-saved day
+    gets a new row and its old one is masked out), so adding a day never
+    touches the others. IDF weights come from the live document
+    frequencies at query time, which keeps them current without a refit.
+
+    On disk everything is append-only: vocab.txt (one term per line),
+    indices.u32 / counts.f32 (row entries) and rows.jsonl (row keys, deletions).
+    Once masked rows make up compact_ratio of all rows (and number at least
+    compact_min), the live ones are rewritten as a new generation of the
+    last three files, which CURRENT names; generation 0 has no number.
+    """
+
+    def __init__(self, root: str | Path = RELATED_DIR, compact_ratio: float = 0.5, compact_min: int = 16):
+        self.root = Path(root)
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self._lock = threading.RLock()
+        self._load()
+
+    def _file(self, name: str, gen: int | None = None) -> Path:
+        gen = self._gen if gen is None else gen
+        if not gen:
+            return self.root / name
+        stem, ext = name.split(".")
+        return self.root / f"{stem}.{gen}.{ext}"
+
+    # ---------------- Load ---------------- #
+    def _load(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        current = self.root / "CURRENT"
+        self._gen = int(current.read_text()) if current.exists() else 0
+        self._terms: list[str] = self._read_vocab()
+        self._vocab = {t: i for i, t in enumerate(self._terms)}
+
+        self._keys: list[tuple[str, str]] = []
+        self._alive: list[bool] = []
+        self._by_key: dict[tuple[str, str], int] = {}
+        nnz = [0]
+        # a torn last line is cut off, so rows appended later aren't lost with it
+        for entry in read_journal(self._file("rows.jsonl")):
+            if "del" in entry:
+                self._alive[entry["del"]] = False
+                continue
+            self._by_key[tuple(entry["key"])] = len(self._keys)
+            self._keys.append(tuple(entry["key"]))
+            self._alive.append(True)
+            nnz.append(nnz[-1] + entry["nnz"])
+
+        # entries beyond the last complete row belong to an interrupted append
+        total = nnz[-1]
+        self._indptr = nnz
+        # appended rows are kept as array chunks and joined when the matrix is rebuilt
+        self._indices = [self._read_array("indices.u32", np.uint32, total)]
+        self._counts = [self._read_array("counts.f32", np.float32, total)]
+        self._matrix = None  # CSR matrix, rebuilt lazily after changes
+
+        # rows whose entries never reached the disk (the row was written, its data lost)
+        stored = min(len(self._indices[0]), len(self._counts[0]))
+        lost = [row for row in range(len(self._keys)) if nnz[row + 1] > stored]
+        for row in lost:
+            self._alive[row] = False
+        for key, row in list(self._by_key.items()):
+            if not self._alive[row]:
+                del self._by_key[key]
+        if lost:
+            self._compact()
+
+    def _read_vocab(self) -> list[str]:
+        path = self.root / "vocab.txt"
+        if not path.exists():
+            return []
+        data = path.read_bytes()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):  # torn last term
+            with open(path, "r+b") as f:
+                f.truncate(end)
+        return data[:end].decode("utf-8").split("\n")[:-1]
+
+    def _read_array(self, name: str, dtype, count: int) -> np.ndarray:
+        path = self._file(name)
+        if not path.exists():
+            return np.zeros(0, dtype)
+        data = np.fromfile(path, dtype=dtype, count=count)
+        if path.stat().st_size > count * data.itemsize:
+            with open(path, "r+b") as f:
+                f.truncate(count * data.itemsize)
+        return data
+
+    # ---------------- Updates ---------------- #
+    def add_day(self, class_name: str, day: str, text: str):
+        """Add (or replace) the vector for one day."""
+        counts = Counter(tokenize(text))
+        key = (class_name, day)
+        with self._lock:
+            self._remove(key)
+            if not counts:
+                return
+
+            new_terms = [t for t in counts if t not in self._vocab]
+            for t in new_terms:
+                self._vocab[t] = len(self._terms)
+                self._terms.append(t)
+            cols = sorted((self._vocab[t], c) for t, c in counts.items())
+            indices = np.fromiter((c for c, _ in cols), np.uint32, len(cols))
+            values = np.fromiter((n for _, n in cols), np.float32, len(cols))
+
+            if new_terms:
+                with (self.root / "vocab.txt").open("a", encoding="utf-8") as f:
+                    f.write("".join(t + "\n" for t in new_terms))
+            with self._file("indices.u32").open("ab") as f:
+                indices.tofile(f)
+            with self._file("counts.f32").open("ab") as f:
+                values.tofile(f)
+            self._append_row({"key": list(key), "nnz": len(cols)})
+
+            self._by_key[key] = len(self._keys)
+            self._keys.append(key)
+            self._alive.append(True)
+            self._indices.append(indices)
+            self._counts.append(values)
+            self._indptr.append(self._indptr[-1] + len(cols))
+            self._matrix = None
+            self._maybe_compact()
+
+    def index_day(self, day_dir: str | Path, transcript: str):
+        """Add the transcript saved for a day directory."""
+        self.add_day(*day_key(day_dir), transcript)
+
+    def reindex_day(self, day_dir: str | Path):
+        """Add whatever transcript.txt currently holds."""
+        path = Path(day_dir) / "transcript.txt"
+        self.index_day(day_dir, path.read_text(encoding="utf-8") if path.exists() else "")
+
+    def remove_day(self, class_name: str, day: str | None = None):
+        """Forget a day (or, with day=None, every day of a class)."""
+        with self._lock:
+            for key in [k for k in self._by_key if k[0] == class_name and (day is None or k[1] == day)]:
+                self._remove(key)
+            self._maybe_compact()
+
+    def _remove(self, key: tuple[str, str]):
+        row = self._by_key.pop(key, None)
+        if row is not None:
+            self._alive[row] = False
+            self._append_row({"del": row})
+            self._matrix = None
+
+    def _append_row(self, entry: dict):
+        with self._file("rows.jsonl").open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    # ---------------- Compaction ---------------- #
+    def _maybe_compact(self):
+        dead = len(self._keys) - len(self._by_key)
+        if dead >= self.compact_min and dead >= self.compact_ratio * len(self._keys):
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the live rows as the next generation; masked rows (re-saved or removed days) are dropped."""
+        live = [row for row, alive in enumerate(self._alive) if alive]
+        sizes = np.diff(self._indptr)
+        mask = np.repeat(np.asarray(self._alive, dtype=bool), sizes)
+        stored = min(sum(map(len, self._indices)), sum(map(len, self._counts)))
+        indices = np.concatenate(self._indices)[:stored][mask[:stored]]
+        counts = np.concatenate(self._counts)[:stored][mask[:stored]]
+        keys = [self._keys[row] for row in live]
+
+        gen = self._gen + 1
+        indices.tofile(self._file("indices.u32", gen))
+        counts.tofile(self._file("counts.f32", gen))
+        rows = "".join(json.dumps({"key": list(key), "nnz": int(sizes[row])}) + "\n" for key, row in zip(keys, live))
+        self._file("rows.jsonl", gen).write_text(rows, encoding="utf-8")
+        tmp = self.root / "CURRENT.tmp"
+        tmp.write_text(str(gen))
+        os.replace(tmp, self.root / "CURRENT")
+
+        # the new generation is live; drop what it replaced
+        for name in ("indices.u32", "counts.f32", "rows.jsonl"):
+            self._file(name).unlink(missing_ok=True)
+        self._gen = gen
+        self._keys = keys
+        self._alive = [True] * len(keys)
+        self._by_key = {key: row for row, key in enumerate(keys)}
+        self._indptr = [0] + np.cumsum(sizes[live], dtype=np.int64).tolist()
+        self._indices, self._counts = [indices], [counts]
+        self._matrix = None
+
+    # ---------------- Queries ---------------- #
+    def _weights(self):
+        """Sublinear-tf CSR matrix (dead rows zeroed), IDF vector and row norms."""
+        if self._matrix is None:
+            from scipy.sparse import csr_matrix  # type: ignore
+
+            self._indices = [np.concatenate(self._indices)]
+            self._counts = [np.concatenate(self._counts)]
+            indices = self._indices[0].astype(np.int32)
+            data = np.log(self._counts[0]) + 1.0  # sublinear tf: 1 + log(count)
+            data *= np.repeat(np.asarray(self._alive, dtype=np.float32), np.diff(self._indptr))
+            indptr = np.asarray(self._indptr)
+            shape = (len(self._keys), len(self._terms))
+            matrix = csr_matrix((data, indices, indptr), shape=shape)
+
+            df = np.bincount(indices[data > 0], minlength=len(self._terms))
+            n_docs = max(1, len(self._by_key))
+            idf = (np.log((1 + n_docs) / (1 + df)) + 1.0).astype(np.float32)
+            squares = csr_matrix((data * data, indices, indptr), shape=shape)
+            norms = np.sqrt(squares @ (idf * idf))
+            self._matrix, self._idf, self._norms = matrix, idf, norms
+        return self._matrix, self._idf, self._norms
+
+    def related(self, class_name: str, day: str, k: int = 10) -> list[tuple[str, str, float]]:
+        """
+        Most similar other days by TF-IDF cosine similarity.
+
+        Returns:
+            (class name, day, similarity) tuples, best first.
+        """
+        with self._lock:
+            row = self._by_key.get((class_name, day))
+            if row is None:
+                return []
+            matrix, idf, norms = self._weights()
+            query = matrix.getrow(row).toarray().ravel() * idf * idf
+            scores = matrix @ query  # one sparse matrix-vector product
+            denom = norms * norms[row]
+            scores = np.divide(scores, denom, out=np.zeros_like(scores), where=denom > 0)
+            scores[row] = 0.0
+
+            k = min(k, int((scores > 0).sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(*self._keys[i], float(scores[i])) for i in top]
+
+_index: RelatedIndex | None = None
+_index_lock = threading.Lock()
+
+def get_related_index() -> RelatedIndex:
+    """The process-wide similarity index, opened on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = RelatedIndex()
+        return _index
@@ -0,0 +1,499 @@
+import bisect
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import threading
+from array import array
+from pathlib import Path
+
+from .config import DATA_DIR, INDEX_DIR
+from .models import SearchHit
+from .utils.journal import read_journal
+
+_TOKEN = re.compile(r"\w+")
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+
+FIELDS = {"transcript": "transcript.txt", "summary": "summary.txt"}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+def tokenize(text: str) -> list[str]:
+    return [m.group().lower() for m in _TOKEN.finditer(text)]
+
+# ---------------- Postings Encoding ---------------- #
+# postings.bin holds, per term, one (doc id gap, term frequency) varint pair
+# per document. positions.bin holds the matching token positions as packed
+# uint32s in the same order, so a document's positions are a zero-copy slice.
+
+def _put_varint(out: bytearray, n: int):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _get_varint(buf, p: int) -> tuple[int, int]:
+    n = shift = 0
+    while True:
+        byte = buf[p]
+        p += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, p
+        shift += 7
+
+def _map(path: Path):
+    """Read-only mmap of a file (or empty bytes for an empty file)."""
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+# ---------------- Segments ---------------- #
+class _Segment:
+    """An immutable, memory-mapped batch of postings (seg.N/ in the index dir)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        lexicon = json.loads((path / "lexicon.json").read_text(encoding="utf-8"))
+        self.terms: list[str] = lexicon["terms"]  # sorted, for prefix lookups
+        self.offsets: list[int] = lexicon["offsets"]  # byte offsets into postings.bin
+        self.pos_offsets: list[int] = lexicon["pos_offsets"]  # entry offsets into positions.bin
+        self.df: list[int] = lexicon["df"]
+        self._ids = {t: i for i, t in enumerate(self.terms)}
+
+        self._postings = _map(path / "postings.bin")
+        self._positions_map = _map(path / "positions.bin")
+        self.positions = memoryview(self._positions_map).cast("I")
+
+    @staticmethod
+    def write(path: Path, postings: dict[str, list[tuple[int, list[int]]]]):
+        """Write postings (term -> (doc id, positions) sorted by doc id) as a segment."""
+        path.mkdir(parents=True, exist_ok=True)
+        terms = sorted(postings)
+        offsets, pos_offsets, df = [0], [0], []
+        with open(path / "postings.bin", "wb") as fp, open(path / "positions.bin", "wb") as fpos:
+            for term in terms:
+                out = bytearray()
+                prev_doc, count = 0, 0
+                for doc, positions in postings[term]:
+                    _put_varint(out, doc - prev_doc)
+                    _put_varint(out, len(positions))
+                    array("I", positions).tofile(fpos)
+                    prev_doc = doc
+                    count += len(positions)
+                fp.write(out)
+                offsets.append(offsets[-1] + len(out))
+                pos_offsets.append(pos_offsets[-1] + count)
+                df.append(len(postings[term]))
+        lexicon = {"terms": terms, "offsets": offsets, "pos_offsets": pos_offsets, "df": df}
+        (path / "lexicon.json").write_text(json.dumps(lexicon), encoding="utf-8")
+
+    def get(self, term: str, with_positions: bool = False, only: set | None = None):
+        """Yield (doc id, tf, positions or None) for term, restricted to `only` when given."""
+        i = self._ids.get(term)
+        if i is None:
+            return
+        buf, p, end, pos = self._postings, self.offsets[i], self.offsets[i + 1], self.pos_offsets[i]
+        doc = 0
+        while p < end:
+            gap, p = _get_varint(buf, p)
+            tf, p = _get_varint(buf, p)
+            doc += gap
+            if only is None or doc in only:
+                yield doc, tf, (self.positions[pos:pos + tf] if with_positions else None)
+            pos += tf
+
+    def prefixed(self, prefix: str) -> list[str]:
+        lo = bisect.bisect_left(self.terms, prefix)
+        hi = bisect.bisect_left(self.terms, prefix + "\U0010ffff")
+        return self.terms[lo:hi]
+
+    def close(self):
+        self.positions.release()
+        for m in (self._postings, self._positions_map):
+            if isinstance(m, mmap.mmap):
+                m.close()
+
+# ---------------- Index ---------------- #
+class SearchIndex:
+    """
+    Inverted index over saved transcripts and summaries with BM25 ranking.
+
+    New documents go to an in-memory delta backed by an append-only log.
+    Once the delta holds `merge_after` documents it is written out as a new
+    memory-mapped segment; past `max_segments` all segments are merged and
+    deleted documents are dropped. CURRENT names the live manifest, so a
+    crash mid-flush leaves the previous generation intact.
+    """
+
+    def __init__(self, root: str | Path = INDEX_DIR, merge_after: int = 200, max_segments: int = 8):
+        self.root = Path(root)
+        self.merge_after = merge_after
+        self.max_segments = max_segments
+        self._lock = threading.RLock()
+        self._load()
+
+    # ---------------- Load ---------------- #
+    def _load(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        current = self.root / "CURRENT"
+        self._gen = int(current.read_text()) if current.exists() else 0
+
+        manifest = {"segments": [], "docs": []}
+        manifest_path = self.root / f"manifest.{self._gen}.json"
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+        self._segments = [_Segment(self.root / f"seg.{n}") for n in manifest["segments"]]
+        self._segment_ids: list[int] = manifest["segments"]
+        self._docs: list[list | None] = manifest["docs"]  # [class, day, field, length], None = deleted
+        self._flushed_docs = len(self._docs)
+        self._delta: dict[str, dict[int, list[int]]] = {}
+        self._delta_terms: list[str] | None = None  # sorted lazily for prefix queries
+        self._by_key = {tuple(d[:3]): i for i, d in enumerate(self._docs) if d}
+        self._live_len = sum(d[3] for d in self._docs if d)
+
+        log_path = self.root / f"delta.{self._gen}.jsonl"
+        # a torn last line is cut off, so what is logged next isn't lost with it
+        for entry in read_journal(log_path):
+            if "del" in entry:
+                self._apply_delete(entry["del"])
+            else:
+                self._apply_add(entry["doc"], entry["terms"])
+        self._log = log_path.open("a", encoding="utf-8")
+
+    def close(self):
+        with self._lock:
+            self._log.close()
+            for seg in self._segments:
+                seg.close()
+
+    # ---------------- Updates ---------------- #
+    def _apply_add(self, doc: list, terms: dict[str, list[int]]) -> int:
+        doc_id = len(self._docs)
+        self._docs.append(doc)
+        self._by_key[tuple(doc[:3])] = doc_id
+        self._live_len += doc[3]
+        for term, positions in terms.items():
+            self._delta.setdefault(term, {})[doc_id] = positions
+        self._delta_terms = None
+        return doc_id
+
+    def _apply_delete(self, doc_id: int):
+        doc = self._docs[doc_id]
+        if doc is not None:
+            self._docs[doc_id] = None
+            self._by_key.pop(tuple(doc[:3]), None)
+            self._live_len -= doc[3]
+
+    def _write_log(self, entry: dict):
+        self._log.write(json.dumps(entry) + "\n")
+        self._log.flush()
+
+    def add_document(self, class_name: str, day: str, field: str, text: str):
+        """Index (or re-index) one field of one day."""
+        tokens = tokenize(text)
+        terms: dict[str, list[int]] = {}
+        for i, tok in enumerate(tokens):
+            terms.setdefault(tok, []).append(i)
+
+        with self._lock:
+            self._remove((class_name, day, field))
+            if tokens:
+                doc = [class_name, day, field, len(tokens)]
+                self._apply_add(doc, terms)
+                self._write_log({"doc": doc, "terms": terms})
+            if len(self._docs) - self._flushed_docs >= self.merge_after:
+                self.flush()
+
+    def _remove(self, key: tuple):
+        doc_id = self._by_key.get(key)
+        if doc_id is not None:
+            self._apply_delete(doc_id)
+            self._write_log({"del": doc_id})
+
+    def index_day(self, day_dir: str | Path, transcript: str, summary: str):
+        """Index the transcript and summary saved for a day directory."""
+        class_name, day = day_key(day_dir)
+        self.add_document(class_name, day, "transcript", transcript)
+        self.add_document(class_name, day, "summary", summary)
+
+    def reindex_day(self, day_dir: str | Path):
+        """Index whatever transcript.txt / summary.txt currently hold."""
+        class_name, day = day_key(day_dir)
+        for field, filename in FIELDS.items():
+            path = Path(day_dir) / filename
+            text = path.read_text(encoding="utf-8") if path.exists() else ""
+            self.add_document(class_name, day, field, text)
+
+    def remove_day(self, class_name: str, day: str | None = None):
+        """Drop a day (or, with day=None, every day of a class) from the index."""
+        with self._lock:
+            for key in [k for k in self._by_key if k[0] == class_name and (day is None or k[1] == day)]:
+                self._remove(key)
+
+    # ---------------- Flush & Merge ---------------- #
+    def flush(self):
+        """Write the delta out as a new segment (merging all segments when there are too many)."""
+        with self._lock:
+            if not self._delta and len(self._docs) == self._flushed_docs:
+                return
+            gen = self._gen + 1
+            merge = len(self._segments) + 1 > self.max_segments
+
+            docs = self._docs
+            if merge:
+                # renumber live docs densely; deleted ones disappear for good
+                remap = {}
+                docs = []
+                for old, doc in enumerate(self._docs):
+                    if doc is not None:
+                        remap[old] = len(docs)
+                        docs.append(doc)
+                postings: dict[str, list[tuple[int, list[int]]]] = {}
+                for seg in self._segments:
+                    for term in seg.terms:
+                        for doc_id, _, positions in seg.get(term, with_positions=True):
+                            if doc_id in remap:
+                                # copy out of the mmap, which is closed below
+                                postings.setdefault(term, []).append((remap[doc_id], positions.tolist()))
+                for term, by_doc in self._delta.items():
+                    for doc_id, positions in by_doc.items():
+                        if doc_id in remap:
+                            postings.setdefault(term, []).append((remap[doc_id], positions))
+                segments = [gen] if postings else []  # nothing live: no segment is written
+            else:
+                postings = {t: sorted(by_doc.items()) for t, by_doc in self._delta.items()}
+                segments = self._segment_ids + ([gen] if postings else [])
+
+            if postings:
+                for plist in postings.values():
+                    plist.sort()
+                _Segment.write(self.root / f"seg.{gen}", postings)
+            self._write_atomic(f"manifest.{gen}.json", json.dumps({"segments": segments, "docs": docs}))
+            self._write_atomic("CURRENT", str(gen))
+
+            # the new generation is live; drop what it replaced
+            old_gen = self._gen
+            self.close()
+            (self.root / f"delta.{old_gen}.jsonl").unlink(missing_ok=True)
+            (self.root / f"manifest.{old_gen}.json").unlink(missing_ok=True)
+            for n in set(self._segment_ids) - set(segments):
+                shutil.rmtree(self.root / f"seg.{n}", ignore_errors=True)
+            self._load()
+
+    def _write_atomic(self, name: str, text: str):
+        tmp = self.root / f"{name}.tmp"
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, self.root / name)
+
+    # ---------------- Queries ---------------- #
+    def _postings(self, term: str, with_positions: bool = False, only: set | None = None) -> dict:
+        """Live documents containing term (optionally only those in `only`) -> (tf, positions)."""
+        out = {}
+        for seg in self._segments:
+            for doc_id, tf, positions in seg.get(term, with_positions, only):
+                if self._docs[doc_id] is not None:
+                    out[doc_id] = (tf, positions)
+        for doc_id, positions in self._delta.get(term, {}).items():
+            if self._docs[doc_id] is not None and (only is None or doc_id in only):
+                out[doc_id] = (len(positions), positions)
+        return out
+
+    def _prefixed(self, prefix: str, limit: int = 64) -> list[str]:
+        if self._delta_terms is None:
+            self._delta_terms = sorted(self._delta)
+        lo = bisect.bisect_left(self._delta_terms, prefix)
+        hi = bisect.bisect_left(self._delta_terms, prefix + "\U0010ffff")
+        terms = set(self._delta_terms[lo:hi])
+        for seg in self._segments:
+            terms.update(seg.prefixed(prefix))
+        return sorted(terms)[:limit]
+
+    def _bm25(self, tf: int, df: int, doc_len: int, n_docs: int, avg_len: float) -> float:
+        idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        return idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * doc_len / avg_len))
+
+    def _phrase_matches(
+        self, words: list[str], only: set | None = None, limit: int | None = None,
+    ) -> tuple[dict[int, int], int]:
+        """
+        Live documents holding the phrase -> how many times it occurs.
+
+        Args:
+            only: look in these documents only
+            limit: stop once this many documents match; candidates are tried
+                best first (short documents where every word is frequent)
+
+        Returns:
+            (matches, df): df is the number of matching documents, estimated
+            from the share of candidates that matched when stopped early.
+        """
+        # rarest word first, so each later (longer) postings list is only kept for its few documents
+        by_word = {}
+        candidates = only
+        for w in sorted(set(words), key=self._df):
+            by_word[w] = self._postings(w, with_positions=True, only=candidates)
+            candidates = set(by_word[w])
+            if not candidates:
+                return {}, 0
+        lists = [by_word[w] for w in words]
+        order = list(candidates)
+        if limit is not None:
+            order.sort(key=lambda d: min(plist[d][0] for plist in lists) / self._docs[d][3], reverse=True)
+
+        matches = {}
+        checked = 0
+        for doc_id in order:
+            checked += 1
+            # the word least frequent in this document fixes where the phrase can
+            # start; every other word only has to confirm those starts
+            by_tf = sorted(range(len(words)), key=lambda k: lists[k][doc_id][0])
+            first = by_tf[0]
+            starts = [p - first for p in lists[first][doc_id][1] if p >= first]
+            for k in by_tf[1:]:
+                starts = _followed_by(starts, lists[k][doc_id][1], k)
+                if not starts:
+                    break
+            if starts:
+                matches[doc_id] = len(starts)
+                if limit is not None and len(matches) >= limit:
+                    break
+        df = len(matches) if checked == len(order) else round(len(matches) * len(order) / checked)
+        return matches, df
+
+    def _df(self, term: str) -> int:
+        """Documents holding term, deleted ones included (cheap; for ordering words)."""
+        n = len(self._delta.get(term, ()))
+        for seg in self._segments:
+            i = seg._ids.get(term)
+            if i is not None:
+                n += seg.df[i]
+        return n
+
+    def _score_unit(
+        self, kind: str, words: list[str], n_docs: int, avg_len: float,
+        only: set | None = None, limit: int | None = None,
+    ) -> dict[int, float]:
+        """BM25 scores of the documents matching one query part (phrases: see _phrase_matches)."""
+        scores: dict[int, float] = {}
+        if kind == "phrase" and len(words) > 1:
+            matches, df = self._phrase_matches(words, only, limit)
+            for doc_id, tf in matches.items():
+                scores[doc_id] = self._bm25(tf, df, self._docs[doc_id][3], n_docs, avg_len)
+            return scores
+
+        terms = self._prefixed(words[0]) if kind == "prefix" else words[:1]
+        for term in terms:
+            plist = self._postings(term)
+            for doc_id, (tf, _) in plist.items():
+                s = self._bm25(tf, len(plist), self._docs[doc_id][3], n_docs, avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + s
+        return scores
+
+    def search(self, query: str, limit: int = 10) -> list[SearchHit]:
+        """
+        Ranked search. Every query part must match:
+            word      a term
+            word*     any term starting with "word"
+            "a b c"   an exact phrase
+
+        Returns:
+            Best hits first, each with a snippet around the first match.
+        """
+        units = []
+        for phrase, word in _QUERY.findall(query):
+            words = tokenize(phrase or word)
+            if not words:
+                continue
+            if word.endswith("*") and len(words) == 1:
+                units.append(("prefix", words))
+            else:
+                units.append(("phrase" if len(words) > 1 else "term", words))
+        if not units:
+            return []
+
+        with self._lock:
+            n_docs = len(self._by_key)
+            if not n_docs:
+                return []
+            avg_len = self._live_len / n_docs
+            total: dict[int, float] | None = None
+            # phrases last: they only check documents matching everything else,
+            # and the last one can stop once `limit` documents match
+            units.sort(key=lambda unit: unit[0] == "phrase")
+            for i, (kind, words) in enumerate(units):
+                last = i == len(units) - 1
+                scores = self._score_unit(kind, words, n_docs, avg_len, only=None if total is None else set(total),
+                                          limit=limit if last else None)
+                if total is None:
+                    total = scores
+                else:
+                    total = {d: s + scores[d] for d, s in total.items() if d in scores}
+                if not total:
+                    return []
+            ranked = sorted(total.items(), key=lambda kv: -kv[1])[:limit]
+            docs = [(self._docs[d], s) for d, s in ranked]
+
+        pattern = _snippet_pattern(units)
+        hits = []
+        for (class_name, day, field, _), score in docs:
+            path = DATA_DIR / class_name / day / FIELDS[field]
+            hits.append(SearchHit(class_name, day, field, score, _snippet(path, pattern)))
+        return hits
+
+# ---------------- Helpers ---------------- #
+def _followed_by(starts: list[int], positions, k: int) -> list[int]:
+    """The phrase starts s with s + k in positions (both sorted), in one merge walk."""
+    out, j, n = [], 0, len(positions)
+    for s in starts:
+        j = bisect.bisect_left(positions, s + k, j)  # skip ahead instead of stepping
+        if j == n:
+            break
+        if positions[j] == s + k:
+            out.append(s)
+    return out
+
+def day_key(day_dir: str | Path) -> tuple[str, str]:
+    """(class name, day) for a day directory under DATA_DIR."""
+    day_dir = Path(day_dir).resolve()
+    try:
+        class_name, day = day_dir.relative_to(DATA_DIR.resolve()).parts[:2]
+    except ValueError:
+        class_name, day = day_dir.parent.name, day_dir.name
+    return class_name, day
+
+def _snippet_pattern(units) -> re.Pattern:
+    parts = []
+    for kind, words in units:
+        body = r"\W+".join(map(re.escape, words))
+        parts.append(rf"\b{body}\w*" if kind == "prefix" else rf"\b{body}\b")
+    return re.compile("|".join(parts), re.IGNORECASE)
+
+def _snippet(path: Path, pattern: re.Pattern, width: int = 80) -> str:
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError:
+        return ""
+    m = pattern.search(text)
+    if not m:
+        return " ".join(text[:2 * width].split())
+    start, end = max(0, m.start() - width), min(len(text), m.end() + width)
+    snippet = " ".join(text[start:end].split())
+    return ("…" if start else "") + snippet + ("…" if end < len(text) else "")
+
+_index: SearchIndex | None = None
+_index_lock = threading.Lock()
+
+def get_index() -> SearchIndex:
+    """The process-wide index over DATA_DIR, opened on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+        return _index
@@ -0,0 +1,242 @@
+"""
+Per-day store of timestamped transcript segments.
+
+Two files beside transcript.txt:
+    segments.idx  float32 starts[n], float32 ends[n], uint32 offsets[n + 1]
+                  (three columns, one after the other, little-endian)
+    segments.txt  the segment texts, one per line, in UTF-8; segment i is
+                  bytes offsets[i]:offsets[i + 1] (newline included)
+
+Both are memory-mapped, so finding the text at a time is a binary search
+over the starts column plus one slice of the blob; nothing else is read.
+
+Convert days saved before segments were kept with:
+    python -m core.segments [data dir]
+"""
+import argparse
+import mmap
+import os
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from .models import Segment, SegmentsInfo
+
+INDEX_NAME = "segments.idx"
+TEXT_NAME = "segments.txt"
+
+# ---------------- Write ---------------- #
+def write_segments(day_dir: str | Path, segments: Iterable[Segment], timing: str = "whisper") -> SegmentsInfo:
+    """
+    Write a day's segments (in time order), replacing any earlier ones.
+
+    Args:
+        day_dir: the day directory
+        segments: Segments with start/end in seconds from the start of the audio
+        timing: "whisper" or "estimated" (see SegmentsInfo)
+
+    Returns:
+        The description to keep in meta.json.
+    """
+    day_dir = Path(day_dir)
+    starts, ends, blobs = [], [], []
+    for seg in segments:
+        text = " ".join(seg.text.split())  # one line per segment
+        if text:
+            starts.append(seg.start)
+            ends.append(max(seg.end, seg.start))
+            blobs.append((text + "\n").encode("utf-8"))
+    offsets = np.zeros(len(blobs) + 1, "<u4")
+    np.cumsum([len(b) for b in blobs], out=offsets[1:])
+
+    # the text goes first: an index is only ever renamed in beside the blob it describes
+    _replace(day_dir / TEXT_NAME, b"".join(blobs))
+    columns = np.asarray(starts, "<f4").tobytes() + np.asarray(ends, "<f4").tobytes() + offsets.tobytes()
+    _replace(day_dir / INDEX_NAME, columns)
+    return SegmentsInfo(INDEX_NAME, TEXT_NAME, len(blobs), float(ends[-1]) if ends else 0.0, timing)
+
+def _replace(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+def has_segments(day_dir: str | Path) -> bool:
+    return (Path(day_dir) / INDEX_NAME).exists() and (Path(day_dir) / TEXT_NAME).exists()
+
+# ---------------- Read ---------------- #
+class SegmentStore:
+    """
+    Read-only view of a day's segments. Use as a context manager (or call
+    close()) so the files aren't held open; on Windows a mapped file can't
+    be replaced.
+    """
+
+    def __init__(self, day_dir: str | Path):
+        day_dir = Path(day_dir)
+        self._index_file = open(day_dir / INDEX_NAME, "rb")
+        self._text_file = open(day_dir / TEXT_NAME, "rb")
+        size = os.fstat(self._index_file.fileno()).st_size
+        n = max(0, (size - 4) // 12)
+        # mmap can't map an empty file, so an empty day reads from bytes instead
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b"\0" * 4
+        self._text = (
+            mmap.mmap(self._text_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if os.fstat(self._text_file.fileno()).st_size else b""
+        )
+        self.starts = np.frombuffer(self._index, "<f4", n, 0)
+        self.ends = np.frombuffer(self._index, "<f4", n, 4 * n)
+        self.offsets = np.frombuffer(self._index, "<u4", n + 1, 8 * n)
+
+    def close(self):
+        # the arrays point into the maps, so drop them first
+        self.starts = self.ends = self.offsets = None
+        for m in (self._index, self._text):
+            if isinstance(m, mmap.mmap):
+                m.close()
+        self._index_file.close()
+        self._text_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def duration(self) -> float:
+        return float(self.ends[-1]) if len(self) else 0.0
+
+    def __getitem__(self, i: int) -> Segment:
+        i = range(len(self))[i]  # bounds check and negative indexes
+        return Segment(float(self.starts[i]), float(self.ends[i]), self._slice(i, i + 1).rstrip("\n"))
+
+    def _slice(self, i: int, j: int) -> str:
+        return bytes(self._text[int(self.offsets[i]):int(self.offsets[j])]).decode("utf-8")
+
+    def index_at(self, t: float) -> int:
+        """Index of the segment being spoken at t (the last one starting at or before it), or -1."""
+        return int(np.searchsorted(self.starts, t, side="right")) - 1
+
+    def at(self, t: float) -> Segment | None:
+        """The segment being spoken at t seconds, or None before the first one."""
+        i = self.index_at(t)
+        return self[i] if i >= 0 else None
+
+    def span(self, t0: float, t1: float) -> tuple[int, int]:
+        """Index range [i, j) of the segments overlapping t0..t1."""
+        i = max(0, self.index_at(t0))
+        if i < len(self) and self.ends[i] <= t0:
+            i += 1  # t0 falls in the pause after segment i
+        j = int(np.searchsorted(self.starts, t1, side="left"))
+        return i, max(i, j)
+
+    def between(self, t0: float, t1: float) -> list[Segment]:
+        """Segments overlapping t0..t1 seconds."""
+        i, j = self.span(t0, t1)
+        texts = self._slice(i, j).split("\n")
+        return [Segment(float(self.starts[k]), float(self.ends[k]), texts[k - i]) for k in range(i, j)]
+
+    def text(self, t0: float = 0.0, t1: float = float("inf")) -> str:
+        """Text of the segments overlapping t0..t1 seconds, joined as the transcript joins them."""
+        i, j = self.span(t0, t1)
+        return self._slice(i, j).rstrip("\n").replace("\n", " ")
+
+def open_segments(day_dir: str | Path) -> SegmentStore | None:
+    """The day's SegmentStore, or None if it has none."""
+    return SegmentStore(day_dir) if has_segments(day_dir) else None
+
+# ---------------- Converter ---------------- #
+def estimate_segments(transcript: str, duration: float) -> list[Segment]:
+    """Sentences of a plain transcript, spread over duration seconds by their length."""
+    from .utils.chunking import iter_sentences
+
+    sentences = list(iter_sentences(transcript))
+    total = sum(len(s) for s in sentences) or 1
+    segments, pos = [], 0
+    for s in sentences:
+        start = duration * pos / total
+        pos += len(s)
+        segments.append(Segment(start, duration * pos / total, s))
+    return segments
+
+def _whisper_segments(audio_path: str, model_name: str) -> list[Segment] | None:
+    """Segments of a cached transcription of the recording, if there is one."""
+    from . import cache
+    from .services.transcriber import _transcript_key
+
+    for vad in (False, True):
+        cached = cache.results.get(_transcript_key(audio_path, model_name, vad))
+        if cached is not None:
+            return [Segment(**seg) for seg in cached["segments"]]
+    return None
+
+def _audio_seconds(day_dir: Path, audio_path: str) -> float | None:
+    from .utils.audio import SAMPLE_RATE, probe_duration
+
+    for npy in day_dir.glob("audio-*.npy"):  # decoded copy kept by an earlier run
+        return len(np.load(npy, mmap_mode="r")) / SAMPLE_RATE
+    return probe_duration(audio_path) if audio_path and Path(audio_path).exists() else None
+
+def convert_day(day_dir: str | Path, force: bool = False) -> str:
+    """
+    Build the segment store of a day saved before segments were kept.
+
+    Whisper's own timings are used when the transcription is still in the
+    result cache; otherwise transcript.txt is spread over the recording's
+    length sentence by sentence and the store is marked "estimated".
+
+    Returns:
+        What happened: "exists", "whisper", "estimated" or why it was skipped.
+    """
+    from .storage import load_meta, save_meta
+
+    day_dir = Path(day_dir)
+    if has_segments(day_dir) and not force:
+        return "exists"
+    meta = load_meta(day_dir)
+    if meta is None or not meta.audio_path:
+        return "skipped: no meta.json"
+
+    segments, timing = None, "whisper"
+    if Path(meta.audio_path).exists():
+        segments = _whisper_segments(meta.audio_path, meta.whisper_model)
+    if segments is None:
+        transcript_path = day_dir / "transcript.txt"
+        duration = _audio_seconds(day_dir, meta.audio_path)
+        if not transcript_path.exists() or not duration:
+            return "skipped: no transcript or audio length"
+        segments, timing = estimate_segments(transcript_path.read_text(encoding="utf-8"), duration), "estimated"
+
+    info = write_segments(day_dir, segments, timing)
+    save_meta(day_dir, meta.audio_path, meta.whisper_model, segments=info, transcribed_at=meta.transcribed_at)
+    return timing
+
+def convert_all(data_dir: str | Path, force: bool = False) -> dict[str, int]:
+    """Convert every day directory under data_dir; returns a count per outcome."""
+    outcomes: dict[str, int] = {}
+    for meta_path in sorted(Path(data_dir).glob("*/*/meta.json")):
+        try:
+            outcome = convert_day(meta_path.parent, force)
+        except Exception as e:
+            print(f"{meta_path.parent}: {e}")
+            outcome = "failed"
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    return outcomes
+
+if __name__ == "__main__":
+    from .config import DATA_DIR
+
+    ap = argparse.ArgumentParser(prog="python -m core.segments", description="Build segment stores for existing days.")
+    ap.add_argument("data_dir", nargs="?", default=str(DATA_DIR))
+    ap.add_argument("--force", action="store_true", help="rebuild days that already have one")
+    args = ap.parse_args()
+    for outcome, n in convert_all(args.data_dir, args.force).items():
+        print(f"{outcome}: {n}")
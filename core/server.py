@@ -0,0 +1,287 @@
+"""
+Local inference server: one process owns the Whisper and BART weights and
+serves every app window and CLI run on the machine.
+
+Start it with:
+    python -m core.server --preload small
+
+While it runs, transcribe_file / iter_segments and the BART summary engine
+send their model calls here instead of loading the models themselves.
+Summary requests that arrive together are run as one batch.
+
+The key file next to the socket is what lets clients in; by default only
+the user who started the server can read it. To share one server between
+the users of a machine (e.g. a lab), give them a common directory in
+LECTUREAI_SERVER_DIR and start the server with --shared, which makes the
+key and socket readable by the directory's group:
+    LECTUREAI_SERVER_DIR=/srv/lectureai python -m core.server --shared
+
+A client that can't use the server (no key, key not readable, the server
+can't read its audio) loads the models itself, and says so once per reason.
+"""
+import argparse
+import os
+import queue
+import secrets
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+from .config import SERVER_ADDRESS, SERVER_KEY_PATH, USE_SERVER
+
+_FAMILY = "AF_PIPE" if os.name == "nt" else "AF_UNIX"
+_serving = False  # True inside the server process, so it never calls itself
+
+class ServerUnavailable(Exception):
+    """No inference server is reachable; the caller runs the model in-process."""
+
+# ---------------- Client ---------------- #
+_fallbacks_logged: set[str] = set()
+
+def _fall_back(reason: str) -> ServerUnavailable:
+    """Log (once per reason) that models will load in this process instead."""
+    if reason not in _fallbacks_logged:
+        _fallbacks_logged.add(reason)
+        print(f"Inference server not used ({reason}); loading models in this process.")
+    return ServerUnavailable(reason)
+
+def available() -> bool:
+    """Whether model calls should go to a running server (cheap; checked per call)."""
+    if _serving or not USE_SERVER or not SERVER_KEY_PATH.exists():
+        return False
+    if os.name != "nt" and not Path(SERVER_ADDRESS).exists():
+        return False
+    if not os.access(SERVER_KEY_PATH, os.R_OK):
+        # another user's server, not started with --shared
+        _fall_back(f"can't read {SERVER_KEY_PATH}")
+        return False
+    return True
+
+def _connect():
+    try:
+        return Client(SERVER_ADDRESS, family=_FAMILY, authkey=SERVER_KEY_PATH.read_bytes())
+    except (OSError, EOFError, AuthenticationError) as e:
+        raise _fall_back(str(e) or type(e).__name__) from None
+
+def call(op: str, **params):
+    """
+    Run one request on the server and return its result.
+
+    Raises:
+        ServerUnavailable: the server can't be reached
+        RuntimeError: the request failed on the server
+    """
+    with _connect() as conn:
+        try:
+            conn.send((op, params))
+            kind, value = conn.recv()
+        except (OSError, EOFError) as e:
+            raise ServerUnavailable(str(e)) from None
+    if kind == "unavailable":
+        raise _fall_back(value)
+    if kind == "error":
+        raise RuntimeError(value)
+    return value
+
+def stream(op: str, **params):
+    """
+    Start a streaming request. The first reply is read before this returns,
+    so ServerUnavailable is raised here, not halfway through the results.
+
+    Returns:
+        An iterator over the items the server sends.
+    """
+    conn = _connect()
+    try:
+        conn.send((op, params))
+        first = conn.recv()
+    except (OSError, EOFError) as e:
+        conn.close()
+        raise ServerUnavailable(str(e)) from None
+    if first[0] == "unavailable":
+        conn.close()
+        raise _fall_back(first[1])
+
+    def items():
+        kind, value = first
+        with conn:
+            while True:
+                if kind == "item":
+                    yield value
+                elif kind == "error":
+                    raise RuntimeError(value)
+                else:
+                    return
+                try:
+                    kind, value = conn.recv()
+                except (OSError, EOFError) as e:
+                    raise ServerUnavailable(str(e)) from None
+
+    return items()
+
+# ---------------- Summary Batching ---------------- #
+class _SummaryBatcher:
+    """Collects summarize requests for a moment and runs them as one model call."""
+
+    def __init__(self, wait: float = 0.02, max_texts: int = 32):
+        self.wait = wait
+        self.max_texts = max_texts
+        self._requests: queue.Queue = queue.Queue()
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def summarize(
+        self, texts: list[str], max_length: int, min_length: int, batch_size: int, profile: str | None = None,
+    ) -> list[str]:
+        done = threading.Event()
+        # only requests for the same inference profile share a model call
+        request = {"texts": texts, "params": (max_length, min_length, profile), "batch_size": batch_size, "done": done}
+        self._requests.put(request)
+        done.wait()
+        if "error" in request:
+            raise request["error"]
+        return request["result"]
+
+    def _loop(self):
+        from .services.summarizer import run_pipeline, set_profile
+
+        held = []  # requests whose settings didn't match the last batch
+        while True:
+            first = held.pop(0) if held else self._requests.get()
+            batch, count = [first], len(first["texts"])
+            deadline = time.monotonic() + self.wait
+            while count < self.max_texts:
+                try:
+                    req = self._requests.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if req["params"] == first["params"]:
+                    batch.append(req)
+                    count += len(req["texts"])
+                else:
+                    held.append(req)
+
+            texts = [t for req in batch for t in req["texts"]]
+            try:
+                max_length, min_length, profile = first["params"]
+                if profile:  # clients from before profiles existed send none
+                    set_profile(profile)
+                batch_size = max(req["batch_size"] for req in batch)
+                results = run_pipeline(texts, max_length, min_length, batch_size)
+            except Exception as e:
+                for req in batch:
+                    req["error"] = e
+            else:
+                start = 0
+                for req in batch:
+                    req["result"] = results[start:start + len(req["texts"])]
+                    start += len(req["texts"])
+            for req in batch:
+                req["done"].set()
+
+# ---------------- Server ---------------- #
+_whisper_lock = threading.Lock()  # one decode at a time; they all want every core
+
+# What a client may set per request. Anything else is dropped: with --shared
+# the clients are other users, and e.g. where decoded audio is written (and
+# old files deleted) is the server's choice, not theirs.
+_PARAMS = {
+    "summarize": {"texts", "max_length", "min_length", "batch_size", "profile"},
+    "transcribe": {"audio_path", "model_name", "workers", "vad"},
+    "segments": {"audio_path", "model_name", "window_seconds"},
+}
+_MAX_WORKERS = os.cpu_count() or 1
+
+def _checked(op: str, params: dict) -> dict:
+    params = {k: v for k, v in params.items() if k in _PARAMS.get(op, ())}
+    if "workers" in params:
+        params["workers"] = max(1, min(int(params["workers"]), _MAX_WORKERS))
+    return params
+
+def _handle(conn, batcher: _SummaryBatcher):
+    from .services import transcriber
+
+    with conn:
+        try:
+            op, params = conn.recv()
+            params = _checked(op, params)
+            if op == "ping":
+                conn.send(("result", "pong"))
+            elif op == "summarize":
+                conn.send(("result", batcher.summarize(**params)))
+            elif op in ("transcribe", "segments") and not os.access(params["audio_path"], os.R_OK):
+                # a server run by another user may not see this user's files
+                conn.send(("unavailable", f"the server can't read {params['audio_path']}"))
+            elif op == "transcribe":
+                report: dict = {}
+                with _whisper_lock:
+                    text = transcriber.transcribe_file(**params, report=report)
+                conn.send(("result", {"text": text, "report": report}))
+            elif op == "segments":
+                with _whisper_lock:
+                    for seg in transcriber.iter_segments(**params):
+                        conn.send(("item", seg.to_dict()))
+                conn.send(("end", None))
+            else:
+                conn.send(("error", f"unknown request {op!r}"))
+        except (OSError, EOFError):
+            pass  # client went away
+        except Exception as e:
+            try:
+                conn.send(("error", str(e) or type(e).__name__))
+            except OSError:
+                pass
+
+def serve(preload: list[str] | None = None, shared: bool = False):
+    """
+    Accept requests until interrupted.
+
+    Args:
+        preload: whisper models to load at start-up
+        shared: let the group of the server directory connect, not just this user
+    """
+    global _serving
+    _serving = True
+
+    key = secrets.token_bytes(32)
+    mode = 0o640 if shared else 0o600
+    SERVER_KEY_PATH.parent.mkdir(parents=True, exist_ok=True)
+    if _FAMILY == "AF_UNIX":
+        Path(SERVER_ADDRESS).unlink(missing_ok=True)  # left over from a crash
+    listener = Listener(SERVER_ADDRESS, family=_FAMILY, authkey=key)
+    # the key file is what lets clients in, so only this user (or, shared, its group) may read it
+    fd = os.open(SERVER_KEY_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    if os.name != "nt":  # the modes above are masked by the umask, and an old key file keeps its own
+        os.chmod(SERVER_KEY_PATH, mode)
+        os.chmod(SERVER_ADDRESS, mode | 0o020 if shared else mode)  # connecting needs write access
+
+    from .services import transcriber
+    for name in preload or []:
+        transcriber.get_model(name)
+    batcher = _SummaryBatcher()
+    print(f"Inference server listening on {SERVER_ADDRESS}" + (" (shared with its group)" if shared else ""))
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:  # failed handshake (wrong key, stray client)
+                print("Inference server error:", e)
+                continue
+            threading.Thread(target=_handle, args=(conn, batcher), daemon=True).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        SERVER_KEY_PATH.unlink(missing_ok=True)
+        if _FAMILY == "AF_UNIX":
+            Path(SERVER_ADDRESS).unlink(missing_ok=True)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m core.server", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--preload", nargs="*", default=[], help="whisper models to load at start-up")
+    ap.add_argument("--shared", action="store_true", help="let other users in the server directory's group connect")
+    args = ap.parse_args()
+    serve(args.preload, args.shared)
@@ -0,0 +1,94 @@
+# core/services/extractive.py
+
+import re
+
+import numpy as np
+
+from ..utils.chunking import approx_token_count, iter_sentences
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Words too common to say anything about what a sentence is about
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being but by can could
+did do does doing don't down during each for from get got had has have having he her here hers him
+his how i i'm if in into is it it's its just know let's like me more most my no not now of off on
+once only or other our out over really right say so some such than that that's the their them then
+there there's these they this those through to too um uh up very was we we're well were what when
+where which while who why will with would yeah you you're your
+""".split())
+
+def _sentence_vectors(sentences: list[str]) -> np.ndarray:
+    """L2-normalized TF-IDF row per sentence (dense; a chunk has at most a few hundred)."""
+    vocab: dict[str, int] = {}
+    rows, cols = [], []
+    for i, sentence in enumerate(sentences):
+        for word in _WORD.findall(sentence.lower()):
+            if word not in STOPWORDS:
+                rows.append(i)
+                cols.append(vocab.setdefault(word, len(vocab)))
+    n, v = len(sentences), max(1, len(vocab))
+    tf = np.bincount(np.asarray(rows, dtype=np.int64) * v + np.asarray(cols, dtype=np.int64), minlength=n * v)
+    tf = tf.reshape(n, v).astype(np.float32)
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log((1 + n) / (1 + df)).astype(np.float32) + 1.0
+    vectors = np.log1p(tf) * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+def rank_sentences(sentences: list[str], damping: float = 0.85, iterations: int = 50) -> np.ndarray:
+    """
+    TextRank scores: PageRank over the cosine-similarity graph of the sentences,
+    mixed with each sentence's similarity to the centroid of the text.
+
+    Returns:
+        One score per sentence (higher is more central).
+    """
+    vectors = _sentence_vectors(sentences)
+    sim = vectors @ vectors.T
+    np.fill_diagonal(sim, 0.0)
+
+    out_weight = sim.sum(axis=1, keepdims=True)
+    # sentences with no links spread their rank evenly
+    transition = np.divide(sim, out_weight, out=np.full_like(sim, 1.0 / len(sentences)), where=out_weight > 0)
+    rank = np.full(len(sentences), 1.0 / len(sentences), dtype=np.float32)
+    for _ in range(iterations):
+        new = (1 - damping) / len(sentences) + damping * (rank @ transition)
+        if np.abs(new - rank).sum() < 1e-6:
+            rank = new
+            break
+        rank = new
+
+    centroid = vectors.sum(axis=0)
+    centroid /= np.linalg.norm(centroid) or 1.0
+    return rank / (rank.max() or 1.0) + vectors @ centroid
+
+def extract_summary(text: str, max_length: int = 150, min_length: int = 50) -> str:
+    """
+    Pick the most central sentences of text, in their original order.
+
+    Args:
+        text: the text to summarize
+        max_length: token budget of the extract
+        min_length: sentences over budget are still taken until the extract
+            is at least this long
+
+    Returns:
+        The extract as a single string.
+    """
+    sentences = list(iter_sentences(text))
+    if len(sentences) <= 1:
+        return text.strip()
+
+    scores = rank_sentences(sentences)
+    lengths = [approx_token_count(s) for s in sentences]
+    chosen, used = [], 0
+    for i in np.argsort(-scores, kind="stable"):
+        if used + lengths[i] > max_length and used >= min_length:
+            continue
+        chosen.append(i)
+        used += lengths[i]
+        if used >= max_length:
+            break
+    return " ".join(sentences[i] for i in sorted(chosen))
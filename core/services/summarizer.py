@@ -1,36 +1,385 @@
 # core/services/summarizer.py
 
-from ..utils.chunking import chunk_text  # helper to split long text
+import hashlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable
+
+from .. import cache, metrics, server
+from ..config import INFERENCE_PROFILE
+from ..governor import get_governor, module_mb
+from ..utils.chunking import approx_token_count, iter_token_chunks  # sentence-aware, token-budgeted chunks
+from .extractive import extract_summary
+from .profiles import PROFILES, InferenceProfile, apply_threads, get_profile, load_seq2seq
+
+MODEL_NAME = "facebook/bart-large-cnn"
+DEFAULT_ENGINE = "bart"
 
 _summarizer = None  # lazy-loaded for speed
+_tokenizer = None
+_profile = PROFILES.get(INFERENCE_PROFILE, PROFILES["default"])
+
+# Summaries of every text the model has seen, keyed by content + settings.
+# Lets hierarchical mode recompute only the branch above a changed chunk.
+_CACHE_SIZE = 4096
+_cache: "OrderedDict[str, str]" = OrderedDict()
+
+def set_profile(profile: str | InferenceProfile):
+    """Switch the CPU inference profile; a loaded model is rebuilt on next use."""
+    global _profile, _summarizer
+    profile = get_profile(profile)
+    if profile != _profile:
+        _profile, _summarizer = profile, None
+        get_governor().forget("summarizer")
+
+def current_profile() -> InferenceProfile:
+    return _profile
 
 def _lazy_summarizer():
     """Import summarization pipeline only when needed (first call)."""
     global _summarizer
     if _summarizer is None:
         from transformers import pipeline  # type: ignore
-        _summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+        profile = _profile
+        with metrics.span("bart.load_model", model=MODEL_NAME, profile=profile.name):
+            apply_threads(profile)
+            _summarizer = pipeline("summarization", model=load_seq2seq(MODEL_NAME, profile), tokenizer=_lazy_tokenizer())
+        label = "BART int8" if profile.quantize else "BART"
+        get_governor().register("summarizer", label, module_mb(_summarizer.model, 1600), _unload_summarizer)
     return _summarizer
 
-def summarize_text(text: str, max_chunk: int = 1000, max_length: int = 150, min_length: int = 50) -> str:
+def _unload_summarizer():
+    """Called by the memory governor (core.governor); the tokenizer stays, it is small and chunking needs it."""
+    global _summarizer
+    _summarizer = None
+
+def _lazy_tokenizer():
+    """The model's tokenizer on its own (a few MB), so chunking never needs the weights."""
+    global _tokenizer
+    if _tokenizer is None:
+        if _summarizer is not None:
+            _tokenizer = _summarizer.tokenizer
+        else:
+            from transformers import AutoTokenizer  # type: ignore
+            _tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    return _tokenizer
+
+def token_counter():
+    """Return a tokenizer-backed token counter, or None while the tokenizer isn't loaded."""
+    if _tokenizer is None:
+        return None
+    tokenizer = _tokenizer
+    return lambda s: len(tokenizer.encode(s, add_special_tokens=False))
+
+def run_pipeline(texts: list[str], max_length: int, min_length: int, batch_size: int) -> list[str]:
+    """Summarize texts with the in-process model."""
+    # chunks are packed close to the budget, so padding per batch stays small
+    with get_governor().using("summarizer"):
+        results = _lazy_summarizer()(
+            texts,
+            batch_size=max(1, batch_size),
+            max_length=max_length,
+            min_length=min_length,
+            do_sample=False,
+            truncation=True,
+        )
+    return [r["summary_text"].strip() for r in results]
+
+# ---------------- Engines ---------------- #
+class SummaryEngine(ABC):
+    """
+    What the chunking, caching and map-reduce code needs from a summarizer.
+
+    Subclasses set `name` (part of every cache key) and implement window()
+    and summarize(); one missing either can't be instantiated.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def window(self) -> int:
+        """Max input tokens per summarize() text."""
+
+    def token_counter(self):
+        """Token counter matching window(), or None for the approximate default."""
+        return None
+
+    @abstractmethod
+    def summarize(self, texts: list[str], max_length: int, min_length: int, batch_size: int) -> list[str]:
+        """One summary per text, in order."""
+
+class BartEngine(SummaryEngine):
+    """
+    Abstractive summaries from the transformers pipeline (downloads MODEL_NAME
+    on first use). Model calls go to the inference server when one is running.
+    """
+
+    @property
+    def name(self) -> str:
+        # int8 weights word summaries slightly differently, so they get their own cache entries
+        return MODEL_NAME + ("+int8" if _profile.quantize else "")
+
+    def window(self) -> int:
+        # leave room for <s> and </s>
+        return _lazy_tokenizer().model_max_length - 2
+
+    def token_counter(self):
+        _lazy_tokenizer()
+        return token_counter()
+
+    def summarize(self, texts, max_length, min_length, batch_size):
+        if server.available():
+            try:
+                # the server runs this process's profile too, so results match the cache key (see name)
+                return server.call("summarize", texts=texts, max_length=max_length,
+                                   min_length=min_length, batch_size=batch_size, profile=_profile.name)
+            except server.ServerUnavailable:
+                pass  # the server went away; summarize in-process instead
+        return run_pipeline(texts, max_length, min_length, batch_size)
+
+class TextRankEngine(SummaryEngine):
+    """Extractive summaries (see extractive.py): no model, a few ms per chunk."""
+
+    name = "textrank"
+
+    def window(self) -> int:
+        # no model limit; this only bounds the sentence-similarity matrix
+        return 4096
+
+    def token_counter(self):
+        return approx_token_count
+
+    def summarize(self, texts, max_length, min_length, batch_size):
+        return [extract_summary(t, max_length, min_length) for t in texts]
+
+ENGINES: dict[str, SummaryEngine] = {
+    "bart": BartEngine(),
+    "textrank": TextRankEngine(),
+}
+
+def get_engine(engine: str | SummaryEngine = DEFAULT_ENGINE) -> SummaryEngine:
+    """Look up an engine by name (engine objects are passed through)."""
+    if isinstance(engine, SummaryEngine):
+        return engine
+    try:
+        return ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown summary engine {engine!r} (choose from {', '.join(ENGINES)})") from None
+
+def _chunks(text: str, max_chunk: int, overlap: int, engine: SummaryEngine) -> list[str]:
+    window = engine.window()
+    return list(iter_token_chunks(text, min(max_chunk, window), overlap, engine.token_counter()))
+
+def _result_key(mode: str, text: str, engine: SummaryEngine, *params) -> str:
+    """Key for a whole-transcript result in the on-disk cache."""
+    return cache.make_key("summary", mode, cache.hash_text(text), engine.name, *params)
+
+def _cache_key(text: str, max_length: int, min_length: int, engine: SummaryEngine) -> str:
+    h = hashlib.sha1(f"{engine.name}|{max_length}|{min_length}|".encode("utf-8"))
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+def _summarize_batch(
+    texts: list[str],
+    max_length: int,
+    min_length: int,
+    batch_size: int,
+    engine: SummaryEngine,
+    memo: dict | None = None,
+    stats: dict | None = None,
+    check: Callable[[], None] | None = None,
+) -> list[str]:
+    """
+    Summarize texts in batches, skipping any whose summary is already cached.
+
+    memo (content key -> summary, e.g. loaded from a day directory) seeds the
+    cache and is replaced with the summaries of exactly these texts. stats
+    gets "recomputed"/"reused" counts. check is called before every batch;
+    whatever it raises stops the run (e.g. JobContext.check on cancel).
+    """
+    keys = [_cache_key(t, max_length, min_length, engine) for t in texts]
+    if memo:
+        for k in keys:
+            if k not in _cache and k in memo:
+                _cache[k] = memo[k]
+    todo = {k: t for k, t in zip(keys, texts) if k not in _cache}
+    if stats is not None:
+        stats["recomputed"] = stats.get("recomputed", 0) + len(todo)
+        stats["reused"] = stats.get("reused", 0) + len(texts) - len(todo)
+    metrics.count("summary.reused", len(texts) - len(todo))
+
+    if todo:
+        pending = list(todo.items())
+        with metrics.span(f"{engine.name}.summarize", chunks=len(todo), batch_size=batch_size):
+            for i in range(0, len(pending), batch_size):
+                if check is not None:
+                    check()
+                batch = pending[i:i + batch_size]
+                results = engine.summarize([t for _, t in batch], max_length, min_length, batch_size)
+                for (k, _), r in zip(batch, results):
+                    _cache[k] = r
+
+    outputs = []
+    for k in keys:
+        _cache.move_to_end(k)
+        outputs.append(_cache[k])
+    while len(_cache) > _CACHE_SIZE:
+        _cache.popitem(last=False)
+    if memo is not None:
+        memo.clear()
+        memo.update(zip(keys, outputs))
+    return outputs
+
+def summarize_batch(
+    texts: list[str],
+    max_length: int = 150,
+    min_length: int = 50,
+    batch_size: int = 8,
+    engine: str | SummaryEngine = DEFAULT_ENGINE,
+    memo: dict | None = None,
+    stats: dict | None = None,
+) -> list[str]:
     """
-    Summarize long text by splitting into chunks and combining results.
+    Summarize already-chunked texts (e.g. chunks arriving from a stream).
+
+    Args:
+        texts: chunks that fit the engine's window
+        max_length: max tokens in each summary
+        min_length: min tokens in each summary
+        batch_size: texts fed to the model per forward pass
+        engine: engine name or SummaryEngine
+        memo: summaries by content key from an earlier run; it is replaced
+            with the summaries of exactly these texts
+        stats: filled with "recomputed" and "reused" counts
+
+    Returns:
+        One summary per text, in order.
+    """
+    return _summarize_batch(texts, max_length, min_length, batch_size, get_engine(engine), memo, stats)
+
+def summarize_chunks(
+    text: str,
+    max_chunk: int = 512,
+    overlap: int = 0,
+    max_length: int = 150,
+    min_length: int = 50,
+    batch_size: int = 8,
+    memo: dict | None = None,
+    stats: dict | None = None,
+    engine: str | SummaryEngine = DEFAULT_ENGINE,
+    check: Callable[[], None] | None = None,
+) -> list[str]:
+    """
+    Split text into chunks once and summarize them in batches.
 
     Args:
         text: the transcript text to summarize
-        max_chunk: max characters per chunk
+        max_chunk: max model tokens per chunk (capped at the model's window)
+        overlap: tokens of context repeated between neighbouring chunks
         max_length: max tokens in summary
         min_length: min tokens in summary
+        batch_size: chunks fed to the model per forward pass
+        memo: per-chunk summaries by content key from an earlier run; only
+            chunks missing from it are re-inferred, and it is updated in place
+        stats: filled with "recomputed" and "reused" chunk counts
+        engine: "bart" (abstractive), "textrank" (extractive, no model) or
+            any SummaryEngine
+        check: called between model batches; raise from it to stop (e.g. on cancel)
+
+    Returns:
+        One summary per chunk, in chunk order.
+    """
+    engine = get_engine(engine)
+    # v2: the entry holds {"keys", "summaries"}; older entries are a bare list
+    key = _result_key("chunks", text, engine, max_chunk, overlap, max_length, min_length, "v2")
+    cached = cache.results.get(key)
+    if cached is not None:
+        if memo is not None:
+            memo.clear()
+            memo.update(zip(cached["keys"], cached["summaries"]))
+        if stats is not None:
+            stats["recomputed"] = stats.get("recomputed", 0)
+            stats["reused"] = stats.get("reused", 0) + len(cached["keys"])
+        return cached["summaries"]
+
+    with metrics.span("summary.chunking") as record:
+        chunks = _chunks(text, max_chunk, overlap, engine)
+        record["chunks"] = len(chunks)
+    outputs = _summarize_batch(chunks, max_length, min_length, batch_size, engine, memo, stats, check)
+    keys = [_cache_key(c, max_length, min_length, engine) for c in chunks]
+    cache.results.put(key, {"keys": keys, "summaries": outputs})
+    return outputs
+
+def summarize_hierarchical(
+    text: str,
+    max_chunk: int = 512,
+    overlap: int = 0,
+    max_length: int = 150,
+    min_length: int = 50,
+    batch_size: int = 8,
+    memo: dict | None = None,
+    stats: dict | None = None,
+    engine: str | SummaryEngine = DEFAULT_ENGINE,
+    check: Callable[[], None] | None = None,
+) -> str:
+    """
+    Map-reduce summary: summarize chunks, then summarize groups of summaries
+    level by level until everything fits one model window.
+
+    Args:
+        text: the transcript text to summarize
+        max_chunk: max model tokens per chunk (capped at the model's window)
+        overlap: tokens of context repeated between neighbouring chunks
+        max_length: max tokens in each summary
+        min_length: min tokens in each summary
+        batch_size: texts fed to the model per forward pass
+        memo: per-chunk summaries from an earlier run (see summarize_chunks)
+        stats: filled with "recomputed" and "reused" chunk counts
+        engine: engine name or SummaryEngine (see summarize_chunks)
+        check: called between model batches (see summarize_chunks)
 
     Returns:
         A single summary string.
     """
-    pipe = _lazy_summarizer()
-    chunks = chunk_text(text, max_chars=max_chunk)
+    engine = get_engine(engine)
+    key = _result_key("hierarchical", text, engine, max_chunk, overlap, max_length, min_length)
+    cached = cache.results.get(key)
+    if cached is not None:
+        return cached
 
-    outputs = []
-    for chunk in chunks:
-        result = pipe(chunk, max_length=max_length, min_length=min_length, do_sample=False)
-        outputs.append(result[0]["summary_text"])
+    summary = _reduce(
+        summarize_chunks(text, max_chunk, overlap, max_length, min_length, batch_size, memo, stats, engine, check),
+        max_length, min_length, batch_size, engine, check,
+    )
+    cache.results.put(key, summary)
+    return summary
+
+def reduce_summaries(
+    summaries: list[str],
+    max_length: int = 150,
+    min_length: int = 50,
+    batch_size: int = 8,
+    engine: str | SummaryEngine = DEFAULT_ENGINE,
+) -> str:
+    """Combine per-chunk summaries into one, as summarize_hierarchical does."""
+    return _reduce(summaries, max_length, min_length, batch_size, get_engine(engine))
+
+def _reduce(
+    level: list[str], max_length: int, min_length: int, batch_size: int, engine: SummaryEngine,
+    check: Callable[[], None] | None = None,
+) -> str:
+    """Summarize groups of summaries level by level until one summary is left."""
+    if len(level) <= 1:
+        return level[0] if level else ""
+
+    window = engine.window()
+    count = engine.token_counter() or approx_token_count
+    # groups have a fixed size, so editing one chunk only changes its own group
+    fanout = max(2, window // max_length)
+    while count(" ".join(level)) > window:
+        groups = [" ".join(level[i:i+fanout]) for i in range(0, len(level), fanout)]
+        level = _summarize_batch(groups, max_length, min_length, batch_size, engine, check=check)
 
-    return " ".join(outputs).strip()
+    if len(level) == 1:
+        return level[0]
+    return _summarize_batch([" ".join(level)], max_length, min_length, batch_size, engine, check=check)[0]
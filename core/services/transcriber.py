@@ -1,7 +1,42 @@
 # core/services/transcriber.py
 
+import bisect
+import gc
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from .. import cache, metrics, server
+from ..config import WHISPER_MEMORY_BUDGET_MB
+from ..governor import get_governor, module_mb
+from ..models import Segment
+from ..utils.audio import SAMPLE_RATE, TimeMap, decode_to_npy, find_silences, remove_silence, speech_ranges, split_on_silence
+
 _whisper = None  # lazy-loaded so the app starts fast
 
+# Approximate resident size of each checkpoint in MB (fp32 weights)
+MODEL_SIZES_MB = {
+    "tiny": 150,
+    "base": 290,
+    "small": 970,
+    "medium": 3000,
+    "large": 6200,
+}
+
+# ---------------- Model Registry ---------------- #
+# Loaded models stay resident, keyed by (model_name, device), in LRU order.
+_models: "OrderedDict[tuple[str, str], object]" = OrderedDict()
+_models_lock = threading.Lock()
+_load_locks: dict[tuple[str, str], threading.Lock] = {}
+
 def _lazy_whisper():
     """Import whisper only when needed (first call)."""
     global _whisper
@@ -10,18 +45,400 @@ def _lazy_whisper():
         _whisper = whisper
     return _whisper
 
-def transcribe_file(audio_path: str, model_name: str = "small") -> str:
+def _default_device() -> str:
+    import torch  # type: ignore
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def _size_mb(model_name: str) -> int:
+    return MODEL_SIZES_MB.get(model_name.split(".")[0].split("-")[0], 1000)
+
+def _governor_key(key: tuple[str, str]) -> str:
+    return f"whisper:{key[0]}:{key[1]}"
+
+def _unload(key: tuple[str, str]):
+    """Called by the memory governor (core.governor) when the model sits idle or memory is short."""
+    with _models_lock:
+        _models.pop(key, None)
+
+def _evict_for(model_name: str):
+    """Drop least recently used models until model_name fits the memory budget."""
+    needed = _size_mb(model_name)
+    evicted = []
+    with _models_lock:
+        while _models and sum(_size_mb(n) for n, _ in _models) + needed > WHISPER_MEMORY_BUDGET_MB:
+            evicted.append(_models.popitem(last=False)[0])
+    for key in evicted:
+        get_governor().forget(_governor_key(key))
+    if evicted:
+        gc.collect()
+
+def in_use(model_name: str, device: str | None = None):
+    """Context manager keeping a model loaded while it is being used (see ModelGovernor.using)."""
+    return get_governor().using(_governor_key((model_name, device or _default_device())))
+
+def get_model(model_name: str = "small", device: str | None = None):
+    """
+    Return a resident Whisper model, loading it on first use.
+
+    Args:
+        model_name: whisper model size ("tiny", "base", "small", "medium", "large")
+        device: torch device ("cpu", "cuda"); defaults to cuda when available
+
+    Returns:
+        The loaded whisper model.
+    """
+    key = (model_name, device or _default_device())
+    with _models_lock:
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    # one loader per key, so a pre-warm and a transcription never load twice
+    with load_lock:
+        with _models_lock:
+            model = _models.get(key)
+            if model is not None:
+                _models.move_to_end(key)
+                return model
+        _evict_for(model_name)
+        with metrics.span("whisper.load_model", model=model_name, device=key[1]):
+            model = _lazy_whisper().load_model(model_name, device=key[1])
+        with _models_lock:
+            _models[key] = model
+        get_governor().register(
+            _governor_key(key), f"Whisper {model_name}", module_mb(model, _size_mb(model_name)),
+            lambda: _unload(key),
+        )
+        return model
+
+def prewarm_model(model_name: str, device: str | None = None) -> threading.Thread:
+    """Load a model in a background thread so the next transcription starts right away."""
+    def work():
+        try:
+            get_model(model_name, device)
+        except Exception as e:
+            print("Whisper pre-warm error:", e)
+
+    t = threading.Thread(target=work, daemon=True)
+    t.start()
+    return t
+
+# ---------------- Decoded Audio ---------------- #
+def pcm_path(audio_path: str, pcm_dir: str | Path) -> Path:
+    """Where load_pcm keeps the decoded samples of audio_path."""
+    return Path(pcm_dir) / f"audio-{cache.hash_file(audio_path)[:16]}.npy"
+
+def load_pcm(audio_path: str, pcm_dir: str | Path | None = None) -> np.ndarray:
+    """
+    16 kHz mono float32 samples of an audio file.
+
+    Args:
+        audio_path: path to the audio file
+        pcm_dir: keep the decoded samples here as a .npy named after the
+            source file's hash (e.g. the day directory), and map it instead of
+            decoding again; None decodes into memory every time
+
+    Returns:
+        The samples; a copy-on-write memory map when pcm_dir is given, so
+        every run and process reading the same recording shares its pages.
+    """
+    if pcm_dir is None:
+        return _lazy_whisper().load_audio(audio_path)
+    path = pcm_path(audio_path, pcm_dir)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for old in path.parent.glob("audio-*.npy"):
+            old.unlink(missing_ok=True)  # decoded from a recording this day no longer uses
+        with metrics.span("audio.decode") as record:
+            decode_to_npy(audio_path, path)
+            record["audio_seconds"] = _npy_seconds(path)
+    return np.load(path, mmap_mode="c")
+
+def _npy_seconds(path: Path) -> float:
+    return len(np.load(path, mmap_mode="r")) / SAMPLE_RATE
+
+def transcribe_file(
+    audio_path: str,
+    model_name: str = "small",
+    workers: int = 1,
+    pcm_dir: str | Path | None = None,
+    vad: bool = False,
+    report: dict | None = None,
+) -> str:
     """
     Transcribe an audio file using Whisper.
-    
+
     Args:
         audio_path: path to the audio file (.mp3, .wav, .m4a, etc.)
         model_name: whisper model size ("tiny", "base", "small", "medium", "large")
+        workers: when > 1, split the audio at silences and transcribe the
+            shards in parallel processes (see transcribe_sharded)
+        pcm_dir: reuse decoded audio kept in this directory (see load_pcm)
+        vad: skip non-speech stretches before decoding (see
+            utils.audio.speech_ranges); timestamps still refer to the file
+        report: filled with "audio_seconds", "speech_seconds",
+            "removed_seconds", "transcribe_seconds" and "speedup" (how much
+            less audio Whisper decoded), or "cached" on a cache hit
 
     Returns:
         The transcribed text as a string.
     """
-    whisper = _lazy_whisper()
-    model = whisper.load_model(model_name)
-    result = model.transcribe(audio_path)
-    return result.get("text", "").strip()
+    report = {} if report is None else report
+    key = _transcript_key(audio_path, model_name, vad)
+    cached = cache.results.get(key)
+    if cached is not None:
+        report["cached"] = True
+        return cached["text"]
+
+    if server.available():
+        try:
+            # the server decodes into memory: pcm_dir is this user's, not its to write to
+            result = server.call("transcribe", audio_path=audio_path, model_name=model_name, workers=workers, vad=vad)
+            report.update(result["report"])
+            return result["text"]
+        except server.ServerUnavailable:
+            pass  # no server after all: transcribe in-process
+
+    started = time.perf_counter()
+    if workers > 1:
+        segments = transcribe_sharded(audio_path, model_name, workers, pcm_dir=pcm_dir, vad=vad, report=report)
+        text = " ".join(seg.text for seg in segments).strip()
+    else:
+        if vad or pcm_dir is not None:
+            audio = load_pcm(audio_path, pcm_dir)
+        else:
+            audio = audio_path  # let whisper decode it
+        timemap = None
+        if vad:
+            with metrics.span("audio.vad"):
+                ranges = speech_ranges(audio)
+                _vad_report(report, len(audio), ranges)
+                audio, timemap = remove_silence(audio, ranges=ranges)
+        with in_use(model_name):
+            model = get_model(model_name)
+            with metrics.span("whisper.transcribe", model=model_name) as record:
+                # nothing but silence: don't let whisper invent text for it
+                result = model.transcribe(audio) if len(audio) else {}
+                if isinstance(audio, str):  # whisper decoded it; the last segment's end is close enough
+                    record["audio_seconds"] = max((seg["end"] for seg in result.get("segments", [])), default=0.0)
+                else:
+                    record["audio_seconds"] = len(audio) / SAMPLE_RATE
+        text = result.get("text", "").strip()
+        segments = [
+            _segment(seg, timemap)
+            for seg in result.get("segments", [])
+            if seg["text"].strip()
+        ]
+    report["transcribe_seconds"] = time.perf_counter() - started
+    _cache_transcript(key, text, segments)
+    return text
+
+def _segment(seg: dict, timemap: TimeMap | None, offset: float = 0.0) -> Segment:
+    """A whisper segment as a Segment, with times mapped back to the original audio."""
+    start, end = seg["start"], seg["end"]
+    if timemap is not None:
+        start, end = timemap.to_original(start), timemap.to_original(end)
+    return Segment(offset + start, offset + end, seg["text"].strip())
+
+def _vad_report(report: dict, total_samples: int, ranges: list[tuple[int, int]]):
+    speech = sum(e - s for s, e in ranges)
+    report["audio_seconds"] = total_samples / SAMPLE_RATE
+    report["speech_seconds"] = speech / SAMPLE_RATE
+    report["removed_seconds"] = (total_samples - speech) / SAMPLE_RATE
+    report["speedup"] = total_samples / speech if speech else float("inf")
+
+def _transcript_key(audio_path: str, model_name: str, vad: bool = False) -> str:
+    parts = ("vad",) if vad else ()  # VAD runs get their own entry; plain keys are unchanged
+    return cache.make_key("transcript", cache.hash_file(audio_path), model_name, *parts)
+
+def _cache_transcript(key: str, text: str, segments: list[Segment]):
+    cache.results.put(key, {"text": text, "segments": [s.to_dict() for s in segments]})
+
+def iter_segments(
+    audio_path: str,
+    model_name: str = "small",
+    window_seconds: float = 30.0,
+    pcm_dir: str | Path | None = None,
+) -> Iterator[Segment]:
+    """
+    Transcribe an audio file window by window, yielding segments as they are decoded.
+
+    Args:
+        audio_path: path to the audio file (.mp3, .wav, .m4a, etc.)
+        model_name: whisper model size ("tiny", "base", "small", "medium", "large")
+        window_seconds: most audio decoded per model call; windows end at a
+            silence in their back half when there is one. Smaller windows give
+            earlier first text, whisper's native 30 s window decodes fastest
+        pcm_dir: reuse decoded audio kept in this directory (see load_pcm)
+
+    Yields:
+        Segments with start/end times relative to the whole file.
+    """
+    key = _transcript_key(audio_path, model_name)
+    cached = cache.results.get(key)
+    if cached is not None:
+        yield from (Segment(**seg) for seg in cached["segments"])
+        return
+
+    if server.available():
+        try:
+            remote = server.stream("segments", audio_path=audio_path, model_name=model_name,
+                                   window_seconds=window_seconds)
+        except server.ServerUnavailable:
+            remote = None  # no server after all: transcribe in-process
+        if remote is not None:
+            yield from (Segment(**seg) for seg in remote)
+            return
+
+    audio = load_pcm(audio_path, pcm_dir)
+    # windows end in silences where possible, so words aren't cut in two
+    with metrics.span("audio.find_silences"):
+        cuts = [(s + e) // 2 for s, e in find_silences(audio, SAMPLE_RATE)]
+
+    segments = []
+    max_len = max(1, int(window_seconds * SAMPLE_RATE))
+    prompt = None
+    offset = 0
+    while offset < len(audio):
+        end, hard_cut = _window_end(cuts, offset, max_len, len(audio))
+        window = audio[offset:end]
+        # fetched per window: the model may have been unloaded while the consumer paused
+        with in_use(model_name):
+            model = get_model(model_name)
+            with metrics.span("whisper.transcribe", model=model_name, audio_seconds=len(window) / SAMPLE_RATE):
+                result = model.transcribe(window, initial_prompt=prompt, fp16=model.device.type == "cuda")
+        model = None  # not pinned while the consumer holds the generator
+        found = [seg for seg in result.get("segments", []) if seg["text"].strip()]
+        if hard_cut and len(found) > 1:
+            # no silence to cut at: the last segment may hold a clipped word, so
+            # drop it and start the next window where it began
+            resume = offset + int(found[-1]["start"] * SAMPLE_RATE)
+            if resume > offset:
+                found, end = found[:-1], resume
+        t0 = offset / SAMPLE_RATE
+        for seg in found:
+            segments.append(Segment(t0 + seg["start"], t0 + seg["end"], seg["text"].strip()))
+            yield segments[-1]
+        # carry the tail of what was kept as context so sentences continue naturally
+        prompt = " ".join(seg["text"].strip() for seg in found)[-200:] or prompt
+        offset = end
+
+    # only complete runs are cached; an abandoned generator never gets here
+    _cache_transcript(key, " ".join(s.text for s in segments), segments)
+
+def _window_end(cuts: list[int], start: int, max_len: int, total: int) -> tuple[int, bool]:
+    """
+    End of the streaming window starting at start.
+
+    Returns:
+        (end, hard_cut): the last silence cut in the back half of the window,
+        or start + max_len with hard_cut True when there is none.
+    """
+    if total - start <= max_len:
+        return total, False
+    i = bisect.bisect_right(cuts, start + max_len) - 1
+    if i >= 0 and cuts[i] >= start + max_len // 2:
+        return cuts[i], False
+    return start + max_len, True
+
+# ---------------- Parallel Sharded Transcription ---------------- #
+_WORD = re.compile(r"[\w']+")
+
+def _init_shard_worker(threads: int):
+    """Give each worker process its share of the cores instead of all of them."""
+    import torch  # type: ignore
+    torch.set_num_threads(threads)
+
+def _transcribe_shard(args) -> list[Segment]:
+    npy_path, ranges, model_name = args
+    # every worker maps the same decoded file; only its own shard's pages are read
+    samples, timemap = remove_silence(np.load(npy_path, mmap_mode="c"), ranges=ranges)
+    model = get_model(model_name)  # resident per worker process
+    result = model.transcribe(samples, fp16=model.device.type == "cuda")
+    return [_segment(seg, timemap) for seg in result.get("segments", []) if seg["text"].strip()]
+
+def _drop_repeated_words(prev: Segment, seg: Segment, max_words: int = 8) -> Segment:
+    """Strip words at the start of seg that repeat the end of prev (shard boundary echo)."""
+    tail = [w.lower() for w in _WORD.findall(prev.text)[-max_words:]]
+    words = seg.text.split()
+    head = [(_WORD.findall(w.lower()) or [""])[0] for w in words[:max_words]]
+    for k in range(min(len(tail), len(head)), 0, -1):
+        if tail[-k:] == head[:k]:
+            return Segment(seg.start, seg.end, " ".join(words[k:]))
+    return seg
+
+def stitch_segments(shards: list[list[Segment]]) -> list[Segment]:
+    """Join per-shard segments (already offset to file time), de-duplicating boundary words."""
+    out: list[Segment] = []
+    for segs in shards:
+        if out and segs:
+            segs = [_drop_repeated_words(out[-1], segs[0])] + segs[1:]
+        out.extend(s for s in segs if s.text)
+    return out
+
+def transcribe_sharded(
+    audio_path: str,
+    model_name: str = "small",
+    workers: int = 2,
+    max_shard_seconds: float = 300.0,
+    pcm_dir: str | Path | None = None,
+    vad: bool = False,
+    report: dict | None = None,
+) -> list[Segment]:
+    """
+    Transcribe long audio by splitting it at silences and decoding shards in a process pool.
+
+    Args:
+        audio_path: path to the audio file
+        model_name: whisper model size; every worker loads its own copy
+        workers: number of worker processes
+        max_shard_seconds: upper bound on shard length
+        pcm_dir: reuse decoded audio kept in this directory (see load_pcm);
+            without it the audio is decoded to a temporary file
+        vad: leave non-speech stretches out of every shard
+        report: filled with VAD figures (see transcribe_file)
+
+    Returns:
+        Segments with timestamps relative to the whole file.
+    """
+    if pcm_dir is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            return transcribe_sharded(audio_path, model_name, workers, max_shard_seconds, tmp, vad, report)
+
+    audio = load_pcm(audio_path, pcm_dir)
+    if vad:
+        with metrics.span("audio.vad"):
+            ranges = speech_ranges(audio)
+        if report is not None:
+            _vad_report(report, len(audio), ranges)
+        groups = _pack_speech(audio, ranges, int(max_shard_seconds * SAMPLE_RATE))
+    else:
+        groups = [[bounds] for bounds in split_on_silence(audio, SAMPLE_RATE, max_shard_seconds)]
+    # workers get the file name and sample ranges, not a pickled copy of the samples
+    npy_path = str(pcm_path(audio_path, pcm_dir))
+    jobs = [(npy_path, ranges, model_name) for ranges in groups]
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    with metrics.span("whisper.transcribe_sharded", model=model_name, workers=workers, shards=len(jobs),
+                      audio_seconds=len(audio) / SAMPLE_RATE):
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker, initargs=(threads,)) as pool:
+            shards = list(pool.map(_transcribe_shard, jobs))
+    return stitch_segments(shards)
+
+def _pack_speech(audio: np.ndarray, ranges: list[tuple[int, int]], max_len: int) -> list[list[tuple[int, int]]]:
+    """Group consecutive speech ranges into shards holding at most max_len samples of speech."""
+    pieces = []
+    for s, e in ranges:
+        if e - s > max_len:  # long unbroken speech: cut it at its shorter pauses
+            pieces.extend((s + a, s + b) for a, b in split_on_silence(audio[s:e], SAMPLE_RATE, max_len / SAMPLE_RATE))
+        else:
+            pieces.append((s, e))
+
+    shards, current, size = [], [], 0
+    for s, e in pieces:
+        if current and size + (e - s) > max_len:
+            shards.append(current)
+            current, size = [], 0
+        current.append((s, e))
+        size += e - s
+    if current:
+        shards.append(current)
+    return shards
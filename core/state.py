@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from .utils.journal import read_journal
+
+class StateStore:
+    """
+    app_state.json snapshot plus an append-only journal of per-class changes.
+
+    Edits only serialize the class that changed. Changes made within
+    `debounce` seconds are coalesced into one journal append, and the journal
+    is folded back into the snapshot (written atomically) once it grows past
+    `compact_after` entries.
+    """
+
+    def __init__(self, path: str | Path, debounce: float = 0.5, compact_after: int = 500):
+        self.path = Path(path)
+        self.journal_path = self.path.with_suffix(".journal")
+        self.debounce = debounce
+        self.compact_after = compact_after
+
+        self._classes: dict[str, str] = {}     # class name -> serialized class data
+        self._extra: dict = {}                 # any other top-level keys, kept as-is
+        self._pending: dict[str, str | None] = {}  # class name -> data, None = deleted
+        self._full = False                     # whole snapshot needs rewriting
+        self._journal_len = 0
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+
+    # ---------------- Load ---------------- #
+    def load(self) -> dict:
+        """Read the snapshot, replay the journal on top, and return the state dict."""
+        state = {"classes": {}}
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                state = json.load(f)
+        classes = state.setdefault("classes", {})
+
+        self._journal_len = 0
+        # a torn last line from a crash mid-append is cut off here
+        for op in read_journal(self.journal_path):
+            if op["op"] == "set":
+                classes[op["class"]] = op["data"]
+            elif op["op"] == "del":
+                classes.pop(op["class"], None)
+            self._journal_len += 1
+
+        self._classes = {name: json.dumps(data) for name, data in classes.items()}
+        self._extra = {k: v for k, v in state.items() if k != "classes"}
+        return state
+
+    # ---------------- Save ---------------- #
+    def save_class(self, state: dict, class_name: str):
+        """Record one class as changed (or deleted, if it is no longer in state)."""
+        data = state["classes"].get(class_name)
+        serialized = None if data is None else json.dumps(data)
+        with self._lock:
+            if serialized is None:
+                self._classes.pop(class_name, None)
+            else:
+                self._classes[class_name] = serialized
+            self._pending[class_name] = serialized
+            self._schedule()
+
+    def save_all(self, state: dict):
+        """Record the whole state as changed; it is rewritten as a new snapshot."""
+        classes = {name: json.dumps(data) for name, data in state["classes"].items()}
+        with self._lock:
+            self._classes = classes
+            self._extra = {k: v for k, v in state.items() if k != "classes"}
+            self._full = True
+            self._pending.clear()
+            self._schedule()
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write out pending changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._full or self._journal_len + len(self._pending) > self.compact_after:
+                self._write_snapshot()
+            elif self._pending:
+                self._append_journal()
+            self._pending.clear()
+            self._full = False
+
+    def _append_journal(self):
+        lines = []
+        for name, data in self._pending.items():
+            if data is None:
+                lines.append(json.dumps({"op": "del", "class": name}))
+            else:
+                # data is already JSON; splice it in rather than re-encoding
+                lines.append(f'{{"op": "set", "class": {json.dumps(name)}, "data": {data}}}')
+        with self.journal_path.open("a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_len += len(lines)
+
+    def _write_snapshot(self):
+        classes = ", ".join(f"{json.dumps(name)}: {data}" for name, data in self._classes.items())
+        extra = "".join(f", {json.dumps(k)}: {json.dumps(v)}" for k, v in self._extra.items())
+        text = f'{{"classes": {{{classes}}}{extra}}}\n'
+
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        # the snapshot now includes every journaled change
+        self.journal_path.unlink(missing_ok=True)
+        self._journal_len = 0
@@ -1,25 +1,120 @@
 from pathlib import Path
-from datetime import datetime
+from typing import Callable
 import json
 
+from . import metrics
+from .models import Meta, Segment, SegmentsInfo, make_meta
+from .related import get_related_index
+from .search import get_index
+from .segments import has_segments, write_segments
+
 # ---------------- Save Transcript & Summary ---------------- #
 def save_texts(day_dir: str | Path, transcript: str, summary: str):
     """
-    Save transcript.txt and summary.txt inside the given day directory.
+    Save transcript.txt and summary.txt inside the given day directory
+    and update the search and related-lectures indexes.
     """
     day_dir = Path(day_dir)
-    (day_dir / "transcript.txt").write_text(transcript, encoding="utf-8")
-    (day_dir / "summary.txt").write_text(summary, encoding="utf-8")
+    with metrics.span("storage.write_texts"):
+        (day_dir / "transcript.txt").write_text(transcript, encoding="utf-8")
+        (day_dir / "summary.txt").write_text(summary, encoding="utf-8")
+    with metrics.span("storage.index"):
+        _update_indexes(
+            lambda: get_index().index_day(day_dir, transcript, summary),
+            lambda: get_related_index().index_day(day_dir, transcript),
+        )
+
+def save_transcript(day_dir: str | Path, transcript: str, index: bool = True):
+    """
+    Save transcript.txt on its own (before there is a summary) and, unless
+    index is False, index it.
+    """
+    day_dir = Path(day_dir)
+    with metrics.span("storage.write_texts"):
+        (day_dir / "transcript.txt").write_text(transcript, encoding="utf-8")
+    if index:
+        reindex_day(day_dir)
+
+# ---------------- Index Upkeep ---------------- #
+def _update_indexes(search: Callable[[], None], related: Callable[[], None]):
+    """Update both indexes, each on its own: the texts are saved, and either can catch up on the next save."""
+    for name, update in (("Search index", search), ("Related index", related)):
+        try:
+            update()
+        except Exception as e:
+            print(f"{name} error:", e)
+
+def reindex_day(day_dir: str | Path):
+    """
+    Re-read a day's saved texts into the search and related-lectures indexes
+    (after the day or its class was renamed).
+    """
+    with metrics.span("storage.index"):
+        _update_indexes(lambda: get_index().reindex_day(day_dir), lambda: get_related_index().reindex_day(day_dir))
+
+def forget_day(class_name: str, day: str | None = None):
+    """
+    Drop a day (or, with day=None, every day of a class) from both indexes.
+    """
+    _update_indexes(
+        lambda: get_index().remove_day(class_name, day),
+        lambda: get_related_index().remove_day(class_name, day),
+    )
+
+# ---------------- Metadata & Segments ---------------- #
+def save_meta(
+    day_dir: str | Path,
+    audio_path: str,
+    whisper_model: str,
+    segments: SegmentsInfo | None = None,
+    transcribed_at: str | None = None,
+):
+    """
+    Save meta.json containing audio path, model used, timestamp and the
+    segment store description. Without segments, the one already recorded
+    is kept as long as its files are still there.
+    """
+    day_dir = Path(day_dir)
+    if segments is None and has_segments(day_dir):
+        old = load_meta(day_dir)
+        segments = old.segments if old else None
+    meta = make_meta(audio_path, whisper_model, segments)
+    if transcribed_at:
+        meta.transcribed_at = transcribed_at
+    (day_dir / "meta.json").write_text(meta.to_json(), encoding="utf-8")
+
+def load_meta(day_dir: str | Path) -> Meta | None:
+    """
+    Load meta.json, or None if missing or unreadable.
+    """
+    try:
+        return Meta.from_dict(json.loads((Path(day_dir) / "meta.json").read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError):
+        return None
+
+def save_segments(day_dir: str | Path, segments: list[Segment]) -> SegmentsInfo:
+    """
+    Save Whisper's timestamped segments (see core.segments); pass the result
+    to save_meta.
+    """
+    with metrics.span("storage.write_segments", entries=len(segments)):
+        return write_segments(day_dir, segments)
+
+# ---------------- Per-Chunk Summaries ---------------- #
+def load_chunk_summaries(day_dir: str | Path) -> dict:
+    """
+    Load chunk_summaries.json (chunk content key -> summary), or {} if missing.
+    """
+    path = Path(day_dir) / "chunk_summaries.json"
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
 
-# ---------------- Save Metadata ---------------- #
-def save_meta(day_dir: str | Path, audio_path: str, whisper_model: str):
+def save_chunk_summaries(day_dir: str | Path, summaries: dict):
     """
-    Save meta.json containing audio path, model used, and timestamp.
+    Save per-chunk summaries so the next run only re-summarizes edited chunks.
     """
     day_dir = Path(day_dir)
-    meta = {
-        "audio_path": audio_path,
-        "whisper_model": whisper_model,
-        "transcribed_at": datetime.now().isoformat(timespec="seconds")
-    }
-    (day_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    with metrics.span("storage.write_chunk_summaries", entries=len(summaries)):
+        (day_dir / "chunk_summaries.json").write_text(json.dumps(summaries), encoding="utf-8")
@@ -0,0 +1,123 @@
+import re
+from typing import Callable, Iterable
+
+# Long lines are shown as display lines of a few sentences: a soft break goes
+# after a sentence end once the line has reached PARAGRAPH_CHARS. Soft breaks
+# stand for a single space in the text; only hard ones are real newlines.
+PARAGRAPH_CHARS = 400
+_SOFT_BREAK = re.compile(r"[.!?][\"')\]]* (?=\S)")
+
+def split_lines(text: str, paragraph_chars: int = PARAGRAPH_CHARS) -> tuple[list[str], list[str]]:
+    """
+    Split text into display lines.
+
+    Returns:
+        (lines, breaks): breaks[i] is what follows lines[i] in the text, " "
+        for a soft break, "\\n" for a hard one and "" after the last line.
+    """
+    lines, breaks = [], []
+    for hard in text.split("\n"):
+        start = 0
+        for m in _SOFT_BREAK.finditer(hard):
+            if m.end() - 1 - start >= paragraph_chars:
+                lines.append(hard[start:m.end() - 1])
+                breaks.append(" ")
+                start = m.end()
+        lines.append(hard[start:])
+        breaks.append("\n")
+    breaks[-1] = ""
+    return lines, breaks
+
+def split_blocks(blocks: Iterable[str], paragraph_chars: int = PARAGRAPH_CHARS) -> tuple[list[str], list[str]]:
+    """
+    split_lines for text arriving in blocks (e.g. read from a large file).
+
+    Only the last display line is held back between blocks, so a saved
+    transcript (one long hard line) is never built up as one string.
+    """
+    lines, breaks = [], []
+    rest = ""
+    for block in blocks:
+        done, done_breaks = split_lines(rest + block, paragraph_chars)
+        # the lines before the last can't change: their breaks were matched with text after them
+        lines += done[:-1]
+        breaks += done_breaks[:-1]
+        rest = done[-1]
+    last_lines, last_breaks = split_lines(rest, paragraph_chars)
+    return lines + last_lines, breaks + last_breaks
+
+class TextBuffer:
+    """
+    Text shared by every view that shows it (e.g. the Transcript tab and the
+    Split View), held once as display lines.
+
+    Views render whichever lines are on screen and write edits back with
+    replace_lines(). Listeners are called as fn(kind, first) after every
+    change: kind is "set", "append" or "edit", and lines before first are
+    unchanged (for "edit", lines after the edited window move up or down).
+    `modified` is set by edits and cleared when the text is replaced.
+    """
+
+    def __init__(self, text: str = "", paragraph_chars: int = PARAGRAPH_CHARS):
+        self.paragraph_chars = paragraph_chars
+        self._listeners: list[Callable[[str, int], None]] = []
+        self._flushers: list[Callable[[], None]] = []
+        self.lines, self.breaks = split_lines(text, paragraph_chars)
+        self.modified = False
+
+    def subscribe(self, fn: Callable[[str, int], None]):
+        self._listeners.append(fn)
+
+    def add_flusher(self, fn: Callable[[], None]):
+        """Register a view's "write pending edits back" hook, called before the text is read or changed."""
+        self._flushers.append(fn)
+
+    def _flush(self):
+        for flush in list(self._flushers):
+            flush()
+
+    def _changed(self, kind: str, first: int):
+        for fn in list(self._listeners):
+            fn(kind, first)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def text(self) -> str:
+        self._flush()
+        return "".join(line + brk for line, brk in zip(self.lines, self.breaks))
+
+    def set_text(self, text: str):
+        self.set_lines(*split_lines(text, self.paragraph_chars))
+
+    def set_lines(self, lines: Iterable[str], breaks: Iterable[str]):
+        """Replace the text with lines already split (see split_lines); the sequences are copied."""
+        self._flush()
+        self.lines, self.breaks = list(lines), list(breaks)
+        self.modified = False
+        self._changed("set", 0)
+
+    def append(self, text: str, sep: str = " "):
+        """Add text at the end (e.g. a streamed segment), only re-splitting the last line."""
+        self._flush()
+        if len(self.lines) == 1 and not self.lines[0]:
+            sep = ""
+        first = len(self.lines) - 1
+        self.lines[-1:], self.breaks[-1:] = split_lines(self.lines[-1] + sep + text, self.paragraph_chars)
+        self._changed("append", first)
+
+    def replace_lines(self, start: int, end: int, text: str) -> int:
+        """
+        Replace lines[start:end] with the display lines of text (the edited
+        contents of a view's window, with soft breaks turned back into spaces);
+        end must be > start.
+
+        Returns:
+            How many lines took their place.
+        """
+        lines, breaks = split_lines(text, self.paragraph_chars)
+        breaks[-1] = self.breaks[end - 1]  # whatever joined the window to the line after it
+        self.lines[start:end], self.breaks[start:end] = lines, breaks
+        self.modified = True
+        self._changed("edit", start)
+        return len(lines)
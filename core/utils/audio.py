@@ -0,0 +1,227 @@
+import os
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+SAMPLE_RATE = 16000  # whisper decodes all audio to 16 kHz mono
+_NPY_HEADER = 128     # bytes np.save uses for the header of any 1-D float32 array
+
+def decode_to_npy(audio_path: str | Path, npy_path: str | Path, sr: int = SAMPLE_RATE) -> Path:
+    """
+    Decode audio with ffmpeg straight into a float32 .npy file.
+
+    ffmpeg writes into the file behind a reserved header, so the samples never
+    pass through Python memory; the header is filled in once the length is
+    known. The file is renamed into place only when complete.
+
+    Args:
+        audio_path: any file ffmpeg can read
+        npy_path: where the mono PCM array goes
+        sr: output sample rate
+
+    Returns:
+        npy_path as a Path.
+    """
+    npy_path = Path(npy_path)
+    tmp = npy_path.with_name(npy_path.name + ".tmp")
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", str(audio_path),
+        "-f", "f32le", "-ac", "1", "-acodec", "pcm_f32le", "-ar", str(sr), "-",
+    ]
+    try:
+        with open(tmp, "wb") as f:
+            f.write(b"\0" * _NPY_HEADER)
+            f.flush()
+            proc = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE)
+            if proc.returncode != 0:
+                raise RuntimeError(f"Failed to load audio: {proc.stderr.decode(errors='replace')[-500:]}")
+            count = (os.fstat(f.fileno()).st_size - _NPY_HEADER) // 4
+            f.truncate(_NPY_HEADER + count * 4)  # drop a torn last sample
+            f.seek(0)
+            header = {"descr": "<f4", "fortran_order": False, "shape": (count,)}
+            np.lib.format.write_array_header_1_0(f, header)
+            if f.tell() != _NPY_HEADER:
+                raise RuntimeError("unexpected .npy header size")
+        os.replace(tmp, npy_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return npy_path
+
+def probe_duration(audio_path: str | Path) -> float | None:
+    """Length of an audio file in seconds according to ffprobe, or None if it can't tell."""
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", str(audio_path)]
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        return float(out.strip())
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+def frame_energy_db(samples: np.ndarray, frame_len: int) -> np.ndarray:
+    """
+    RMS energy of consecutive frames, in dB.
+
+    Args:
+        samples: mono float32 audio
+        frame_len: samples per frame (a trailing partial frame is ignored)
+
+    Returns:
+        One energy value per frame.
+    """
+    n = len(samples) // frame_len
+    frames = samples[: n * frame_len].reshape(n, frame_len)
+    # einsum sums squares row by row without a full-size temporary
+    power = np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / frame_len
+    return 10.0 * np.log10(power + 1e-12)
+
+def find_silences(
+    samples: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    frame_ms: int = 30,
+    min_silence: float = 0.5,
+    threshold_db: float | None = None,
+) -> list[tuple[int, int]]:
+    """
+    Locate silent stretches in the audio.
+
+    Args:
+        samples: mono float32 audio
+        sr: sample rate
+        frame_ms: analysis frame length
+        min_silence: shortest stretch (seconds) reported as silence
+        threshold_db: frames quieter than this are silent; defaults to
+            35 dB below the loud (95th percentile) frames
+
+    Returns:
+        (start, end) sample ranges of each silence, in order.
+    """
+    frame_len = max(1, sr * frame_ms // 1000)
+    energy = frame_energy_db(samples, frame_len)
+    if not len(energy):
+        return []
+    if threshold_db is None:
+        threshold_db = float(np.percentile(energy, 95)) - 35.0
+
+    silent = np.concatenate(([False], energy < threshold_db, [False]))
+    edges = np.flatnonzero(np.diff(silent.astype(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+    keep = (ends - starts) * frame_len >= min_silence * sr
+    return [(int(s) * frame_len, int(e) * frame_len) for s, e in zip(starts[keep], ends[keep])]
+
+def split_on_silence(
+    samples: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    max_shard_seconds: float = 300.0,
+    min_shard_seconds: float = 30.0,
+) -> list[tuple[int, int]]:
+    """
+    Cut audio into shards of bounded length, preferring cuts in the middle of silences.
+
+    Args:
+        samples: mono float32 audio
+        sr: sample rate
+        max_shard_seconds: no shard is longer than this
+        min_shard_seconds: cuts closer than this to the shard start are skipped
+
+    Returns:
+        Consecutive (start, end) sample ranges covering the whole audio.
+    """
+    total = len(samples)
+    max_len = int(max_shard_seconds * sr)
+    min_len = int(min_shard_seconds * sr)
+    cuts = [(s + e) // 2 for s, e in find_silences(samples, sr)]
+
+    shards = []
+    start, i = 0, 0
+    while total - start > max_len:
+        best = None
+        while i < len(cuts) and cuts[i] <= start + max_len:
+            if cuts[i] >= start + min_len:
+                best = cuts[i]
+            i += 1
+        end = best if best is not None else start + max_len  # no silence: hard cut
+        shards.append((start, end))
+        start = end
+    if start < total or not shards:
+        shards.append((start, total))
+    return shards
+
+# ---------------- Voice Activity ---------------- #
+def speech_ranges(
+    samples: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    min_silence: float = 1.0,
+    pad: float = 0.25,
+    threshold_db: float | None = None,
+) -> list[tuple[int, int]]:
+    """
+    Energy-based voice activity: the stretches of audio worth transcribing.
+
+    Args:
+        samples: mono float32 audio
+        sr: sample rate
+        min_silence: silences shorter than this (seconds) are kept as speech
+        pad: seconds of silence left around speech so words aren't clipped
+        threshold_db: silence threshold (see find_silences)
+
+    Returns:
+        (start, end) sample ranges of speech, in order.
+    """
+    pad_len = int(pad * sr)
+    silences = np.array(
+        find_silences(samples, sr, min_silence=min_silence + 2 * pad, threshold_db=threshold_db),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    cut_starts = silences[:, 0] + pad_len
+    cut_ends = silences[:, 1] - pad_len
+    # a silence at the very start or end needs no padding on its outer side
+    cut_starts[silences[:, 0] <= pad_len] = 0
+    cut_ends[silences[:, 1] >= len(samples) - pad_len] = len(samples)
+
+    starts = np.concatenate(([0], cut_ends))
+    ends = np.concatenate((cut_starts, [len(samples)]))
+    keep = ends > starts
+    return [(int(s), int(e)) for s, e in zip(starts[keep], ends[keep])]
+
+class TimeMap:
+    """Maps times in audio with stretches cut out back to times in the original."""
+
+    def __init__(self, ranges: list[tuple[int, int]], sr: int = SAMPLE_RATE):
+        bounds = np.array(ranges, dtype=np.int64).reshape(-1, 2)
+        lengths = bounds[:, 1] - bounds[:, 0]
+        self._original = bounds[:, 0] / sr
+        self._compact = (np.cumsum(lengths) - lengths) / sr  # where each range starts once joined
+
+    def to_original(self, t: float) -> float:
+        if not len(self._compact):
+            return t
+        i = max(0, int(np.searchsorted(self._compact, t, side="right")) - 1)
+        return float(self._original[i] + t - self._compact[i])
+
+def remove_silence(
+    samples: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    ranges: list[tuple[int, int]] | None = None,
+    **vad_options,
+) -> tuple[np.ndarray, TimeMap]:
+    """
+    Join the speech stretches of the audio into one shorter array.
+
+    Args:
+        samples: mono float32 audio
+        sr: sample rate
+        ranges: speech ranges to keep; found with speech_ranges(**vad_options)
+            when not given
+
+    Returns:
+        (compacted samples, map from compacted times back to original times)
+    """
+    if ranges is None:
+        ranges = speech_ranges(samples, sr, **vad_options)
+    if len(ranges) == 1:
+        s, e = ranges[0]
+        compact = samples[s:e]  # a view, no copy
+    else:
+        compact = np.concatenate([samples[s:e] for s, e in ranges]) if ranges else samples[:0]
+    return compact, TimeMap(ranges, sr)
@@ -1,13 +1,151 @@
+import math
+import re
+from collections import deque
+from typing import Callable, Iterable, Iterator
 
-def chunk_text(text: str, max_chars: int = 1000):
+from .. import metrics
+
+# A sentence ends at terminal punctuation (plus closing quotes/brackets) followed by whitespace.
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+_TERMINALS = ".!?"
+_CLOSERS = "\"')]"
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+# BPE splits rare long "words" (URLs, garbage runs) into pieces of a few characters
+_LONG_WORD = 20
+_CHARS_PER_PIECE = 4
+
+def approx_token_count(text: str) -> int:
+    """Cheap BPE-size estimate: words and punctuation marks, scaled up for sub-word splits."""
+    n = 0
+    for m in _APPROX_TOKEN.finditer(text):
+        length = m.end() - m.start()
+        n += 1 if length <= _LONG_WORD else -(-length // _CHARS_PER_PIECE)
+    return math.ceil(n * 1.3)
+
+def _tail_start(buf: str) -> int:
+    """Where a sentence end that the next piece may complete starts: the trailing run of `.!?` and closers."""
+    i = len(buf)
+    while i and buf[i - 1] in _CLOSERS:
+        i -= 1
+    while i and buf[i - 1] in _TERMINALS:
+        i -= 1
+    return i
+
+def iter_sentences(pieces: str | Iterable[str], max_chars: int = 2000) -> Iterator[str]:
     """
-    Split text into chunks of up to max_chars characters.
+    Yield whole sentences from text that may arrive in pieces.
 
     Args:
-        text: the full text to split
-        max_chars: maximum characters per chunk
+        pieces: a string, or an iterable of string pieces (e.g. streamed segments)
+        max_chars: run-on text without sentence punctuation is cut at a word
+            boundary once it grows past this many characters
 
-    Returns:
-        A list of text chunks.
+    Yields:
+        Stripped sentences, in order.
     """
-    return [text[i:i+max_chars] for i in range(0, len(text), max_chars)] or [text]
\ No newline at end of file
+    if isinstance(pieces, str):
+        pieces = (pieces,)
+
+    buf = ""
+    for piece in pieces:
+        # only rescan what is new, plus any punctuation and closing quotes it may complete
+        scan_from = _tail_start(buf)
+        buf += piece
+
+        pos = 0
+        for m in _SENTENCE_END.finditer(buf, scan_from):
+            sentence = buf[pos:m.end()].strip()
+            if sentence:
+                yield sentence
+            pos = m.end()
+
+        # no sentence end in sight: cut run-on text at the last space
+        while len(buf) - pos > max_chars:
+            cut = buf.rfind(" ", pos, pos + max_chars)
+            if cut <= pos:
+                cut = pos + max_chars
+            sentence = buf[pos:cut].strip()
+            if sentence:
+                yield sentence
+            pos = cut
+        buf = buf[pos:]
+
+    if buf.strip():
+        yield buf.strip()
+
+def _fit(sentence: str, count: Callable[[str], int], max_tokens: int) -> Iterator[tuple[str, int]]:
+    """Yield (text, tokens) parts of a sentence, each within max_tokens."""
+    n = count(sentence)
+    if n <= max_tokens:
+        yield sentence, n
+        return
+
+    # sentence too long for one chunk: pack it word by word instead
+    words: list[str] = []
+    total = 0
+    for word in sentence.split():
+        k = count(word)
+        if k > max_tokens:
+            # a single giant "word" (e.g. a URL or garbage run): slice it by characters
+            step = max(1, len(word) * max_tokens // k)
+            while step > 1 and (n := count(word[:step])) > max_tokens:  # counts aren't exactly proportional
+                step = max(1, min(step - 1, step * max_tokens // n))
+            pieces = [word[i:i+step] for i in range(0, len(word), step)]
+        else:
+            pieces = [word]
+        for w in pieces:
+            k = count(w) if len(pieces) > 1 else k
+            if words and total + k > max_tokens:
+                yield " ".join(words), total
+                words, total = [], 0
+            words.append(w)
+            total += k
+    if words:
+        yield " ".join(words), total
+
+def iter_token_chunks(
+    text: str | Iterable[str],
+    max_tokens: int = 512,
+    overlap: int = 0,
+    count_tokens: Callable[[str], int] | None = None,
+) -> Iterator[str]:
+    """
+    Pack whole sentences into chunks that fit a model's token budget.
+
+    Args:
+        text: the full text, or an iterable of text pieces (streamed input)
+        max_tokens: maximum tokens per chunk
+        overlap: tokens of trailing sentences repeated at the start of the next chunk
+        count_tokens: tokenizer-backed counter; defaults to approx_token_count
+
+    Yields:
+        Text chunks, in order. Sentences longer than max_tokens are split at words.
+    """
+    count = count_tokens or approx_token_count
+    max_tokens = max(1, max_tokens)
+    overlap = max(0, min(overlap, max_tokens - 1))
+
+    window: deque[tuple[str, int]] = deque()
+    total = 0
+    fresh = False  # window holds text that has not been emitted yet
+
+    for sentence in iter_sentences(text):
+        metrics.count("chunking.sentences")
+        for part, n in _fit(sentence, count, max_tokens):
+            while window and total + n > max_tokens:
+                if fresh:
+                    metrics.count("chunking.chunks")
+                    yield " ".join(s for s, _ in window)
+                    fresh = False
+                    while window and total > overlap:
+                        total -= window.popleft()[1]
+                else:
+                    # carried-over context alone can't make room: drop it
+                    total -= window.popleft()[1]
+            window.append((part, n))
+            total += n
+            fresh = True
+
+    if fresh:
+        metrics.count("chunking.chunks")
+        yield " ".join(s for s, _ in window)
@@ -0,0 +1,35 @@
+import json
+from pathlib import Path
+from typing import Iterator
+
+def read_journal(path: str | Path) -> Iterator[dict]:
+    """
+    Yield the records of an append-only JSONL journal.
+
+    A crash mid-append leaves a torn record at the end. Once reading stops
+    there, the file is cut back to the end of the last complete record, so
+    the next append starts on a fresh line instead of being glued onto the
+    fragment (and lost with it on every later load). Exhaust the iterator
+    before appending.
+    """
+    path = Path(path)
+    good = 0
+    torn = False
+    try:
+        f = path.open("rb")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("no newline")
+                record = json.loads(line)
+            except ValueError:
+                torn = True
+                break
+            good += len(line)
+            yield record
+    if torn:
+        with path.open("r+b") as f:
+            f.truncate(good)
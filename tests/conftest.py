@@ -0,0 +1,9 @@
+import pytest
+
+from core import cache, config
+
+@pytest.fixture(autouse=True)
+def _scratch_data(tmp_path, monkeypatch):
+    """Keep metrics and cached results out of the real data directory."""
+    monkeypatch.setattr(config, "METRICS_PATH", tmp_path / "metrics.jsonl")
+    monkeypatch.setattr(cache, "results", cache.ResultCache(tmp_path / "cache"))
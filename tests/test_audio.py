@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from core.utils.audio import SAMPLE_RATE, TimeMap, remove_silence, speech_ranges
+
+def _signal(*parts: tuple[str, float]) -> np.ndarray:
+    """("tone" | "silence", seconds) pieces, end to end."""
+    out = []
+    for kind, seconds in parts:
+        n = int(seconds * SAMPLE_RATE)
+        t = np.arange(n) / SAMPLE_RATE
+        out.append((0.5 * np.sin(2 * np.pi * 220 * t) if kind == "tone" else np.zeros(n)).astype(np.float32))
+    return np.concatenate(out)
+
+def _seconds(ranges):
+    return [(s / SAMPLE_RATE, e / SAMPLE_RATE) for s, e in ranges]
+
+FRAME = 0.03  # find_silences' analysis frame; boundaries land within one
+
+def test_speech_ranges_pad_and_merge():
+    samples = _signal(
+        ("silence", 1.8), ("tone", 2.4),
+        ("silence", 3.0),                  # long: cut out, minus padding
+        ("tone", 1.2), ("silence", 0.6),   # short pause: stays in the speech range
+        ("tone", 1.2), ("silence", 2.4),
+    )
+    ranges = _seconds(speech_ranges(samples, min_silence=1.0, pad=0.25))
+
+    # leading and trailing silence are dropped too, padded on their inner side only
+    expected = [(1.8 - 0.25, 4.2 + 0.25), (7.2 - 0.25, 10.2 + 0.25)]
+    assert len(ranges) == 2
+    for (s, e), (xs, xe) in zip(ranges, expected):
+        assert s == pytest.approx(xs, abs=FRAME)
+        assert e == pytest.approx(xe, abs=FRAME)
+
+def test_no_silence_is_one_range():
+    samples = _signal(("tone", 3.0))
+    assert speech_ranges(samples) == [(0, len(samples))]
+
+def test_time_map_back_to_original():
+    sr = SAMPLE_RATE
+    ranges = [(1 * sr, 3 * sr), (5 * sr, 6 * sr), (10 * sr, 12 * sr)]
+    timemap = TimeMap(ranges)
+
+    assert timemap.to_original(0.0) == pytest.approx(1.0)
+    assert timemap.to_original(1.5) == pytest.approx(2.5)
+    assert timemap.to_original(2.0) == pytest.approx(5.0)   # first sample of the second range
+    assert timemap.to_original(2.75) == pytest.approx(5.75)
+    assert timemap.to_original(3.0) == pytest.approx(10.0)
+    assert timemap.to_original(4.9) == pytest.approx(11.9)
+    assert TimeMap([]).to_original(4.2) == 4.2  # all silence: nothing to map
+
+def test_remove_silence_keeps_speech_and_maps_it_back():
+    samples = _signal(("tone", 1.2), ("silence", 3.0), ("tone", 1.2))
+    compact, timemap = remove_silence(samples, min_silence=1.0, pad=0.25)
+
+    assert len(compact) / SAMPLE_RATE == pytest.approx(1.2 + 0.25 + 0.25 + 1.2, abs=2 * FRAME)
+    # the start of the second tone, found in the compacted audio, maps back to 4.2 s
+    second = np.flatnonzero(np.abs(compact[int(1.5 * SAMPLE_RATE):]) > 0)[0] + int(1.5 * SAMPLE_RATE)
+    assert timemap.to_original(second / SAMPLE_RATE) == pytest.approx(4.2, abs=2 / SAMPLE_RATE)
@@ -0,0 +1,70 @@
+import random
+import time
+
+from core.utils.chunking import approx_token_count, iter_sentences, iter_token_chunks
+
+def _words(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    vocab = ["gradient", "descent", "the", "loss", "of", "weights", "and", "rate", "learning", "so"]
+    return [rng.choice(vocab) for _ in range(n)]
+
+def _pieces(text: str, seed: int = 0) -> list[str]:
+    """text cut at random places, like streamed transcript segments."""
+    rng = random.Random(seed)
+    cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, len(text) // 7)))
+    return [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+
+def test_sentences_and_budget():
+    text = "First one. Second one! Third? Fourth."
+    assert list(iter_sentences(text)) == ["First one.", "Second one!", "Third?", "Fourth."]
+    chunks = list(iter_token_chunks(" ".join([text] * 50), max_tokens=20))
+    assert all(approx_token_count(c) <= 20 for c in chunks)
+    assert " ".join(chunks).split() == " ".join([text] * 50).split()
+
+def test_no_punctuation():
+    words = _words(20_000)
+    chunks = list(iter_token_chunks(" ".join(words), max_tokens=64))
+    assert len(chunks) > 1
+    assert all(approx_token_count(c) <= 64 for c in chunks)
+    assert " ".join(chunks).split() == words
+
+def test_single_huge_token_is_hard_split():
+    word = "x" * 1_000_000
+    chunks = list(iter_token_chunks(word, max_tokens=512))
+    assert len(chunks) > 100
+    assert all(approx_token_count(c) <= 512 for c in chunks)
+    assert "".join(chunks).replace(" ", "") == word
+
+def test_quote_closed_sentence_split_across_pieces():
+    assert list(iter_sentences(['He said "hi."', ' Then left. '])) == ['He said "hi."', "Then left."]
+    assert list(iter_sentences(["Really?!", ") No", "! Yes."])) == ["Really?!)", "No!", "Yes."]
+
+def test_streamed_input_matches_whole_text():
+    rng = random.Random(1)
+    sentences = []
+    for _ in range(400):
+        end = rng.choice([".", "!", "?", '."', ".)", "?'"])
+        sentences.append(" ".join(_words(rng.randint(3, 30), rng.random())).capitalize() + end)
+    text = " ".join(sentences)
+
+    assert list(iter_sentences(_pieces(text))) == list(iter_sentences(text)) == sentences
+    assert list(iter_token_chunks(_pieces(text), max_tokens=100, overlap=20)) == \
+        list(iter_token_chunks(text, max_tokens=100, overlap=20))
+
+def _seconds(fn) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def test_linear_time():
+    # quadratic rescanning would make 4x the input take ~16x as long
+    def run(n: int):
+        text = " ".join(_words(n))  # no sentence ends, streamed in small pieces
+        pieces = [text[i:i + 5] for i in range(0, len(text), 5)]
+        return lambda: sum(1 for _ in iter_token_chunks(pieces, max_tokens=512))
+
+    small, large = _seconds(run(20_000)), _seconds(run(80_000))
+    assert large < small * 8
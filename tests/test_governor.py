@@ -0,0 +1,79 @@
+from core.governor import ModelGovernor
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def _governor(budget_mb=1000, idle_seconds=0, clock=None):
+    governor = ModelGovernor(budget_mb, idle_seconds, clock or Clock())
+    unloaded = []
+
+    def load(key, size_mb):
+        governor.register(key, key, size_mb, lambda: unloaded.append(key))
+
+    return governor, load, unloaded
+
+def _loaded(governor):
+    return [label for label, _ in governor.usage()]
+
+def test_least_recently_used_model_is_evicted_over_budget():
+    governor, load, unloaded = _governor(budget_mb=1000)
+    load("a", 400)
+    load("b", 400)
+    load("c", 400)
+    assert unloaded == ["a"] and _loaded(governor) == ["b", "c"]
+
+    with governor.using("b"):
+        pass  # b is now more recently used than c
+    load("d", 400)
+    assert unloaded == ["a", "c"] and _loaded(governor) == ["b", "d"]
+    assert governor.total_mb() == 800
+
+def test_model_in_use_is_never_evicted():
+    governor, load, unloaded = _governor(budget_mb=1000)
+    load("a", 600)
+    with governor.using("a"):
+        load("b", 600)
+        assert unloaded == [] and _loaded(governor) == ["a", "b"]  # over budget rather than pull a mid-call
+        load("c", 300)
+        assert unloaded == ["b"] and _loaded(governor) == ["a", "c"]
+
+def test_idle_models_are_unloaded():
+    clock = Clock()
+    governor, load, unloaded = _governor(budget_mb=10_000, idle_seconds=60, clock=clock)
+    load("a", 100)
+    clock.now += 30
+    load("b", 100)
+
+    clock.now += 31  # a idle for 61 s, b for 31 s
+    assert governor.unload_idle() == ["a"] and unloaded == ["a"]
+
+    with governor.using("b"):
+        clock.now += 600
+        assert governor.unload_idle() == []  # busy, however long it takes
+    clock.now += 59
+    assert governor.unload_idle() == []
+    clock.now += 1
+    assert governor.unload_idle() == ["b"] and _loaded(governor) == []
+
+def test_idle_timeout_zero_keeps_models():
+    clock = Clock()
+    governor, load, unloaded = _governor(idle_seconds=0, clock=clock)
+    load("a", 100)
+    clock.now += 10 ** 6
+    assert governor.unload_idle() == [] and _loaded(governor) == ["a"]
+
+def test_failing_unload_does_not_stop_the_others():
+    governor = ModelGovernor(100, 0, Clock())
+    unloaded = []
+
+    def broken():
+        raise RuntimeError("boom")
+
+    governor.register("a", "a", 60, broken)
+    governor.register("b", "b", 60, lambda: unloaded.append("b"))
+    governor.register("c", "c", 60, lambda: unloaded.append("c"))
+    assert _loaded(governor) == ["c"] and unloaded == ["b"]
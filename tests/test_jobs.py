@@ -0,0 +1,35 @@
+from core.config import APP_DIR
+from core.jobs import DONE, QUEUED, RUNNING, Job, JobStore, _day_dir
+
+def _add(store, kind="summarize"):
+    job = Job(store.next_id(), kind, {"day_dir": "/tmp/day"})
+    store.add(job)
+    return job
+
+def test_running_jobs_are_queued_again(tmp_path):
+    store = JobStore(tmp_path / "jobs.jsonl")
+    store.load()
+    a, b = _add(store), _add(store)
+    store.set_status(a, DONE)
+    store.set_status(b, RUNNING)
+
+    jobs = {job.id: job.status for job in JobStore(tmp_path / "jobs.jsonl").load()}
+    assert jobs == {a.id: DONE, b.id: QUEUED}
+
+def test_torn_last_line_is_cut_before_next_append(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    store = JobStore(path)
+    store.load()
+    _add(store)
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"op": "add", "job": {"id": 2, "ki')  # crash mid-append
+
+    store = JobStore(path)
+    assert [job.id for job in store.load()] == [1]
+    _add(store)
+
+    assert [job.id for job in JobStore(path).load()] == [1, 2]
+
+def test_relative_day_dirs_resolve_against_app_dir(tmp_path):
+    assert _day_dir({"day_dir": "data/CS/Day 1"}) == APP_DIR / "data" / "CS" / "Day 1"
+    assert _day_dir({"day_dir": str(tmp_path)}) == tmp_path
@@ -0,0 +1,55 @@
+import threading
+
+from core import metrics
+
+def test_concurrent_runs_are_kept_apart():
+    started = threading.Barrier(2)
+
+    def job(job_id: int, stage: str):
+        with metrics.run("job.test", job=job_id):
+            started.wait()  # both runs open at once
+            with metrics.span(stage):
+                metrics.count(f"{stage}.items", job_id)
+            started.wait()
+
+    threads = [threading.Thread(target=job, args=(1, "whisper.transcribe")),
+               threading.Thread(target=job, args=(2, "bart.summarize"))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    first, second = metrics.last_run(job=1), metrics.last_run(job=2)
+    assert list(first["stages"]) == ["whisper.transcribe"]
+    assert first["counters"] == {"whisper.transcribe.items": 1}
+    assert list(second["stages"]) == ["bart.summarize"]
+    assert second["counters"] == {"bart.summarize.items": 2}
+
+def test_threads_started_in_run_context_join_the_run():
+    def worker():
+        with metrics.span("stage"):
+            pass
+
+    with metrics.run("job.test", job=3):
+        t = threading.Thread(target=metrics.in_run_context(worker))
+        t.start()
+        t.join()
+        plain = threading.Thread(target=worker)  # not part of the run
+        plain.start()
+        plain.join()
+
+    assert metrics.last_run(job=3)["stages"]["stage"]["count"] == 1
+
+def test_nested_run_is_a_span():
+    with metrics.run("outer", job=4):
+        with metrics.run("inner"):
+            pass
+    assert "inner" in metrics.last_run(job=4)["stages"]
+    assert metrics.last_run(span="inner") is None
+
+def test_span_records_current_rss():
+    with metrics.span("alloc") as record:
+        pass
+    if record.get("rss_mb") is not None:
+        assert "rss_delta_mb" in record
+    assert "peak_rss_mb" not in record
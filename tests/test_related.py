@@ -0,0 +1,59 @@
+from core.related import RelatedIndex
+
+TEXTS = {
+    "d1": "gradient descent learning rate loss",
+    "d2": "gradient descent momentum loss",
+    "d3": "photosynthesis chlorophyll light",
+    "d4": "chlorophyll light leaves",
+}
+
+def _fill(index):
+    for day, text in TEXTS.items():
+        index.add_day("C", day, text)
+
+def test_related_survives_reopen(tmp_path):
+    _fill(RelatedIndex(tmp_path))
+    index = RelatedIndex(tmp_path)
+    assert index.related("C", "d1")[0][:2] == ("C", "d2")
+
+def test_torn_row_line_does_not_swallow_later_rows(tmp_path):
+    index = RelatedIndex(tmp_path)
+    index.add_day("C", "d1", TEXTS["d1"])
+    with (tmp_path / "rows.jsonl").open("a", encoding="utf-8") as f:
+        f.write('{"key": ["C", "d')  # crash mid-append
+    with (tmp_path / "vocab.txt").open("a", encoding="utf-8") as f:
+        f.write("halfterm")
+
+    index = RelatedIndex(tmp_path)
+    index.add_day("C", "d2", TEXTS["d2"])
+    index.add_day("C", "d3", TEXTS["d3"])
+
+    index = RelatedIndex(tmp_path)
+    assert index.related("C", "d1")[0][:2] == ("C", "d2")
+    assert index.related("C", "d3") == []
+    assert "halfterm" not in index._vocab
+
+def test_row_with_lost_entries_is_dropped(tmp_path):
+    _fill(RelatedIndex(tmp_path))
+    path = tmp_path / "counts.f32"
+    path.write_bytes(path.read_bytes()[:-4])  # the last row's data never reached the disk
+
+    index = RelatedIndex(tmp_path)
+    assert index.related("C", "d4") == []
+    assert index.related("C", "d3") == []
+    assert index.related("C", "d1")[0][:2] == ("C", "d2")
+    assert RelatedIndex(tmp_path).related("C", "d1")[0][:2] == ("C", "d2")
+
+def test_resaves_are_compacted(tmp_path):
+    index = RelatedIndex(tmp_path, compact_ratio=0.5, compact_min=4)
+    _fill(index)
+    for _ in range(20):
+        index.add_day("C", "d1", TEXTS["d1"])
+
+    assert len(index._keys) < 12
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert "CURRENT" in files and "rows.jsonl" not in files
+    reopened = RelatedIndex(tmp_path)
+    assert len(reopened._by_key) == 4
+    assert reopened.related("C", "d1")[0][:2] == ("C", "d2")
+    assert reopened.related("C", "d4")[0][:2] == ("C", "d3")
@@ -0,0 +1,64 @@
+from core.search import SearchIndex
+
+def _days(index, query):
+    return sorted(hit.day for hit in index.search(query))
+
+def test_delta_survives_reopen(tmp_path):
+    index = SearchIndex(tmp_path)
+    index.add_document("C", "d1", "transcript", "the gradient of the loss")
+    index.close()
+
+    assert _days(SearchIndex(tmp_path), "gradient") == ["d1"]
+
+def test_torn_delta_line_does_not_swallow_later_docs(tmp_path):
+    index = SearchIndex(tmp_path)
+    index.add_document("C", "d1", "transcript", "the gradient of the loss")
+    index.close()
+    with (tmp_path / "delta.0.jsonl").open("a", encoding="utf-8") as f:
+        f.write('{"doc": ["C", "d2", "transcript", 3], "ter')  # crash mid-append
+
+    index = SearchIndex(tmp_path)
+    index.add_document("C", "d3", "transcript", "gradient descent again")
+    index.close()
+
+    assert _days(SearchIndex(tmp_path), "gradient") == ["d1", "d3"]
+
+def test_flush_and_merge_keep_results(tmp_path):
+    index = SearchIndex(tmp_path, merge_after=2, max_segments=2)
+    for n in range(9):
+        index.add_document("C", f"d{n}", "transcript", f"lecture number{n} on gradients")
+    index.add_document("C", "d0", "transcript", "replaced text")
+    index.close()
+
+    index = SearchIndex(tmp_path)
+    assert _days(index, "gradients") == [f"d{n}" for n in range(1, 9)]
+    assert _days(index, "replaced") == ["d0"]
+
+def test_merge_with_no_live_docs_leaves_index_loadable(tmp_path):
+    index = SearchIndex(tmp_path, merge_after=100, max_segments=1)
+    index.add_document("C", "d1", "transcript", "gradient descent")
+    index.flush()
+    index.add_document("C", "d2", "transcript", "learning rate")
+    index.remove_day("C", "d1")
+    index.remove_day("C", "d2")
+    index.flush()
+    index.close()
+
+    index = SearchIndex(tmp_path)
+    assert _days(index, "gradient") == []
+    index.add_document("C", "d3", "transcript", "gradient again")
+    assert _days(index, "gradient") == ["d3"]
+
+def test_phrase_matches_only_consecutive_words(tmp_path):
+    index = SearchIndex(tmp_path, merge_after=2)
+    index.add_document("C", "d1", "transcript", "the cat sat on the mat and the cat sat again")
+    index.add_document("C", "d2", "transcript", "cat the sat on a mat")
+    index.add_document("C", "d3", "transcript", "on the mat the cat sat down")  # flushed to a segment
+    index.add_document("C", "d4", "transcript", "the cat sat")  # still in the delta
+
+    assert _days(index, '"the cat sat"') == ["d1", "d3", "d4"]
+    assert _days(index, '"mat the cat"') == ["d3"]
+    assert _days(index, '"sat the"') == []
+    assert _days(index, '"the cat" down') == ["d3"]
+    assert index.search('"the cat sat"')[0].day == "d4"  # shortest document
+    assert len(index.search('"the cat sat"', limit=2)) == 2
@@ -0,0 +1,47 @@
+from core.models import Segment
+from core.segments import SegmentStore, write_segments
+
+SEGMENTS = [
+    Segment(0.0, 1.5, "Good morning."),
+    Segment(2.0, 4.0, "Today: gradient   descent."),  # inner whitespace is collapsed
+    Segment(4.0, 6.25, "   "),  # blank, dropped
+    Segment(4.5, 6.25, "Questions — über alles?"),
+]
+
+def test_round_trip_and_lookups(tmp_path):
+    info = write_segments(tmp_path, SEGMENTS)
+    assert info.count == 3 and info.duration == 6.25
+
+    with SegmentStore(tmp_path) as store:
+        assert len(store) == 3
+        assert store[0] == Segment(0.0, 1.5, "Good morning.")
+        assert store[-1] == Segment(4.5, 6.25, "Questions — über alles?")  # last segment, non-ASCII
+
+        assert store.at(-1.0) is None
+        assert store.at(0.0).text == "Good morning."
+        assert store.at(1.75).text == "Good morning."  # the pause after it
+        assert store.at(4.5).text.startswith("Questions")
+        assert store.at(100.0).text.startswith("Questions")  # past the end: the last one
+
+        assert [s.start for s in store.between(1.75, 4.6)] == [2.0, 4.5]
+        assert store.between(6.25, 10.0) == []
+        assert store.text() == "Good morning. Today: gradient descent. Questions — über alles?"
+        assert store.text(5.0) == "Questions — über alles?"
+        assert store.duration == 6.25
+
+def test_empty_day(tmp_path):
+    info = write_segments(tmp_path, [])
+    assert info.count == 0 and info.duration == 0.0
+
+    with SegmentStore(tmp_path) as store:
+        assert len(store) == 0
+        assert store.at(3.0) is None
+        assert store.between(0.0, 10.0) == []
+        assert store.text() == ""
+        assert store.duration == 0.0
+
+def test_rewrite_replaces_earlier_segments(tmp_path):
+    write_segments(tmp_path, SEGMENTS)
+    write_segments(tmp_path, SEGMENTS[:1])
+    with SegmentStore(tmp_path) as store:
+        assert len(store) == 1 and store.text() == "Good morning."
@@ -0,0 +1,11 @@
+from core import server
+
+def test_client_params_are_whitelisted_and_clamped():
+    params = server._checked("transcribe", {
+        "audio_path": "a.mp3", "model_name": "small", "workers": 10_000, "vad": True,
+        "pcm_dir": "/etc", "report": {},
+    })
+    assert params == {"audio_path": "a.mp3", "model_name": "small", "workers": server._MAX_WORKERS, "vad": True}
+    assert server._checked("transcribe", {"audio_path": "a.mp3", "workers": -3})["workers"] == 1
+    assert server._checked("segments", {"audio_path": "a.mp3", "pcm_dir": "/tmp"}) == {"audio_path": "a.mp3"}
+    assert server._checked("nonsense", {"x": 1}) == {}
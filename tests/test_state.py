@@ -0,0 +1,47 @@
+import json
+
+from core.state import StateStore
+
+def _store(tmp_path):
+    return StateStore(tmp_path / "app_state.json", debounce=60)
+
+def test_journal_replayed_on_load(tmp_path):
+    store = _store(tmp_path)
+    state = store.load()
+    state["classes"]["A"] = {"notes": ["1"]}
+    store.save_class(state, "A")
+    store.flush()
+
+    assert _store(tmp_path).load()["classes"] == {"A": {"notes": ["1"]}}
+
+def test_torn_last_line_is_cut_before_next_append(tmp_path):
+    store = _store(tmp_path)
+    state = store.load()
+    state["classes"]["A"] = {"notes": []}
+    store.save_class(state, "A")
+    store.flush()
+    # crash mid-append: half a record, no newline
+    with store.journal_path.open("a", encoding="utf-8") as f:
+        f.write('{"op": "set", "class": "B", "da')
+
+    store = _store(tmp_path)
+    state = store.load()
+    assert list(state["classes"]) == ["A"]
+    state["classes"]["C"] = {"notes": []}
+    store.save_class(state, "C")
+    store.flush()
+
+    assert list(_store(tmp_path).load()["classes"]) == ["A", "C"]
+    lines = store.journal_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["class"] for line in lines] == ["A", "C"]
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    store = StateStore(tmp_path / "app_state.json", debounce=60, compact_after=2)
+    state = store.load()
+    for name in "ABC":
+        state["classes"][name] = {}
+        store.save_class(state, name)
+        store.flush()
+
+    assert not store.journal_path.exists() or len(store.journal_path.read_text().splitlines()) <= 2
+    assert list(_store(tmp_path).load()["classes"]) == ["A", "B", "C"]
@@ -0,0 +1,47 @@
+import pytest
+
+from core import cache
+from core.services import summarizer
+
+TEXT = " ".join(
+    f"Lecture point {i} covers gradient descent. The learning rate sets the step size. "
+    f"Momentum smooths the updates of point {i}."
+    for i in range(40)
+)
+
+def test_list_entry_from_older_version_is_not_read():
+    engine = summarizer.get_engine("textrank")
+    old_key = summarizer._result_key("chunks", TEXT, engine, 128, 0, 150, 50)
+    cache.results.put(old_key, ["summary written before per-chunk keys were kept"])
+
+    memo: dict = {}
+    summaries = summarizer.summarize_chunks(TEXT, max_chunk=128, memo=memo, engine="textrank")
+    assert len(summaries) > 1 and len(memo) == len(summaries)
+    assert summarizer.summarize_chunks(TEXT, max_chunk=128, memo={}, engine="textrank") == summaries
+
+def test_incomplete_engine_fails_on_creation():
+    class NoSummarize(summarizer.SummaryEngine):
+        name = "partial"
+
+        def window(self):
+            return 512
+
+    with pytest.raises(TypeError):
+        NoSummarize()
+
+def test_check_runs_between_batches():
+    summarizer._cache.clear()
+    calls = []
+
+    class Stop(Exception):
+        pass
+
+    def check():
+        calls.append(len(calls))
+        if len(calls) == 2:
+            raise Stop()  # cancelled while the first batch ran
+
+    with pytest.raises(Stop):
+        summarizer.summarize_hierarchical(TEXT, max_chunk=64, batch_size=2, engine="textrank", check=check)
+    assert len(calls) == 2
+    assert len(summarizer._cache) == 2  # only the first batch was summarized
@@ -0,0 +1,35 @@
+import random
+
+from core import textbuffer
+from core.textbuffer import split_blocks, split_lines
+
+def _text(sentences: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = ["the", "gradient", "of", "loss", "descends", "quickly", "and", "slowly"]
+    out = []
+    for _ in range(sentences):
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(3, 25))).capitalize()
+        out.append(sentence + rng.choice([".", "!", "?", '."', ".)"]))
+    return " ".join(out)
+
+def _blocks(text: str, size: int):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+def test_blocks_split_like_whole_text():
+    text = _text(2000) + "\n" + _text(50, seed=1) + "\n\n" + _text(300, seed=2)
+    expected = split_lines(text, 200)
+    for size in (1, 7, 100, 4096):
+        assert split_blocks(_blocks(text, size), 200) == expected
+
+def test_one_line_transcript_is_released_block_by_block(monkeypatch):
+    text = _text(5000)  # saved transcripts are a single line
+    seen = []
+
+    def recording_split(chunk, paragraph_chars):
+        seen.append(len(chunk))
+        return split_lines(chunk, paragraph_chars)
+
+    monkeypatch.setattr(textbuffer, "split_lines", recording_split)
+    assert textbuffer.split_blocks(_blocks(text, 1000), 400) == split_lines(text, 400)
+    assert max(seen) < 2000  # never more than a block plus the held-back line
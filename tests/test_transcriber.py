@@ -0,0 +1,65 @@
+import contextlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from core import cache, server
+from core.services import transcriber
+from core.utils.audio import SAMPLE_RATE
+
+WORD, GAP = 0.45, 0.1  # gaps too short to count as silence
+
+def _speech(words: int) -> np.ndarray:
+    t = np.arange(int(WORD * SAMPLE_RATE)) / SAMPLE_RATE
+    word = (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    gap = np.zeros(int(GAP * SAMPLE_RATE), np.float32)
+    return np.concatenate([np.concatenate([word, gap]) for _ in range(words)])
+
+def _bursts(window: np.ndarray, frame: int = 80) -> list[tuple[int, int]]:
+    n = len(window) // frame
+    rms = np.sqrt((window[: n * frame].reshape(n, frame) ** 2).mean(axis=1))
+    loud = np.concatenate(([False], rms > 1e-3, [False]))
+    edges = np.flatnonzero(np.diff(loud.astype(np.int8))) * frame
+    return list(zip(edges[0::2], edges[1::2]))
+
+class FakeWhisper:
+    """One segment per tone burst; a burst cut by the window edge comes out garbled."""
+    device = SimpleNamespace(type="cpu")
+
+    def transcribe(self, window, initial_prompt=None, fp16=False):
+        full = int(WORD * SAMPLE_RATE) - 160
+        segments = [
+            {"start": s / SAMPLE_RATE, "end": e / SAMPLE_RATE, "text": " word" if e - s >= full else " wo-"}
+            for s, e in _bursts(window)
+        ]
+        return {"segments": segments, "text": "".join(seg["text"] for seg in segments)}
+
+@pytest.fixture
+def audio(monkeypatch):
+    monkeypatch.setattr(server, "available", lambda: False)
+    monkeypatch.setattr(transcriber, "_transcript_key", lambda *a: "transcript")
+    monkeypatch.setattr(cache, "results", SimpleNamespace(get=lambda key: None, put=lambda key, value: None))
+    monkeypatch.setattr(transcriber, "get_model", lambda name: FakeWhisper())
+    monkeypatch.setattr(transcriber, "in_use", lambda name: contextlib.nullcontext())
+
+    samples = np.concatenate([_speech(30), np.zeros(2 * SAMPLE_RATE, np.float32), _speech(12)])
+    monkeypatch.setattr(transcriber, "load_pcm", lambda path, pcm_dir=None: samples)
+    return samples
+
+def test_windows_do_not_clip_or_repeat_words(audio):
+    segments = list(transcriber.iter_segments("lecture.mp3", window_seconds=4.0))
+
+    assert [s.text for s in segments] == ["word"] * 42
+    starts = [s.start for s in segments]
+    assert starts == sorted(starts)
+    expected = [i * (WORD + GAP) for i in range(30)] + \
+               [30 * (WORD + GAP) + 2 + i * (WORD + GAP) for i in range(12)]
+    assert starts == pytest.approx(expected, abs=0.01)
+
+def test_window_ends_at_silence():
+    cuts = [5 * SAMPLE_RATE, 25 * SAMPLE_RATE]
+    step = 30 * SAMPLE_RATE
+    assert transcriber._window_end(cuts, 0, step, 100 * SAMPLE_RATE) == (25 * SAMPLE_RATE, False)
+    assert transcriber._window_end(cuts, 25 * SAMPLE_RATE, step, 100 * SAMPLE_RATE) == (55 * SAMPLE_RATE, True)
+    assert transcriber._window_end(cuts, 80 * SAMPLE_RATE, step, 100 * SAMPLE_RATE) == (100 * SAMPLE_RATE, False)